@@ -0,0 +1,86 @@
+"""生成拉丁字母语言识别的模型表（src/services/latin_language_id.json）
+
+用法（在项目根目录执行）：
+
+    python scripts/build_latin_language_id.py
+
+语料见 scripts/latin_language_id_corpus/README.md。修改语料或参数后重新运行本脚本，
+并将生成的模型表与语料一起提交。
+"""
+
+import argparse
+import collections
+import json
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.services.latin_language_id import extract_ngrams  # noqa: E402
+
+
+LANGUAGES = ["en", "fr", "de", "es"]
+CORPUS_DIR = os.path.join(ROOT, "scripts", "latin_language_id_corpus")
+OUTPUT_PATH = os.path.join(ROOT, "src", "services", "latin_language_id.json")
+
+
+def build_table(corpus_dir: str, max_n: int, alpha: float, min_count: int) -> dict:
+    """统计各语言语料的字符 n-gram，计算加 alpha 平滑的对数概率
+
+    Args:
+        corpus_dir: 语料目录（每种语言一个 <语言代码>.txt）
+        max_n: 最大 n
+        alpha: 加法平滑系数
+        min_count: 所有语言合计出现次数不少于该值的 n-gram 才进入词表
+
+    Returns:
+        模型表
+    """
+    counts = {}
+    for lang in LANGUAGES:
+        with open(os.path.join(corpus_dir, f"{lang}.txt"), "r", encoding="utf-8") as f:
+            counts[lang] = collections.Counter(extract_ngrams(f.read(), max_n))
+
+    total = collections.Counter()
+    for lang_counts in counts.values():
+        total.update(lang_counts)
+    vocabulary = sorted(gram for gram, count in total.items() if count >= min_count)
+    # 平滑的分母使用全部 n-gram 数，词表裁剪不改变各 n-gram 的概率
+    observed = len(total)
+
+    log_probs = []
+    for lang in LANGUAGES:
+        lang_total = sum(counts[lang].values()) + alpha * observed
+        log_probs.append([
+            round(math.log((counts[lang][gram] + alpha) / lang_total), 2)
+            for gram in vocabulary
+        ])
+
+    return {
+        "version": 2,
+        "max_n": max_n,
+        "languages": LANGUAGES,
+        "ngrams": vocabulary,
+        "log_probs": log_probs
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成拉丁字母语言识别模型表")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR, help="语料目录")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="输出文件")
+    parser.add_argument("--max-n", type=int, default=4, help="最大 n")
+    parser.add_argument("--alpha", type=float, default=0.5, help="加法平滑系数")
+    parser.add_argument("--min-count", type=int, default=1, help="进入词表的最少出现次数")
+    args = parser.parse_args()
+
+    table = build_table(args.corpus_dir, args.max_n, args.alpha, args.min_count)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"{args.output}: {len(table['ngrams'])} 个 n-gram，{os.path.getsize(args.output) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
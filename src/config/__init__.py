@@ -1,6 +1,7 @@
 """配置模块"""
 
 from .settings import Settings, get_settings
+from .languages import LANGUAGE_NAMES, get_supported_languages, get_language_name
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["Settings", "get_settings", "LANGUAGE_NAMES", "get_supported_languages", "get_language_name"]
 
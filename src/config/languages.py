@@ -0,0 +1,29 @@
+"""会议语言配置"""
+
+from typing import Dict, List
+
+from .settings import get_settings
+
+
+# 语言代码 -> 语言名称（用于提示词和界面显示）
+LANGUAGE_NAMES: Dict[str, str] = {
+    "zh": "中文",
+    "en": "English",
+    "ja": "日本語",
+    "ko": "한국어",
+    "fr": "Français",
+    "de": "Deutsch",
+    "es": "Español",
+    # 中英混合输入（仅用作翻译的源语言，不可选为会议语言）
+    "mixed": "中英混合文本",
+}
+
+
+def get_supported_languages() -> List[str]:
+    """获取会议支持的语言代码列表（由 SUPPORTED_LANGUAGES 配置）"""
+    return get_settings().supported_languages
+
+
+def get_language_name(code: str) -> str:
+    """获取语言名称，未知语言返回语言代码本身"""
+    return LANGUAGE_NAMES.get(code, code)
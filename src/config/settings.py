@@ -1,8 +1,10 @@
 """应用配置管理"""
 
 import os
+import threading
 import warnings
-from typing import Optional
+from typing import Any, Dict, List, Optional
+import httpx
 from dotenv import load_dotenv
 import streamlit as st
 from langchain_openai import ChatOpenAI
@@ -72,10 +74,361 @@ class Settings:
         """模型温度参数"""
         return float(os.getenv("TEMPERATURE", "0.7"))
     
+    @property
+    def fast_model_name(self) -> str:
+        """快速模型名称（短小、简单的消息使用；与 MODEL_NAME 相同即关闭分级）"""
+        return os.getenv("FAST_MODEL_NAME", "qwen-turbo")
+    
+    @property
+    def fast_model_max_chars(self) -> int:
+        """使用快速模型的最大字符数"""
+        return int(os.getenv("FAST_MODEL_MAX_CHARS", "50"))
+    
+    @property
+    def fast_model_max_sentences(self) -> int:
+        """使用快速模型的最大句子数"""
+        return int(os.getenv("FAST_MODEL_MAX_SENTENCES", "1"))
+    
+    @property
+    def model_price(self) -> float:
+        """主模型每千 token 单价（用于估算费用）"""
+        return float(os.getenv("MODEL_PRICE", "0"))
+    
+    @property
+    def fast_model_price(self) -> float:
+        """快速模型每千 token 单价（用于估算费用）"""
+        return float(os.getenv("FAST_MODEL_PRICE", "0"))
+    
+    @property
+    def usage_watch_call_sites(self) -> List[str]:
+        """需要关注用量的调用位置（逗号分隔），产生模型调用时打印提示"""
+        value = os.getenv("USAGE_WATCH_CALL_SITES", "render")
+        return [site.strip() for site in value.split(",") if site.strip()]
+    
+    @property
+    def supported_languages(self) -> List[str]:
+        """会议支持的语言代码列表（逗号分隔）"""
+        value = os.getenv("SUPPORTED_LANGUAGES", "zh,en,ja,ko,fr,de,es")
+        return [code.strip() for code in value.split(",") if code.strip()]
+    
     @property
     def max_iterations(self) -> int:
         """最大迭代次数"""
         return int(os.getenv("MAX_ITERATIONS", "5"))
+    
+    @property
+    def translation_memory_max_entries(self) -> int:
+        """翻译记忆库最大条目数"""
+        return int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "2000"))
+    
+    @property
+    def translation_memory_threshold(self) -> float:
+        """翻译记忆近似匹配的最低相似度"""
+        return float(os.getenv("TRANSLATION_MEMORY_THRESHOLD", "0.6"))
+    
+    @property
+    def translation_memory_template_max_chars(self) -> int:
+        """可按模板直接复用翻译记忆的最大原文长度"""
+        return int(os.getenv("TRANSLATION_MEMORY_TEMPLATE_MAX_CHARS", "80"))
+    
+    @property
+    def rate_limit_requests_per_minute(self) -> float:
+        """翻译模型每分钟最大请求数（应不超过百炼控制台中该模型的 RPM 配额）"""
+        return float(os.getenv("RATE_LIMIT_RPM", "600"))
+    
+    @property
+    def rate_limit_tokens_per_minute(self) -> float:
+        """翻译模型每分钟最大 token 数（应不超过该模型的 TPM 配额）"""
+        return float(os.getenv("RATE_LIMIT_TPM", "1000000"))
+    
+    @property
+    def rate_limit_max_concurrency(self) -> int:
+        """翻译模型最大并发请求数（自适应并发的上限）"""
+        return int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "8"))
+    
+    @property
+    def asr_rate_limit_requests_per_minute(self) -> float:
+        """语音识别每分钟最大请求数（与翻译模型分开计算）"""
+        return float(os.getenv("ASR_RATE_LIMIT_RPM", "300"))
+    
+    @property
+    def asr_rate_limit_max_concurrency(self) -> int:
+        """语音识别最大并发请求数（自适应并发的上限）"""
+        return int(os.getenv("ASR_RATE_LIMIT_MAX_CONCURRENCY", "8"))
+    
+    @property
+    def rate_limit_max_wait(self) -> float:
+        """突发请求排队等待的最长秒数"""
+        return float(os.getenv("RATE_LIMIT_MAX_WAIT", "10"))
+    
+    @property
+    def rate_limit_max_retries(self) -> int:
+        """可重试错误（429、超时等）的最大重试次数"""
+        return int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+    
+    @property
+    def translation_deadline(self) -> float:
+        """单次翻译的截止时间（秒），0 表示不限制"""
+        return float(os.getenv("TRANSLATION_DEADLINE", "15"))
+    
+    @property
+    def translation_hedge(self) -> bool:
+        """是否启用对冲请求（首个请求超过 p95 延迟时再发一个）"""
+        return os.getenv("TRANSLATION_HEDGE", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def translation_hedge_workers(self) -> int:
+        """执行对冲请求的线程数（同时进行的对冲请求上限，用满时不再对冲）"""
+        return int(os.getenv("TRANSLATION_HEDGE_WORKERS", "4"))
+    
+    @property
+    def translation_fallback(self) -> str:
+        """翻译超时的降级策略：original（返回原文）、memory（翻译记忆近似匹配）、fast_model（更快的模型）"""
+        return os.getenv("TRANSLATION_FALLBACK", "memory")
+    
+    @property
+    def translation_fallback_deadline(self) -> float:
+        """降级策略为 fast_model 时降级调用的截止时间（秒，0 表示不限制）
+        
+        在 TRANSLATION_DEADLINE 用完后才开始计时，最坏情况下一次翻译耗时为两者之和。
+        """
+        return float(os.getenv("TRANSLATION_FALLBACK_DEADLINE", "5"))
+    
+    @property
+    def fallback_model_name(self) -> str:
+        """降级策略为 fast_model 时使用的模型"""
+        return os.getenv("FALLBACK_MODEL_NAME", "qwen-turbo")
+    
+    @property
+    def translation_max_workers(self) -> int:
+        """执行翻译请求的后台线程数"""
+        return int(os.getenv("TRANSLATION_MAX_WORKERS", "16"))
+    
+    @property
+    def translation_chunk_max_chars(self) -> int:
+        """长文本分块翻译的每块最大字符数（0 表示不分块）"""
+        return int(os.getenv("TRANSLATION_CHUNK_MAX_CHARS", "600"))
+    
+    @property
+    def translation_chunk_workers(self) -> int:
+        """长文本分块并行翻译的线程数"""
+        return int(os.getenv("TRANSLATION_CHUNK_WORKERS", "4"))
+    
+    @property
+    def background_workers(self) -> int:
+        """后台翻译工作池的线程数"""
+        return int(os.getenv("BACKGROUND_WORKERS", "4"))
+    
+    @property
+    def background_queue_max_depth(self) -> int:
+        """后台翻译工作池的排队任务上限（超出时在页面线程中同步翻译）"""
+        return int(os.getenv("BACKGROUND_QUEUE_MAX_DEPTH", "100"))
+    
+    @property
+    def pending_message_timeout(self) -> float:
+        """消息停留在待翻译状态的最长秒数（超时后标记为翻译失败，可重新翻译；
+        转写中的语音消息额外等待 ASR_TASK_TIMEOUT 秒）"""
+        return float(os.getenv("PENDING_MESSAGE_TIMEOUT", "120"))
+    
+    @property
+    def checkpoint_policy(self) -> str:
+        """工作流检查点策略（per_invocation、window 或 prune）"""
+        policy = os.getenv("CHECKPOINT_POLICY", "window").lower()
+        return policy if policy in ("per_invocation", "window", "prune") else "window"
+    
+    @property
+    def checkpoint_max_messages(self) -> int:
+        """window 策略下每个房间线程保留的最近消息数"""
+        return int(os.getenv("CHECKPOINT_MAX_MESSAGES", "20"))
+    
+    @property
+    def checkpoint_keep_last(self) -> int:
+        """每个房间线程保留的最新检查点数（0 表示全部保留）"""
+        return int(os.getenv("CHECKPOINT_KEEP_LAST", "1"))
+    
+    @property
+    def checkpoint_idle_ttl(self) -> float:
+        """prune 策略下房间线程无活动多少秒后删除"""
+        return float(os.getenv("CHECKPOINT_IDLE_TTL", "3600"))
+    
+    @property
+    def checkpoint_backend(self) -> str:
+        """工作流检查点的存储方式（memory 或 sqlite）"""
+        backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+        return backend if backend in ("memory", "sqlite") else "memory"
+    
+    @property
+    def checkpoint_sqlite_path(self) -> str:
+        """SQLite 检查点数据库文件路径"""
+        return os.getenv("CHECKPOINT_SQLITE_PATH", "room_data/checkpoints.db")
+    
+    @property
+    def checkpoint_ttl(self) -> float:
+        """SQLite 检查点中线程多少秒没有更新后删除（0 表示不删除）"""
+        return float(os.getenv("CHECKPOINT_TTL", "86400"))
+    
+    @property
+    def asr_pool_maxsize(self) -> int:
+        """语音识别 API 连接池中保持的最大连接数"""
+        return int(os.getenv("ASR_POOL_MAXSIZE", "10"))
+    
+    @property
+    def asr_connect_retries(self) -> int:
+        """语音识别 API 建立连接失败时的重试次数（请求发出后的错误由共享限流器重试）"""
+        return int(os.getenv("ASR_CONNECT_RETRIES", "2"))
+    
+    @property
+    def asr_connect_timeout(self) -> float:
+        """语音识别 API 建立连接的超时时间（秒）"""
+        return float(os.getenv("ASR_CONNECT_TIMEOUT", "5"))
+    
+    @property
+    def asr_read_timeout(self) -> float:
+        """语音识别 API 读取响应的超时时间（秒）"""
+        return float(os.getenv("ASR_READ_TIMEOUT", "30"))
+    
+    @property
+    def asr_async(self) -> bool:
+        """是否以异步任务提交语音识别（立即返回，由后台轮询线程取回结果）
+        
+        默认的识别路径（开启流式识别时作为其失败后的后备）；关闭时语音交给工作流的
+        语音识别节点同步识别。
+        """
+        return os.getenv("ASR_ASYNC", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def asr_task_workers(self) -> int:
+        """异步识别任务上传音频、执行回调的线程数（查询任务状态的线程数相同）"""
+        return int(os.getenv("ASR_TASK_WORKERS", "4"))
+    
+    @property
+    def asr_poll_timeout(self) -> float:
+        """查询异步识别任务状态的读取超时时间（秒，较短以免一次慢查询拖住其他任务）"""
+        return float(os.getenv("ASR_POLL_TIMEOUT", "5"))
+    
+    @property
+    def asr_poll_initial_interval(self) -> float:
+        """异步识别任务的首次轮询间隔（秒，之后按退避逐步加长）"""
+        return float(os.getenv("ASR_POLL_INITIAL_INTERVAL", "0.5"))
+    
+    @property
+    def asr_poll_max_interval(self) -> float:
+        """异步识别任务的最长轮询间隔（秒）"""
+        return float(os.getenv("ASR_POLL_MAX_INTERVAL", "5"))
+    
+    @property
+    def asr_task_timeout(self) -> float:
+        """异步识别任务的最长等待时间（秒）"""
+        return float(os.getenv("ASR_TASK_TIMEOUT", "300"))
+    
+    @property
+    def asr_cache(self) -> bool:
+        """是否缓存语音识别结果（相同音频直接返回上次的识别结果）"""
+        return os.getenv("ASR_CACHE", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def asr_cache_max_entries(self) -> int:
+        """内存中最多缓存的语音识别结果数"""
+        return int(os.getenv("ASR_CACHE_MAX_ENTRIES", "256"))
+    
+    @property
+    def asr_cache_dir(self) -> str:
+        """语音识别结果的磁盘缓存目录（为空时只缓存在内存中）"""
+        return os.getenv("ASR_CACHE_DIR", "")
+    
+    @property
+    def asr_cache_max_disk_entries(self) -> int:
+        """磁盘上最多缓存的语音识别结果数（超过时删除最久未使用的，0 表示不限制）"""
+        return int(os.getenv("ASR_CACHE_MAX_DISK_ENTRIES", "4096"))
+    
+    @property
+    def asr_segment_seconds(self) -> float:
+        """长语音分段识别的每段最长时长（秒，0 表示不分段）"""
+        return float(os.getenv("ASR_SEGMENT_SECONDS", "20"))
+    
+    @property
+    def asr_segment_overlap_ms(self) -> int:
+        """长语音相邻分段的重叠时长（毫秒）"""
+        return int(os.getenv("ASR_SEGMENT_OVERLAP_MS", "300"))
+    
+    @property
+    def asr_segment_workers(self) -> int:
+        """长语音分段并行识别的线程数"""
+        return int(os.getenv("ASR_SEGMENT_WORKERS", "4"))
+    
+    @property
+    def asr_sample_rate(self) -> int:
+        """语音识别使用的采样率（预处理时重采样到该采样率）"""
+        return int(os.getenv("ASR_SAMPLE_RATE", "16000"))
+    
+    @property
+    def audio_preprocess(self) -> bool:
+        """上传识别前是否预处理音频（转单声道、重采样、裁剪静音）"""
+        return os.getenv("AUDIO_PREPROCESS", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def audio_trim_silence(self) -> bool:
+        """预处理时是否裁剪首尾静音"""
+        return os.getenv("AUDIO_TRIM_SILENCE", "true").lower() in ("1", "true", "yes")
+    
+    @property
+    def audio_vad_threshold_db(self) -> float:
+        """静音判定阈值（相对最响帧的能量，dB）"""
+        return float(os.getenv("AUDIO_VAD_THRESHOLD_DB", "-35"))
+    
+    @property
+    def audio_vad_padding_ms(self) -> int:
+        """裁剪静音时语音段前后保留的时长（毫秒）"""
+        return int(os.getenv("AUDIO_VAD_PADDING_MS", "200"))
+    
+    @property
+    def asr_streaming(self) -> bool:
+        """是否使用流式语音识别（默认关闭）
+        
+        开启后在脚本线程中边识别边显示部分结果，识别完成前页面不响应其他操作；
+        失败时改用 ASR_ASYNC 选择的路径。
+        """
+        return os.getenv("ASR_STREAMING", "false").lower() in ("1", "true", "yes")
+    
+    @property
+    def asr_streaming_url(self) -> str:
+        """流式语音识别 WebSocket 地址"""
+        return os.getenv("ASR_STREAMING_URL", "wss://dashscope.aliyuncs.com/api-ws/v1/inference")
+    
+    @property
+    def asr_streaming_model(self) -> str:
+        """流式语音识别模型"""
+        return os.getenv("ASR_STREAMING_MODEL", "paraformer-realtime-v2")
+    
+    @property
+    def asr_frame_ms(self) -> int:
+        """流式语音识别每帧音频的时长（毫秒）"""
+        return int(os.getenv("ASR_FRAME_MS", "100"))
+    
+    @property
+    def http_max_connections(self) -> int:
+        """模型 API 连接池的最大连接数"""
+        return int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    
+    @property
+    def http_max_keepalive_connections(self) -> int:
+        """连接池中保持的最大空闲连接数"""
+        return int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    
+    @property
+    def http_keepalive_expiry(self) -> float:
+        """空闲连接的保持时间（秒）"""
+        return float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    
+    @property
+    def http_connect_timeout(self) -> float:
+        """建立连接的超时时间（秒）"""
+        return float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    
+    @property
+    def http_read_timeout(self) -> float:
+        """读取响应的超时时间（秒）"""
+        return float(os.getenv("HTTP_READ_TIMEOUT", "60"))
 
 
 # 全局配置实例
@@ -90,19 +443,78 @@ def get_settings() -> Settings:
     return _settings
 
 
+# 共享 HTTP 客户端的请求计数
+_http_requests = 0
+_http_lock = threading.Lock()
+
+
+def _count_http_request(request: httpx.Request):
+    """记录一次经共享客户端发出的请求"""
+    global _http_requests
+    with _http_lock:
+        _http_requests += 1
+
+
 @st.cache_resource
-def get_model() -> ChatOpenAI:
+def get_http_client() -> httpx.Client:
+    """获取所有模型共享的 HTTP 客户端（使用缓存）
+    
+    各模型复用同一个连接池，避免每个模型实例各自建立连接和 TLS 握手。
+    
+    Returns:
+        配置了连接池上限、空闲连接保持时间和超时的 httpx.Client
+    """
+    settings = get_settings()
+    
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(settings.http_read_timeout, connect=settings.http_connect_timeout),
+        event_hooks={"request": [_count_http_request]}
+    )
+
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """获取共享 HTTP 客户端的请求数和连接池配置（用于监控）
+    
+    连接池内部状态不属于 httpx 的公开接口，这里只报告请求计数和配置的上限。
+    """
+    settings = get_settings()
+    with _http_lock:
+        requests = _http_requests
+    return {
+        "requests": requests,
+        "max_connections": settings.http_max_connections,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+        "keepalive_expiry": settings.http_keepalive_expiry
+    }
+
+
+@st.cache_resource
+def get_model(model_name: Optional[str] = None) -> ChatOpenAI:
     """获取基础模型（使用缓存）
     
+    Args:
+        model_name: 模型名称，默认使用 MODEL_NAME 配置
+    
     Returns:
         ChatOpenAI 模型实例
     """
     settings = get_settings()
     
     return ChatOpenAI(
-        model=settings.model_name,
+        model=model_name or settings.model_name,
         api_key=settings.dashscope_api_key,
         base_url=settings.base_url,
-        temperature=settings.temperature
+        temperature=settings.temperature,
+        # 重试由共享限流器统一处理（见 services/rate_limiter.py）
+        max_retries=0,
+        # 流式输出时同样返回 token 用量（见 services/usage_tracker.py）
+        stream_usage=True,
+        # 所有模型共享同一个连接池
+        http_client=get_http_client()
     )
 
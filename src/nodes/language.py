@@ -0,0 +1,44 @@
+"""输入语言检测结果的读写"""
+
+from typing import Iterable, Optional, Tuple
+
+from ..state.meeting_state import MeetingState, get_target_languages
+from ..services.language_detector import detect_language
+
+
+def detect_language_updates(text: Optional[str], languages: Optional[Iterable[str]] = None) -> dict:
+    """检测文本语言，返回需要写入状态的字段
+
+    每次输入都会重新写入这些字段，避免检查点中残留上一条消息的检测结果。
+
+    Args:
+        text: 输入文本（为空时清空检测结果）
+        languages: 会议室使用的语言（会议室语言和参与者语言），检测结果只在其中选择拉丁字母语言
+
+    Returns:
+        detected_lang / detected_lang_confidence / detected_mixed
+    """
+    if not text:
+        return {"detected_lang": None, "detected_lang_confidence": None, "detected_mixed": None}
+    detection = detect_language(text, frozenset(languages) if languages is not None else None)
+    return {
+        "detected_lang": detection.primary,
+        "detected_lang_confidence": detection.confidence,
+        "detected_mixed": detection.lang == "mixed"
+    }
+
+
+def get_detected_language(state: MeetingState) -> Tuple[str, bool]:
+    """获取状态中已检测的输入语言
+
+    Args:
+        state: 当前状态
+
+    Returns:
+        (语言代码, 是否中英混合)；状态中没有检测结果时按原文检测
+    """
+    detected_lang = state.get("detected_lang")
+    if detected_lang:
+        return detected_lang, bool(state.get("detected_mixed"))
+    updates = detect_language_updates(state.get("original_text"), get_target_languages(state))
+    return updates["detected_lang"] or "en", bool(updates["detected_mixed"])
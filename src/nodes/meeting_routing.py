@@ -1,7 +1,8 @@
 """会议工作流路由"""
 
 from typing import Literal
-from ..state.meeting_state import MeetingState
+from ..state.meeting_state import MeetingState, get_target_languages
+from .language import get_detected_language
 
 
 def should_translate(state: MeetingState) -> Literal["translate", "skip_translate"]:
@@ -14,7 +15,6 @@ def should_translate(state: MeetingState) -> Literal["translate", "skip_translat
     Returns:
         "translate" 如果需要翻译，"skip_translate" 如果不需要
     """
-    room_language = state.get("room_language", "zh")
     original_text = state.get("original_text")
     translated_text = state.get("translated_text")
     
@@ -25,13 +25,11 @@ def should_translate(state: MeetingState) -> Literal["translate", "skip_translat
     if not original_text:
         return "skip_translate"
     
-    # 检测语言
-    from ..services.translation import TranslationService
-    translation_service = TranslationService()
-    detected_lang = translation_service.detect_language(original_text)
+    # 复用已检测的语言
+    detected_lang, mixed = get_detected_language(state)
     
-    # 如果检测到的语言与会议室语言不同，需要翻译
-    if detected_lang != room_language:
+    # 中英混合文本，或检测到的语言与会议室语言或任一参与者的语言不同，需要翻译
+    if mixed or any(lang != detected_lang for lang in get_target_languages(state)):
         return "translate"
     else:
         return "skip_translate"
@@ -47,11 +45,11 @@ def should_recognize_speech(state: MeetingState) -> Literal["recognize", "skip_r
     Returns:
         "recognize" 如果有音频数据需要识别，"skip_recognize" 如果不需要
     """
-    audio_data = state.get("audio_data")
+    audio_ref = state.get("audio_ref")
     original_text = state.get("original_text")
     
     # 如果有音频数据，需要识别
-    if audio_data:
+    if audio_ref:
         return "recognize"
     # 如果已经有原始文本（文本输入），跳过识别
     elif original_text:
@@ -1,40 +1,39 @@
 """消息处理节点"""
 
 from langchain_core.messages import HumanMessage
-from ..state.meeting_state import MeetingState
+from ..state.meeting_state import MeetingState, MessageRecord
+from .language import get_detected_language
 
 
 def message_node(state: MeetingState) -> dict:
-    """消息处理节点：将处理后的文本添加到消息列表
+    """消息处理节点：生成本次调用的消息记录，并将原文加入消息列表
     
     Args:
         state: 当前状态
         
     Returns:
-        更新后的状态，包含新消息（包含原始文本和翻译文本）
+        更新后的状态，包含新消息和结构化的消息记录（原始文本、译文、语言、耗时）
     """
     current_user = state.get("current_user", "用户")
     translated_text = state.get("translated_text")
     original_text = state.get("original_text")
-    room_language = state.get("room_language", "zh")
     
     if not original_text:
-        return {"messages": []}
+        return {"messages": [], "result": None}
     
-    # 检测原始语言
-    from ..services.translation import TranslationService
-    translation_service = TranslationService()
-    original_lang = translation_service.detect_language(original_text)
+    # 复用已检测的原始语言
+    original_lang, _ = get_detected_language(state)
     
-    # 创建消息，包含原始文本和翻译文本
-    # 格式：用户名: 原始文本 | 翻译文本
-    if translated_text and translated_text != original_text:
-        message_content = f"{current_user}: {original_text} | {translated_text} | {original_lang}"
-    else:
-        message_content = f"{current_user}: {original_text} | | {original_lang}"
-    
-    new_message = HumanMessage(content=message_content)
+    result: MessageRecord = {
+        "user": current_user,
+        "original_text": original_text,
+        "translated_text": translated_text if translated_text and translated_text != original_text else None,
+        "original_lang": original_lang,
+        "translations": state.get("translations") or {},
+        "timings": dict(state.get("timings") or {})
+    }
     
     return {
-        "messages": [new_message]
+        "messages": [HumanMessage(content=original_text, name=current_user)],
+        "result": result
     }
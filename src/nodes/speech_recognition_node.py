@@ -1,42 +1,46 @@
 """语音识别节点"""
 
-from ..state.meeting_state import MeetingState
-from ..services.speech_recognition import SpeechRecognitionService
+from ..state.meeting_state import MeetingState, get_target_languages
+from ..services.audio_store import get_audio_store
+from ..services.speech_recognition import get_speech_recognition_service
+from ..services.usage_tracker import usage_scope
+from .language import detect_language_updates
 
 
 def speech_recognition_node(state: MeetingState) -> dict:
     """语音识别节点：将音频转换为文字
     
+    音频按引用从 AudioStore 取出（取出后即释放），检查点中只有引用字符串。
+    
     Args:
         state: 当前状态
         
     Returns:
         更新后的状态，包含识别出的文字
     """
-    audio_data = state.get("audio_data")
+    audio_ref = state.get("audio_ref")
+    clip = get_audio_store().pop(audio_ref) if audio_ref else None
     
-    if not audio_data:
+    if clip is None:
         # 如果没有音频数据，直接返回
-        return {"original_text": None}
+        return {"original_text": None, **detect_language_updates(None)}
     
     try:
-        # 初始化语音识别服务
-        speech_service = SpeechRecognitionService()
-        
         # 识别语音
-        recognized_text = speech_service.recognize(audio_data)
+        with usage_scope(call_site="speech_recognition_node"):
+            recognized_text = get_speech_recognition_service().recognize(
+                clip.data, format=clip.format, sample_rate=clip.sample_rate
+            )
         
-        if recognized_text:
-            return {
-                "original_text": recognized_text
-            }
-        else:
-            return {
-                "original_text": None
-            }
+        # 识别出文字后立即检测语言，供路由和后续节点复用
+        return {
+            "original_text": recognized_text or None,
+            **detect_language_updates(recognized_text, get_target_languages(state))
+        }
             
     except Exception as e:
         print(f"语音识别节点出错: {str(e)}")
         return {
-            "original_text": None
+            "original_text": None,
+            **detect_language_updates(None)
         }
@@ -1,50 +1,86 @@
 """翻译节点"""
 
-from ..state.meeting_state import MeetingState
-from ..services.translation import TranslationService
+from ..state.meeting_state import MeetingState, get_target_languages
+from ..services.translation import get_translation_service
+from ..services.fast_path import get_fast_path_translator
+from ..services.usage_tracker import usage_scope
+from .language import get_detected_language
 
 
 def translation_node(state: MeetingState) -> dict:
-    """翻译节点：根据会议室语言翻译文本
-    
+    """翻译节点：将文本翻译成会议室语言以及各参与者的显示语言
+
     Args:
         state: 当前状态
-        
+
     Returns:
-        更新后的状态，包含翻译后的文本
+        更新后的状态，包含翻译后的文本（会议室语言）和各语言的译文
     """
     room_language = state.get("room_language", "zh")
     original_text = state.get("original_text")
-    
+
     if not original_text:
-        return {"translated_text": None}
-    
+        return {"translated_text": None, "translations": None}
+
     try:
-        # 初始化翻译服务
-        translation_service = TranslationService()
-        
-        # 检测输入语言
-        detected_lang = translation_service.detect_language(original_text)
-        
-        # 如果检测到的语言与会议室语言不同，需要翻译
-        if detected_lang != room_language:
-            translated_text = translation_service.translate(
-                original_text,
-                source_lang=detected_lang,
-                target_lang=room_language
-            )
-            return {
-                "translated_text": translated_text
-            }
-        else:
+        translation_service = get_translation_service()
+
+        # 复用已检测的输入语言
+        detected_lang, mixed = get_detected_language(state)
+
+        # 需要翻译到的语言（与输入语言不同的会议室语言和参与者语言；中英混合文本翻译到所有语言）
+        target_langs = [lang for lang in get_target_languages(state) if mixed or lang != detected_lang]
+        source_lang = "mixed" if mixed else detected_lang
+        if not target_langs:
             # 语言相同，不需要翻译
             return {
-                "translated_text": original_text
+                "translated_text": original_text,
+                "translations": {}
             }
-            
+
+        # 纯表情、链接、常用短语等简单消息无需调用LLM
+        fast_path = get_fast_path_translator()
+        translations = {}
+        pending_langs = []
+        for target_lang in target_langs:
+            fast_path_text = fast_path.translate(
+                original_text,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
+            if fast_path_text is not None:
+                translations[target_lang] = fast_path_text
+            else:
+                pending_langs.append(target_lang)
+
+        with usage_scope(call_site="translation_node"):
+            if len(pending_langs) == 1:
+                # 使用流式翻译：图以 stream_mode="messages" 运行时，UI 可逐步接收译文片段
+                translated_text = None
+                for partial_text in translation_service.translate_stream(
+                    original_text,
+                    source_lang=source_lang,
+                    target_lang=pending_langs[0]
+                ):
+                    translated_text = partial_text
+                translations[pending_langs[0]] = translated_text
+            elif pending_langs:
+                # 多种目标语言合并为一次模型调用
+                translations.update(translation_service.translate_multi(
+                    original_text,
+                    source_lang=source_lang,
+                    target_langs=pending_langs
+                ))
+
+        return {
+            "translated_text": translations.get(room_language, original_text),
+            "translations": translations
+        }
+
     except Exception as e:
         print(f"翻译节点出错: {str(e)}")
         # 翻译失败时返回原文
         return {
-            "translated_text": original_text
+            "translated_text": original_text,
+            "translations": None
         }
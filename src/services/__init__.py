@@ -1,7 +1,22 @@
 """服务模块"""
 
-from .speech_recognition import SpeechRecognitionService
-from .translation import TranslationService
+from .speech_recognition import SpeechRecognitionService, get_speech_recognition_service
+from .asr_cache import AsrCache, get_asr_cache
+from .asr_tasks import AsrTaskPoller, get_asr_task_poller
+from .audio_store import AudioClip, AudioStore, get_audio_store
+from .audio_preprocessing import AudioPreprocessor, PreprocessResult, get_audio_preprocessor
+from .streaming_asr import StreamingResult, StreamingSpeechRecognizer, get_streaming_speech_recognizer
+from .translation import TranslationService, get_translation_service
+from .translation_memory import TranslationMemory, get_translation_memory
+from .fast_path import FastPathTranslator, get_fast_path_translator
+from .rate_limiter import RateLimiter, RateLimitTimeout, RetryableError, get_rate_limiter
+from .hedging import DeadlineExceeded, HedgedCaller, get_hedged_caller
+from .latin_language_id import LatinLanguageIdentifier, get_latin_language_identifier
+from .language_detector import LanguageDetection, detect_language
+from .prompts import PROMPT_VERSION, PromptTemplate
+from .model_router import ModelRouter, get_model_router
+from .usage_tracker import UsageScope, UsageTracker, get_usage_tracker, submit_with_scope, usage_scope
+from .translation_worker import TranslationWorkerPool, get_translation_worker_pool
 from .room_manager import RoomManager, get_room_manager
 
-__all__ = ["SpeechRecognitionService", "TranslationService", "RoomManager", "get_room_manager"]
+__all__ = ["SpeechRecognitionService", "get_speech_recognition_service", "AsrCache", "get_asr_cache", "AsrTaskPoller", "get_asr_task_poller", "AudioClip", "AudioStore", "get_audio_store", "AudioPreprocessor", "PreprocessResult", "get_audio_preprocessor", "StreamingResult", "StreamingSpeechRecognizer", "get_streaming_speech_recognizer", "TranslationService", "get_translation_service", "TranslationMemory", "get_translation_memory", "FastPathTranslator", "get_fast_path_translator", "RateLimiter", "RateLimitTimeout", "RetryableError", "get_rate_limiter", "DeadlineExceeded", "HedgedCaller", "get_hedged_caller", "LatinLanguageIdentifier", "get_latin_language_identifier", "LanguageDetection", "detect_language", "PROMPT_VERSION", "PromptTemplate", "ModelRouter", "get_model_router", "UsageScope", "UsageTracker", "get_usage_tracker", "submit_with_scope", "usage_scope", "TranslationWorkerPool", "get_translation_worker_pool", "RoomManager", "get_room_manager"]
@@ -0,0 +1,193 @@
+"""语音识别结果缓存 - 按音频内容哈希复用识别结果（内存 LRU + 可选磁盘层）"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+
+def asr_cache_key(audio_bytes: bytes, format: str, sample_rate: int, model: str) -> str:
+    """计算缓存键：音频字节的 SHA-256 加上格式、采样率和模型
+
+    同一段录音重复提交（页面重跑、重复点击发送、重试）时得到相同的键；
+    换模型或换参数识别时不会复用旧结果。
+    """
+    digest = hashlib.sha256(audio_bytes).hexdigest()
+    return hashlib.sha256(f"{digest}|{format}|{sample_rate}|{model}".encode("utf-8")).hexdigest()
+
+
+class AsrCache:
+    """语音识别结果缓存
+
+    内存中为有上限的 LRU；配置了 cache_dir 时同时写入磁盘（每个键一个 JSON 文件），
+    进程重启后仍可命中，磁盘命中的结果会放回内存。磁盘文件数超过上限时删除最久未使用
+    （修改时间最早）的文件，磁盘命中会刷新文件的修改时间。
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None, max_disk_entries: int = 4096):
+        """初始化缓存
+
+        Args:
+            max_entries: 内存中最多缓存的结果数
+            cache_dir: 磁盘缓存目录（None 表示只缓存在内存中）
+            max_disk_entries: 磁盘上最多缓存的结果数（0 表示不限制）
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.lock = threading.Lock()
+        self.disk_lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._disk_entries = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+        # 统计信息
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def _disk_path(self, key: str) -> str:
+        """磁盘缓存文件路径"""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_files(self) -> List[str]:
+        """磁盘上的全部缓存文件"""
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+
+    def _evict_disk(self):
+        """删除修改时间最早的缓存文件，直到不超过 max_disk_entries"""
+        with self.disk_lock:
+            files = []
+            for path in self._disk_files():
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+            files.sort()
+
+            removed = 0
+            for _, path in files[:max(0, len(files) - self.max_disk_entries)]:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    print(f"删除语音识别缓存失败: {str(e)}")
+
+            with self.lock:
+                self._disk_entries = len(files) - removed
+                self.disk_evictions += removed
+
+    def _remember(self, key: str, text: str):
+        """放入内存 LRU（调用方持有锁）"""
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """查找缓存的识别结果，未命中返回 None"""
+        with self.lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = json.load(f).get("text")
+                # 刷新修改时间，清理时按最近使用保留
+                os.utime(path)
+            except FileNotFoundError:
+                text = None
+            except Exception as e:
+                print(f"读取语音识别缓存失败: {str(e)}")
+                text = None
+            if text is not None:
+                with self.lock:
+                    self._remember(key, text)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return text
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        """缓存识别结果（空结果不缓存）"""
+        if not text:
+            return
+        with self.lock:
+            self._remember(key, text)
+
+        if self.cache_dir:
+            # 先写临时文件再替换，避免并发读到写了一半的文件
+            path = self._disk_path(key)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                existed = os.path.exists(path)
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"text": text}, f, ensure_ascii=False)
+                os.replace(temp_path, path)
+            except Exception as e:
+                print(f"写入语音识别缓存失败: {str(e)}")
+                return
+
+            if not existed:
+                with self.lock:
+                    self._disk_entries += 1
+                    over_limit = 0 < self.max_disk_entries < self._disk_entries
+                if over_limit:
+                    self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取命中情况"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "disk_entries": self._disk_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def clear(self):
+        """清空内存缓存（磁盘文件保留）"""
+        with self.lock:
+            self._entries.clear()
+
+
+# 全局语音识别缓存实例
+_asr_cache: Optional[AsrCache] = None
+
+
+def get_asr_cache() -> AsrCache:
+    """获取语音识别结果缓存实例（单例）"""
+    global _asr_cache
+    if _asr_cache is None:
+        settings = get_settings()
+        _asr_cache = AsrCache(
+            max_entries=settings.asr_cache_max_entries,
+            cache_dir=settings.asr_cache_dir or None,
+            max_disk_entries=settings.asr_cache_max_disk_entries
+        )
+    return _asr_cache
@@ -0,0 +1,316 @@
+"""异步语音识别 - 提交识别任务后立即返回，由后台线程按退避间隔轮询结果（长语音分段提交）"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.settings import get_settings
+from .asr_cache import asr_cache_key
+from .audio_segmenter import merge_transcripts
+from .speech_recognition import SpeechRecognitionService, get_speech_recognition_service
+from .usage_tracker import UsageScope, current_usage_scope, submit_with_scope, usage_scope
+
+
+# 任务终态（其余状态如 PENDING、RUNNING 继续轮询）
+_FINAL_STATUSES = ("SUCCEEDED", "FAILED", "CANCELED", "UNKNOWN")
+
+
+@dataclass
+class _AsrTask:
+    """后台识别任务（长语音分段时对应多个服务端任务）"""
+    handle: str
+    audio: Optional[bytes]
+    format: str
+    sample_rate: int
+    on_done: Callable[[Optional[str]], Any]
+    scope: UsageScope
+    audio_seconds: float
+    cache_key: Optional[str] = None
+    # 各段的服务端任务ID（按时间顺序）及已结束分段的识别文字（失败为 None）
+    task_ids: List[str] = field(default_factory=list)
+    results: Dict[str, Optional[str]] = field(default_factory=dict)
+    billed_seconds: float = 0.0
+    status: str = "SUBMITTING"
+    polling: bool = False
+    interval: float = 0.0
+    next_poll_at: float = 0.0
+    polls: int = 0
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class AsrTaskPoller:
+    """异步语音识别任务管理
+
+    submit() 立即返回任务句柄：音频在提交线程池中上传（长语音在静音处分段，每段一个
+    服务端任务），得到服务端任务ID后交给后台轮询线程。轮询线程只负责调度，到期任务的
+    查询在查询线程池中并行执行，并使用较短的读取超时，一次慢查询不会推迟其他任务。
+    轮询间隔从 initial_interval 开始按 backoff 倍数加长，不超过 max_interval；任务完成
+    （或失败、超时）后在提交线程池中调用 on_done，因此大量同时进行的语音消息不会占用
+    Streamlit 脚本线程。
+    """
+
+    def __init__(
+        self,
+        service: SpeechRecognitionService,
+        initial_interval: float = 0.5,
+        max_interval: float = 5.0,
+        backoff: float = 1.6,
+        timeout: float = 300.0,
+        poll_timeout: float = 5.0,
+        max_workers: int = 4
+    ):
+        """初始化任务管理
+
+        Args:
+            service: 语音识别服务（负责提交和查询任务的 HTTP 请求）
+            initial_interval: 首次轮询间隔（秒）
+            max_interval: 最长轮询间隔（秒）
+            backoff: 每次轮询后间隔的增长倍数
+            timeout: 任务最长等待时间（秒）
+            poll_timeout: 查询任务状态的读取超时时间（秒）
+            max_workers: 提交任务和执行回调的线程数（查询线程数相同）
+        """
+        self.service = service
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.poll_timeout = poll_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr-task")
+        self.poll_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asr-poll")
+        self.condition = threading.Condition()
+        self._tasks: Dict[str, _AsrTask] = {}
+        self._poller: Optional[threading.Thread] = None
+
+        # 统计信息
+        self.submitted = 0
+        self.segments = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.polls = 0
+        self.total_seconds = 0.0
+
+    def submit(
+        self,
+        audio: bytes,
+        on_done: Callable[[Optional[str]], Any],
+        format: str = "wav",
+        sample_rate: int = 16000
+    ) -> str:
+        """提交识别任务（立即返回）
+
+        Args:
+            audio: 原始音频字节
+            on_done: 识别完成后调用（参数为识别文字，失败时为 None；在后台线程中执行，不能调用 Streamlit 接口）
+            format: 音频格式
+            sample_rate: 采样率
+
+        Returns:
+            任务句柄
+        """
+        task = _AsrTask(
+            handle=uuid.uuid4().hex,
+            audio=audio,
+            format=format,
+            sample_rate=sample_rate,
+            on_done=on_done,
+            scope=current_usage_scope(),
+            audio_seconds=self.service._estimate_audio_seconds(audio, format, sample_rate)
+        )
+        with self.condition:
+            self._tasks[task.handle] = task
+            self.submitted += 1
+
+        # 相同录音已识别过时不再提交
+        cache = self.service.cache
+        if cache is not None:
+            task.cache_key = asr_cache_key(audio, format, sample_rate, self.service.model)
+            cached = cache.get(task.cache_key)
+            if cached is not None:
+                with self.condition:
+                    self.cache_hits += 1
+                self._finish(task, "SUCCEEDED", cached)
+                return task.handle
+
+        submit_with_scope(self.executor, self._submit_task, task, scope=task.scope)
+        return task.handle
+
+    def _submit_task(self, task: _AsrTask):
+        """上传音频（长语音逐段上传）并登记轮询（在提交线程池中执行）"""
+        segments, segment_rate = self.service.split_long_audio(task.audio, task.format, task.sample_rate)
+        segment_format = task.format if len(segments) == 1 else "wav"
+        task_ids = []
+        try:
+            for segment in segments:
+                task_ids.append(self.service.submit_task(segment, segment_format, segment_rate))
+        except Exception as e:
+            # 已提交的分段在服务端照常完成，结果不再取回
+            print(f"提交语音识别任务出错: {str(e)}")
+            task.task_ids = task_ids
+            self._finish(task, "FAILED", None)
+            return
+
+        with self.condition:
+            # 上传完成后不再持有音频
+            task.audio = None
+            task.task_ids = task_ids
+            self.segments += len(task_ids)
+            task.status = "PENDING"
+            task.interval = self.initial_interval
+            task.next_poll_at = time.monotonic() + task.interval
+            self._ensure_poller()
+            self.condition.notify()
+
+    def _ensure_poller(self):
+        """启动后台轮询线程（调用方持有锁）"""
+        if self._poller is None or not self._poller.is_alive():
+            self._poller = threading.Thread(target=self._run, name="asr-task-poller", daemon=True)
+            self._poller.start()
+
+    def _run(self):
+        """后台轮询线程：等到最早的任务到期，把到期任务交给查询线程池"""
+        while True:
+            with self.condition:
+                while True:
+                    waiting = [
+                        task for task in self._tasks.values()
+                        if task.task_ids and not task.polling and task.status not in _FINAL_STATUSES
+                    ]
+                    if not waiting:
+                        self.condition.wait()
+                        continue
+                    wait = min(task.next_poll_at for task in waiting) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self.condition.wait(timeout=wait)
+                now = time.monotonic()
+                due = [task for task in waiting if task.next_poll_at <= now]
+                for task in due:
+                    task.polling = True
+
+            for task in due:
+                self.poll_executor.submit(self._poll, task)
+
+    def _poll(self, task: _AsrTask):
+        """查询一次各段尚未结束的服务端任务，全部结束后合并结果，否则按退避推迟下一次查询"""
+        status = task.status
+        for task_id in [task_id for task_id in task.task_ids if task_id not in task.results]:
+            try:
+                status, text, billed_seconds = self.service.fetch_task(task_id, read_timeout=self.poll_timeout)
+            except Exception as e:
+                # 查询失败视为暂时性错误，按退避稍后重试
+                print(f"查询语音识别任务出错: {str(e)}")
+                continue
+
+            with self.condition:
+                task.polls += 1
+                self.polls += 1
+                if status in _FINAL_STATUSES:
+                    task.results[task_id] = text if status == "SUCCEEDED" else None
+                    task.billed_seconds += billed_seconds or 0.0
+
+        if len(task.results) == len(task.task_ids):
+            texts = [task.results[task_id] for task_id in task.task_ids]
+            failed = sum(1 for text in texts if not text)
+            if failed == len(texts):
+                self._finish(task, "FAILED", None)
+                return
+            if failed:
+                print(f"长语音有 {failed}/{len(texts)} 段识别失败，结果可能不完整")
+            text = texts[0] if len(texts) == 1 else merge_transcripts(texts)
+            self._finish(task, "SUCCEEDED", text)
+            return
+        if time.monotonic() - task.submitted_at > self.timeout:
+            print(f"语音识别任务超时: {', '.join(task.task_ids)}")
+            self._finish(task, "FAILED", None)
+            return
+
+        with self.condition:
+            if status not in _FINAL_STATUSES:
+                task.status = status
+            task.interval = min(self.max_interval, task.interval * self.backoff)
+            task.next_poll_at = time.monotonic() + task.interval
+            task.polling = False
+            self.condition.notify()
+
+    def _finish(self, task: _AsrTask, status: str, text: Optional[str]):
+        """任务结束：记录用量、写入缓存，并在线程池中调用回调"""
+        elapsed = time.monotonic() - task.submitted_at
+        succeeded = status == "SUCCEEDED" and bool(text)
+        with self.condition:
+            task.status = status
+            task.audio = None
+            self._tasks.pop(task.handle, None)
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.total_seconds += elapsed
+
+        if task.task_ids:
+            with usage_scope(task.scope.room_id, task.scope.user, task.scope.call_site):
+                self.service.usage.record_asr(
+                    self.service.model,
+                    float(task.billed_seconds or task.audio_seconds),
+                    elapsed,
+                    error=not succeeded
+                )
+            if succeeded and task.cache_key is not None:
+                self.service.cache.put(task.cache_key, text)
+
+        submit_with_scope(self.executor, self._callback, task, text if succeeded else None, scope=task.scope)
+
+    @staticmethod
+    def _callback(task: _AsrTask, text: Optional[str]):
+        """调用任务回调"""
+        try:
+            task.on_done(text)
+        except Exception as e:
+            print(f"语音识别任务回调出错: {str(e)}")
+
+    def pending_count(self) -> int:
+        """获取尚未完成的任务数"""
+        with self.condition:
+            return len(self._tasks)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取任务统计信息"""
+        with self.condition:
+            finished = self.succeeded + self.failed
+            return {
+                "pending": len(self._tasks),
+                "submitted": self.submitted,
+                "segments": self.segments,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "cache_hits": self.cache_hits,
+                "polls": self.polls,
+                "avg_polls": round(self.polls / finished, 2) if finished else 0.0,
+                "avg_seconds": round(self.total_seconds / finished, 4) if finished else 0.0
+            }
+
+
+# 全局异步识别任务管理实例
+_asr_task_poller: Optional[AsrTaskPoller] = None
+_asr_task_poller_lock = threading.Lock()
+
+
+def get_asr_task_poller() -> AsrTaskPoller:
+    """获取异步语音识别任务管理实例（单例）"""
+    global _asr_task_poller
+    with _asr_task_poller_lock:
+        if _asr_task_poller is None:
+            settings = get_settings()
+            _asr_task_poller = AsrTaskPoller(
+                service=get_speech_recognition_service(),
+                initial_interval=settings.asr_poll_initial_interval,
+                max_interval=settings.asr_poll_max_interval,
+                timeout=settings.asr_task_timeout,
+                poll_timeout=settings.asr_poll_timeout,
+                max_workers=settings.asr_task_workers
+            )
+        return _asr_task_poller
@@ -0,0 +1,252 @@
+"""语音预处理 - 上传识别前解码 WAV、转单声道、重采样并裁剪首尾静音"""
+
+import io
+import threading
+import wave
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import get_settings
+
+
+@dataclass(frozen=True)
+class PreprocessResult:
+    """预处理结果
+
+    Attributes:
+        audio: 处理后的音频（16 位单声道 WAV；无法处理时为原始音频）
+        sample_rate: 处理后的采样率
+        original_bytes: 原始音频字节数
+        processed_bytes: 处理后的音频字节数
+        original_seconds: 原始音频时长（秒）
+        processed_seconds: 处理后的音频时长（秒）
+    """
+    audio: bytes
+    sample_rate: int
+    original_bytes: int
+    processed_bytes: int
+    original_seconds: float
+    processed_seconds: float
+
+    @property
+    def bytes_saved(self) -> int:
+        """节省的字节数"""
+        return self.original_bytes - self.processed_bytes
+
+
+def decode_wav(audio: bytes) -> Tuple[np.ndarray, int]:
+    """解码 WAV 为 float32 采样（形状为 (帧数, 声道数)，取值 -1~1）
+
+    Raises:
+        wave.Error: 不是受支持的 PCM WAV
+    """
+    with wave.open(io.BytesIO(audio), "rb") as reader:
+        channels = reader.getnchannels()
+        sample_width = reader.getsampwidth()
+        sample_rate = reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # 24 位：补一个低位字节后按 32 位整数解释
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((packed.shape[0], 4), dtype=np.uint8)
+        padded[:, 1:] = packed
+        samples = padded.view("<i4").reshape(-1).astype(np.float32) / 2147483648.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise wave.Error(f"不支持的采样位宽: {sample_width}")
+
+    frame_count = len(samples) // channels
+    return samples[:frame_count * channels].reshape(frame_count, channels), sample_rate
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """将单声道 float32 采样编码为 16 位 WAV"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """线性插值重采样（降采样前先做滑动平均低通，减少混叠）"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    if source_rate > target_rate:
+        width = int(np.ceil(source_rate / target_rate))
+        if width > 1:
+            samples = np.convolve(samples, np.full(width, 1.0 / width, dtype=np.float32), mode="same")
+    output_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(output_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 20,
+    threshold_db: float = -35.0,
+    padding_ms: int = 200
+) -> np.ndarray:
+    """按帧能量裁剪首尾静音（中间的停顿保留）
+
+    阈值只相对最响帧计算：与最响帧相差不超过 threshold_db 的帧一律视为语音，
+    较轻的语句（如说话人离麦克风变远）不会被当作静音裁掉。
+
+    Args:
+        samples: 单声道采样
+        sample_rate: 采样率
+        frame_ms: 分帧时长（毫秒）
+        threshold_db: 相对最响帧的能量阈值（dB），低于阈值的帧视为静音
+        padding_ms: 语音段前后保留的时长（毫秒）
+
+    Returns:
+        裁剪后的采样；整段都是静音时原样返回
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return samples
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    peak_db = energy_db.max()
+    if peak_db < -60.0:
+        return samples
+    voiced = np.flatnonzero(energy_db >= peak_db + threshold_db)
+
+    padding = int(np.ceil(padding_ms / frame_ms))
+    start = max(0, voiced[0] - padding) * frame_length
+    end_frame = voiced[-1] + 1 + padding
+    end = len(samples) if end_frame >= frame_count else end_frame * frame_length
+    return samples[start:end]
+
+
+class AudioPreprocessor:
+    """语音预处理
+
+    上传识别前将 WAV 解码、混合为单声道、重采样到识别服务要求的采样率，
+    并按能量裁剪首尾静音，缩小上传体积、缩短识别时间。
+    """
+
+    def __init__(
+        self,
+        target_sample_rate: int = 16000,
+        trim: bool = True,
+        threshold_db: float = -35.0,
+        padding_ms: int = 200
+    ):
+        """初始化预处理
+
+        Args:
+            target_sample_rate: 目标采样率
+            trim: 是否裁剪首尾静音
+            threshold_db: 静音判定阈值（相对最响帧，dB）
+            padding_ms: 语音段前后保留的时长（毫秒）
+        """
+        self.target_sample_rate = target_sample_rate
+        self.trim = trim
+        self.threshold_db = threshold_db
+        self.padding_ms = padding_ms
+        self.lock = threading.Lock()
+
+        # 统计信息
+        self.processed = 0
+        self.skipped = 0
+        self.original_bytes = 0
+        self.processed_bytes = 0
+        self.trimmed_seconds = 0.0
+
+    def process(self, audio: bytes) -> PreprocessResult:
+        """预处理一段音频
+
+        Args:
+            audio: 原始音频字节（非 PCM WAV 时原样返回）
+
+        Returns:
+            预处理结果
+        """
+        try:
+            samples, sample_rate = decode_wav(audio)
+        except (wave.Error, EOFError, ValueError) as e:
+            print(f"音频不是可处理的 WAV，按原样上传: {str(e)}")
+            with self.lock:
+                self.skipped += 1
+            return PreprocessResult(audio, 0, len(audio), len(audio), 0.0, 0.0)
+
+        original_seconds = len(samples) / sample_rate if sample_rate else 0.0
+        mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+        mono = resample(mono, sample_rate, self.target_sample_rate)
+        if self.trim:
+            mono = trim_silence(
+                mono,
+                self.target_sample_rate,
+                threshold_db=self.threshold_db,
+                padding_ms=self.padding_ms
+            )
+        processed = encode_wav(mono, self.target_sample_rate)
+        processed_seconds = len(mono) / self.target_sample_rate
+
+        # 处理后反而更大（如原本就是低采样率）时使用原始音频
+        if len(processed) >= len(audio):
+            processed = audio
+            processed_seconds = original_seconds
+            result_rate = sample_rate
+        else:
+            result_rate = self.target_sample_rate
+
+        with self.lock:
+            self.processed += 1
+            self.original_bytes += len(audio)
+            self.processed_bytes += len(processed)
+            self.trimmed_seconds += original_seconds - processed_seconds
+
+        return PreprocessResult(
+            audio=processed,
+            sample_rate=result_rate,
+            original_bytes=len(audio),
+            processed_bytes=len(processed),
+            original_seconds=round(original_seconds, 3),
+            processed_seconds=round(processed_seconds, 3)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """获取累计节省的字节数和裁剪的时长"""
+        with self.lock:
+            return {
+                "processed": self.processed,
+                "skipped": self.skipped,
+                "original_bytes": self.original_bytes,
+                "processed_bytes": self.processed_bytes,
+                "bytes_saved": self.original_bytes - self.processed_bytes,
+                "trimmed_seconds": round(self.trimmed_seconds, 3)
+            }
+
+
+# 全局语音预处理实例
+_audio_preprocessor: Optional[AudioPreprocessor] = None
+
+
+def get_audio_preprocessor() -> AudioPreprocessor:
+    """获取语音预处理实例（单例）"""
+    global _audio_preprocessor
+    if _audio_preprocessor is None:
+        settings = get_settings()
+        _audio_preprocessor = AudioPreprocessor(
+            target_sample_rate=settings.asr_sample_rate,
+            trim=settings.audio_trim_silence,
+            threshold_db=settings.audio_vad_threshold_db,
+            padding_ms=settings.audio_vad_padding_ms
+        )
+    return _audio_preprocessor
@@ -0,0 +1,149 @@
+"""长语音分段 - 在静音处切分长音频（段间少量重叠），并合并各段识别结果"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import get_settings
+from .audio_preprocessing import decode_wav, encode_wav
+
+
+# 参与重叠比对的词：拉丁字母/数字单词，或单个其他文字字符（汉字、假名等）
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9\u00c0-\u024f']+|[^\sA-Za-z0-9\u00c0-\u024f'\W]")
+# 重叠部分至少这么多字符相同才去重（避免单个汉字的偶然相同）
+_MIN_OVERLAP_CHARS = 2
+
+
+def find_split_points(
+    samples: np.ndarray,
+    sample_rate: int,
+    max_segment_seconds: float,
+    frame_ms: int = 20
+) -> List[int]:
+    """在静音处选择切分点
+
+    每段不超过 max_segment_seconds；切分点取该段后半部分中能量最低的帧，
+    尽量落在句间停顿上，避免把一个词切成两半。
+
+    Args:
+        samples: 单声道采样
+        sample_rate: 采样率
+        max_segment_seconds: 每段最长时长（秒）
+        frame_ms: 分帧时长（毫秒）
+
+    Returns:
+        切分点（采样下标，升序，不含首尾）
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(samples) // frame_length
+    max_frames = max(2, int(max_segment_seconds * 1000 // frame_ms))
+    if frame_count <= max_frames:
+        return []
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy = np.mean(frames * frames, axis=1)
+
+    points = []
+    start = 0
+    while frame_count - start > max_frames:
+        window_start = start + max_frames // 2
+        window_end = start + max_frames
+        cut = window_start + int(np.argmin(energy[window_start:window_end]))
+        points.append(cut * frame_length)
+        start = cut
+    return points
+
+
+def split_wav(audio_bytes: bytes, max_segment_seconds: float, overlap_seconds: float) -> Tuple[List[bytes], int]:
+    """将长 WAV 在静音处切分为多段（相邻段重叠 overlap_seconds）
+
+    Args:
+        audio_bytes: WAV 音频字节
+        max_segment_seconds: 每段最长时长（秒）
+        overlap_seconds: 相邻段的重叠时长（秒），防止切分点附近的词丢失
+
+    Returns:
+        (各段 16 位单声道 WAV, 采样率)；不需要切分时只有一段，即原始音频
+
+    Raises:
+        wave.Error: 不是受支持的 PCM WAV
+    """
+    samples, sample_rate = decode_wav(audio_bytes)
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    points = find_split_points(mono, sample_rate, max_segment_seconds)
+    if not points:
+        return [audio_bytes], sample_rate
+
+    overlap = int(overlap_seconds * sample_rate)
+    bounds = [0] + points + [len(mono)]
+    segments = [
+        encode_wav(mono[max(0, start - overlap):end], sample_rate)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    return segments, sample_rate
+
+
+def _join(left: str, right: str) -> str:
+    """拼接两段文本（拉丁字母之间补空格）"""
+    if not left or not right:
+        return left + right
+    if left[-1].isascii() and right[0].isascii() and not left[-1].isspace() and not right[0].isspace():
+        return f"{left} {right}"
+    return left + right
+
+
+def merge_transcripts(texts: List[str], max_overlap_tokens: int = 8) -> str:
+    """按顺序合并各段识别结果，去掉重叠部分重复识别出的词
+
+    比较前一段末尾与后一段开头最多 max_overlap_tokens 个词（忽略大小写和标点），
+    取最长的相同部分，从后一段中删去。
+
+    Args:
+        texts: 各段识别结果（按时间顺序）
+        max_overlap_tokens: 最多比较的词数
+
+    Returns:
+        合并后的文本
+    """
+    merged = ""
+    for text in texts:
+        text = (text or "").strip()
+        if not text:
+            continue
+        previous = [match.group().lower() for match in _TOKEN_PATTERN.finditer(merged)][-max_overlap_tokens:]
+        following = list(_TOKEN_PATTERN.finditer(text))[:max_overlap_tokens]
+        following_tokens = [match.group().lower() for match in following]
+
+        cut = 0
+        for size in range(min(len(previous), len(following_tokens)), 0, -1):
+            if previous[-size:] == following_tokens[:size]:
+                if sum(len(token) for token in following_tokens[:size]) >= _MIN_OVERLAP_CHARS:
+                    cut = following[size - 1].end()
+                break
+
+        # 删去重复的词后，去掉后一段开头残留的标点
+        remainder = text[cut:].lstrip() if cut else text
+        if cut:
+            remainder = remainder.lstrip(",.!?;:，。！？；：、")
+        merged = _join(merged, remainder.lstrip())
+    return merged
+
+
+# 分段识别线程池（全局共享，限制同时进行的识别请求数）
+_segment_executor: Optional[ThreadPoolExecutor] = None
+_segment_executor_lock = threading.Lock()
+
+
+def get_segment_executor() -> ThreadPoolExecutor:
+    """获取分段识别线程池实例（单例）"""
+    global _segment_executor
+    with _segment_executor_lock:
+        if _segment_executor is None:
+            _segment_executor = ThreadPoolExecutor(
+                max_workers=get_settings().asr_segment_workers,
+                thread_name_prefix="asr-segment"
+            )
+        return _segment_executor
@@ -0,0 +1,99 @@
+"""音频暂存 - 按引用在工作流中传递音频，避免音频进入状态检查点"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class AudioClip:
+    """一段待识别的音频
+
+    Attributes:
+        data: 原始音频字节（不做 base64 编码）
+        format: 音频格式（wav、pcm 等）
+        sample_rate: 采样率
+    """
+    data: bytes
+    format: str = "wav"
+    sample_rate: int = 16000
+
+
+class AudioStore:
+    """进程内音频暂存
+
+    工作流状态只保存一个短小的引用字符串，检查点不会保留音频内容；
+    语音识别节点按引用取出音频后即释放。未被取走的音频超过 ttl 秒后清理，
+    防止工作流中途失败时音频一直占用内存。
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """初始化暂存
+
+        Args:
+            ttl: 音频最长保留时间（秒）
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._clips: Dict[str, Tuple[float, AudioClip]] = {}
+
+        # 统计信息
+        self.stored = 0
+        self.expired = 0
+
+    def _evict_expired(self):
+        """清理过期音频（调用方持有锁）"""
+        now = time.monotonic()
+        for ref in [ref for ref, (expires_at, _) in self._clips.items() if expires_at <= now]:
+            del self._clips[ref]
+            self.expired += 1
+
+    def put(self, data: bytes, format: str = "wav", sample_rate: int = 16000) -> str:
+        """暂存音频（保存的是同一个 bytes 对象，不复制）
+
+        Returns:
+            音频引用
+        """
+        ref = f"audio:{uuid.uuid4().hex}"
+        with self.lock:
+            self._evict_expired()
+            self._clips[ref] = (time.monotonic() + self.ttl, AudioClip(data, format, sample_rate))
+            self.stored += 1
+        return ref
+
+    def get(self, ref: str) -> Optional[AudioClip]:
+        """按引用读取音频（不释放）"""
+        with self.lock:
+            entry = self._clips.get(ref)
+        return entry[1] if entry else None
+
+    def pop(self, ref: str) -> Optional[AudioClip]:
+        """按引用取出音频并释放"""
+        with self.lock:
+            entry = self._clips.pop(ref, None)
+        return entry[1] if entry else None
+
+    def stats(self) -> Dict[str, Any]:
+        """获取暂存的音频数量和字节数"""
+        with self.lock:
+            self._evict_expired()
+            return {
+                "stored": self.stored,
+                "expired": self.expired,
+                "pending": len(self._clips),
+                "pending_bytes": sum(len(clip.data) for _, clip in self._clips.values())
+            }
+
+
+# 全局音频暂存实例
+_audio_store: Optional[AudioStore] = None
+
+
+def get_audio_store() -> AudioStore:
+    """获取音频暂存实例（单例）"""
+    global _audio_store
+    if _audio_store is None:
+        _audio_store = AudioStore()
+    return _audio_store
@@ -0,0 +1,220 @@
+"""快速翻译通道 - 无需调用LLM即可处理的简单消息"""
+
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+
+# 原样保留即可的内容
+_CODE_PATTERN = re.compile(r"```.*?```|`[^`\n]+`", re.DOTALL)
+_URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_MENTION_PATTERN = re.compile(r"@[\w\-.]+")
+_NUMBER_PATTERN = re.compile(r"[+\-]?\d[\d,.:/%\-]*")
+_EMOJI_PATTERN = re.compile("[\U0001F000-\U0001FAFF\u2190-\u21FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]")
+# 除数字外的字母类字符（包括中文等各类文字）
+_LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+_TRAILING_PUNCTUATION = "!！.。?？~～…"
+_PUNCTUATION_MAP = {
+    "zh": {"!": "！", ".": "。", "?": "？", "~": "～"},
+    "en": {"！": "!", "。": ".", "？": "?", "～": "~", "…": "..."},
+}
+
+# 常用短语双语词典（按语言对组织，键为小写、去除末尾标点后的文本）
+_PHRASES: Dict[Tuple[str, str], Dict[str, str]] = {
+    ("en", "zh"): {
+        "ok": "好的",
+        "okay": "好的",
+        "yes": "是的",
+        "yeah": "是的",
+        "no": "不",
+        "sure": "当然",
+        "thanks": "谢谢",
+        "thank you": "谢谢",
+        "thx": "谢谢",
+        "hi": "你好",
+        "hello": "你好",
+        "hey": "嗨",
+        "bye": "再见",
+        "goodbye": "再见",
+        "good morning": "早上好",
+        "good night": "晚安",
+        "got it": "收到",
+        "received": "收到",
+        "agreed": "同意",
+        "agree": "同意",
+        "sorry": "抱歉",
+        "no problem": "没问题",
+        "great": "太好了",
+        "nice": "不错",
+        "welcome": "欢迎",
+        "see you": "回头见",
+        "done": "完成了",
+        "right": "对",
+        "exactly": "没错",
+        "wait": "稍等",
+        "one moment": "稍等",
+    },
+    ("zh", "en"): {
+        "好": "OK",
+        "好的": "OK",
+        "好滴": "OK",
+        "行": "OK",
+        "可以": "OK",
+        "是的": "Yes",
+        "是": "Yes",
+        "对": "Right",
+        "对的": "Right",
+        "没错": "Exactly",
+        "不": "No",
+        "不是": "No",
+        "当然": "Sure",
+        "谢谢": "Thanks",
+        "谢谢你": "Thank you",
+        "多谢": "Thanks",
+        "你好": "Hello",
+        "大家好": "Hello everyone",
+        "嗨": "Hi",
+        "再见": "Bye",
+        "拜拜": "Bye",
+        "早上好": "Good morning",
+        "晚安": "Good night",
+        "收到": "Got it",
+        "明白": "Understood",
+        "明白了": "Understood",
+        "同意": "Agreed",
+        "抱歉": "Sorry",
+        "不好意思": "Sorry",
+        "没问题": "No problem",
+        "太好了": "Great",
+        "不错": "Nice",
+        "欢迎": "Welcome",
+        "回头见": "See you",
+        "完成了": "Done",
+        "稍等": "One moment",
+        "嗯": "Mm-hmm",
+    },
+}
+
+
+class FastPathTranslator:
+    """快速翻译通道
+
+    通过规则预分类识别无需LLM翻译的消息：纯表情、数字、链接、代码片段、@提及，
+    以及常用的单词/短语回复（查双语词典），直接给出结果，并统计节省的LLM调用次数。
+    """
+
+    def __init__(self):
+        """初始化快速翻译通道"""
+        self.lock = threading.Lock()
+        self.avoided_calls: Dict[str, int] = {}
+
+    def classify(self, text: str) -> Optional[str]:
+        """对消息进行预分类
+
+        Args:
+            text: 消息文本
+
+        Returns:
+            可原样保留的类别（"code"、"url"、"mention"、"number"、"emoji"、"symbol"），
+            需要翻译时返回 None
+        """
+        stripped = text.strip()
+        if not stripped:
+            return "symbol"
+
+        category = None
+        remaining = stripped
+        for name, pattern in (("code", _CODE_PATTERN), ("url", _URL_PATTERN), ("mention", _MENTION_PATTERN)):
+            remaining, count = pattern.subn(" ", remaining)
+            if count and category is None:
+                category = name
+
+        # 去除上述内容后不再包含任何文字，说明无需翻译
+        if _LETTER_PATTERN.search(remaining):
+            return None
+
+        if category is None:
+            if _NUMBER_PATTERN.search(remaining):
+                category = "number"
+            elif _EMOJI_PATTERN.search(remaining):
+                category = "emoji"
+            else:
+                category = "symbol"
+        return category
+
+    def lookup_phrase(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """在双语短语词典中查找常用回复
+
+        Args:
+            text: 消息文本
+            source_lang: 源语言
+            target_lang: 目标语言
+
+        Returns:
+            词典译文（保留原文末尾标点），未命中时返回 None
+        """
+        phrases = _PHRASES.get((source_lang, target_lang))
+        if not phrases:
+            return None
+
+        stripped = text.strip()
+        key = stripped.rstrip(_TRAILING_PUNCTUATION).strip().lower()
+        translated = phrases.get(key)
+        if translated is None:
+            return None
+
+        suffix = stripped[len(stripped.rstrip(_TRAILING_PUNCTUATION)):]
+        punctuation_map = _PUNCTUATION_MAP.get(target_lang, {})
+        return translated + "".join(punctuation_map.get(char, char) for char in suffix)
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """尝试不调用LLM直接翻译
+
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言
+            target_lang: 目标语言
+
+        Returns:
+            翻译结果；需要交给LLM处理时返回 None
+        """
+        category = self.classify(text)
+        if category is not None:
+            self._record(category)
+            return text
+
+        translated = self.lookup_phrase(text, source_lang, target_lang)
+        if translated is not None:
+            self._record("phrase")
+            return translated
+
+        return None
+
+    def _record(self, category: str):
+        """记录一次被省去的LLM调用"""
+        with self.lock:
+            self.avoided_calls[category] = self.avoided_calls.get(category, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息
+
+        Returns:
+            各类别省去的LLM调用次数，"total" 为合计
+        """
+        with self.lock:
+            stats = dict(self.avoided_calls)
+        stats["total"] = sum(stats.values())
+        return stats
+
+
+# 全局快速翻译通道实例
+_fast_path_translator: Optional[FastPathTranslator] = None
+
+
+def get_fast_path_translator() -> FastPathTranslator:
+    """获取快速翻译通道实例（单例）"""
+    global _fast_path_translator
+    if _fast_path_translator is None:
+        _fast_path_translator = FastPathTranslator()
+    return _fast_path_translator
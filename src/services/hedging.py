@@ -0,0 +1,276 @@
+"""对冲请求与调用截止时间 - 降低翻译的长尾延迟"""
+
+import contextvars
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from ..config.settings import get_settings
+from .rate_limiter import RateLimiter, get_rate_limiter
+
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+class DeadlineExceeded(Exception):
+    """调用超过截止时间仍未完成"""
+
+
+class LatencyTracker:
+    """滑动窗口延迟统计"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """初始化延迟统计
+
+        Args:
+            window: 保留的最近样本数
+            min_samples: 计算分位数所需的最少样本数
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """记录一次调用耗时"""
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """获取分位数（0~1），样本不足时返回 None"""
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class HedgedCaller:
+    """带截止时间的对冲调用器
+
+    首个请求在已观测到的 p95 延迟内未完成时，再发出一个相同的请求，
+    取先完成的结果；超过截止时间则抛出 DeadlineExceeded，由调用方执行降级策略。
+
+    延迟样本由调用方通过 record_latency 记录（只记模型往返时间，不含限流排队和
+    重试退避，否则限流时 p95 升高会触发更多对冲）。对冲请求在独立的小线程池中执行，
+    线程用满或限流器正在限流时不再对冲，避免在服务端过载时进一步加大压力。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        hedge_workers: int = 4,
+        hedge_quantile: float = 0.95,
+        limiter: Optional[RateLimiter] = None
+    ):
+        """初始化对冲调用器
+
+        Args:
+            max_workers: 执行首个请求的线程数
+            hedge_workers: 执行对冲请求的线程数（同时进行的对冲请求上限）
+            hedge_quantile: 触发对冲请求的延迟分位数
+            limiter: 限流器，正在限流时不发出对冲请求
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-call")
+        self.hedge_executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="hedged-call-hedge")
+        self.hedge_slots = threading.BoundedSemaphore(hedge_workers)
+        self.hedge_quantile = hedge_quantile
+        self.limiter = limiter
+        self.latency = LatencyTracker()
+        self.lock = threading.Lock()
+
+        # 统计信息
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.deadline_misses = 0
+        self.cancelled = 0
+
+    def _submit(self, func: Callable[..., T], *args: Any, executor: Optional[ThreadPoolExecutor] = None) -> Future:
+        """在后台线程中执行，保留当前上下文（LangChain 回调等依赖 contextvars）"""
+        context = contextvars.copy_context()
+        return (executor or self.executor).submit(context.run, func, *args)
+
+    def record_latency(self, seconds: float):
+        """记录一次模型往返耗时（用于计算触发对冲的延迟分位数）"""
+        self.latency.record(seconds)
+
+    def _hedge(self, func: Callable[[], T]) -> Optional[Future]:
+        """发出对冲请求；限流器正在限流或对冲线程已用满时返回 None"""
+        if self.limiter is not None and self.limiter.is_congested():
+            return None
+        if not self.hedge_slots.acquire(blocking=False):
+            return None
+        future = self._submit(func, executor=self.hedge_executor)
+        future.add_done_callback(lambda _: self.hedge_slots.release())
+        return future
+
+    def _cancel(self, futures: List[Future]):
+        """取消尚未开始执行的请求（已在执行的请求受 HTTP 超时约束）"""
+        cancelled = sum(1 for future in futures if future.cancel())
+        if cancelled:
+            with self.lock:
+                self.cancelled += cancelled
+
+    def call(self, func: Callable[[], T], deadline: Optional[float] = None, hedge: bool = True) -> T:
+        """执行调用
+
+        Args:
+            func: 实际的调用（可能被执行两次，必须是幂等的）
+            deadline: 截止时间（秒），None 表示不限制
+            hedge: 是否启用对冲请求
+
+        Returns:
+            先成功完成的调用结果
+
+        Raises:
+            DeadlineExceeded: 超过截止时间仍未完成
+        """
+        with self.lock:
+            self.calls += 1
+        start = time.monotonic()
+        end = start + deadline if deadline else None
+        hedge_delay = self.latency.percentile(self.hedge_quantile) if hedge else None
+
+        pending: List[Future] = [self._submit(func)]
+        primary = pending[0]
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            now = time.monotonic()
+            timeouts = []
+            if end is not None:
+                timeouts.append(end - now)
+            if hedge_delay is not None and not hedged:
+                timeouts.append(start + hedge_delay - now)
+            timeout = max(0.0, min(timeouts)) if timeouts else None
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                error = future.exception()
+                if error is None:
+                    if future is not primary:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    self._cancel(pending)
+                    return future.result()
+                last_error = error
+
+            if done:
+                continue
+
+            now = time.monotonic()
+            if end is not None and now >= end:
+                self._cancel(pending)
+                with self.lock:
+                    self.deadline_misses += 1
+                raise DeadlineExceeded(f"调用超过截止时间 {deadline} 秒")
+            if hedge_delay is not None and not hedged and now >= start + hedge_delay:
+                hedged = True
+                future = self._hedge(func)
+                with self.lock:
+                    if future is None:
+                        self.hedges_skipped += 1
+                    else:
+                        self.hedges += 1
+                if future is not None:
+                    pending.append(future)
+
+        raise last_error
+
+    def stream(self, iterator: Iterator[T], first_item_deadline: Optional[float] = None) -> Iterator[T]:
+        """在后台线程中消费迭代器，首个元素需在截止时间内到达
+
+        流式输出一旦开始，用户就能看到进度，因此截止时间只约束首个元素。
+        超过截止时间后不再等待，但正阻塞在源迭代器上的后台线程无法从外部中断，
+        会一直占用一个线程直到源迭代器返回；源迭代器应自行限制读取耗时
+        （翻译服务以截止时间作为流式请求的读取超时）。
+
+        Args:
+            iterator: 源迭代器
+            first_item_deadline: 首个元素的截止时间（秒），None 表示不限制
+
+        Yields:
+            源迭代器的元素
+
+        Raises:
+            DeadlineExceeded: 首个元素未在截止时间内到达
+        """
+        items: "queue.Queue[Any]" = queue.Queue()
+        stopped = threading.Event()
+
+        def produce():
+            try:
+                for item in iterator:
+                    if stopped.is_set():
+                        break
+                    items.put(item)
+                items.put(_STREAM_END)
+            except BaseException as e:
+                items.put(e)
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        producer = self._submit(produce)
+        try:
+            timeout = first_item_deadline
+            while True:
+                try:
+                    item = items.get(timeout=timeout)
+                except queue.Empty:
+                    self._cancel([producer])
+                    with self.lock:
+                        self.deadline_misses += 1
+                    raise DeadlineExceeded(f"首个输出超过截止时间 {first_item_deadline} 秒")
+                timeout = None
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        with self.lock:
+            stats = {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedges_skipped": self.hedges_skipped,
+                "deadline_misses": self.deadline_misses,
+                "cancelled": self.cancelled
+            }
+        stats["p50_seconds"] = self.latency.percentile(0.5)
+        stats["p95_seconds"] = self.latency.percentile(0.95)
+        return stats
+
+
+# 全局对冲调用器实例
+_hedged_caller: Optional[HedgedCaller] = None
+_hedged_caller_lock = threading.Lock()
+
+
+def get_hedged_caller() -> HedgedCaller:
+    """获取对冲调用器实例（单例）"""
+    global _hedged_caller
+    with _hedged_caller_lock:
+        if _hedged_caller is None:
+            settings = get_settings()
+            _hedged_caller = HedgedCaller(
+                max_workers=settings.translation_max_workers,
+                hedge_workers=settings.translation_hedge_workers,
+                limiter=get_rate_limiter()
+            )
+        return _hedged_caller
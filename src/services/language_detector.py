@@ -0,0 +1,101 @@
+"""语言检测 - 基于预编译字符类正则的文字统计"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+from .latin_language_id import get_latin_language_identifier
+
+
+# 汉字（基本区、扩展 A~G、兼容汉字）
+_HAN_PATTERN = re.compile(
+    "[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002ebef\U00030000-\U0003134f]"
+)
+# 日文假名（平假名、片假名、片假名扩展、半角片假名）
+_KANA_PATTERN = re.compile("[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]")
+# 韩文（音节、字母、兼容字母）
+_HANGUL_PATTERN = re.compile("[\uac00-\ud7af\u1100-\u11ff\u3130-\u318f]")
+# 拉丁字母单词（含带附加符号的字母）
+_LATIN_WORD_PATTERN = re.compile("[A-Za-z\u00c0-\u024f]+")
+
+# 一个拉丁单词相当于多少个汉字（用于比较中英文的占比）
+_LATIN_WORD_WEIGHT = 1.5
+# 中英文中占比较少的一方达到该比例时视为混合语言
+_MIXED_MIN_SHARE = 0.3
+# 拉丁字母文本至少包含这么多单词时才区分英、法、德、西语（过短的文本默认英语）
+_LATIN_ID_MIN_WORDS = 2
+# 识别为英语以外的拉丁字母语言所需的最小平均对数似然差（每个 n-gram，相对英语）；
+# 后验概率在短文本上几乎总是接近 1，不能用作门限
+_LATIN_ID_MIN_MARGIN = 0.5
+
+
+@dataclass(frozen=True)
+class LanguageDetection:
+    """语言检测结果
+
+    Attributes:
+        lang: 检测到的语言（zh/ja/ko/en/fr/de/es），中英混合时为 "mixed"，没有文字时为 "unknown"
+        confidence: 置信度（0~1，主要文字在全部文字中的占比）
+        primary: 占比最高的具体语言（lang 为 mixed/unknown 时用作翻译的源语言）
+    """
+    lang: str
+    confidence: float
+    primary: str
+
+
+@lru_cache(maxsize=4096)
+def detect_language(text: str, candidates: Optional[FrozenSet[str]] = None) -> LanguageDetection:
+    """检测文本语言（结果按文本缓存，同一条消息多次检测只计算一次）
+
+    每种文字用一个预编译正则统计数量；含假名的视为日文，含韩文字母的视为韩文，
+    中文与拉丁文字按加权占比判断，两者都占相当比例时返回 "mixed"。
+    拉丁字母为主的文本再用字符 n-gram 朴素贝叶斯模型区分英、法、德、西语：
+    只在候选语言中选择，且与英语的平均对数似然差足够大时才认定为其他语言。
+
+    Args:
+        text: 要检测的文本
+        candidates: 会议室使用的语言（None 表示不限制），不在其中的法、德、西语不会被选中
+
+    Returns:
+        语言检测结果
+    """
+    latin_word_list = _LATIN_WORD_PATTERN.findall(text)
+    latin_words = len(latin_word_list)
+    scores = {
+        "zh": float(len(_HAN_PATTERN.findall(text))),
+        "ja": float(len(_KANA_PATTERN.findall(text))),
+        "ko": float(len(_HANGUL_PATTERN.findall(text))),
+        "en": latin_words * _LATIN_WORD_WEIGHT,
+    }
+    # 日文中的汉字计入日文
+    if scores["ja"]:
+        scores["ja"] += scores["zh"]
+        scores["zh"] = 0.0
+
+    total = sum(scores.values())
+    if not total:
+        return LanguageDetection("unknown", 0.0, "en")
+
+    primary = max(scores, key=scores.get)
+    confidence = scores[primary] / total
+    mixed = False
+    if scores["zh"] and scores["en"]:
+        mixed = min(scores["zh"], scores["en"]) / (scores["zh"] + scores["en"]) >= _MIXED_MIN_SHARE
+
+    if primary == "en" and latin_words >= _LATIN_ID_MIN_WORDS:
+        identifier = get_latin_language_identifier()
+        latin_candidates = [
+            lang for lang in identifier.languages
+            if lang == "en" or candidates is None or lang in candidates
+        ]
+        if len(latin_candidates) > 1:
+            # 只对拉丁字母单词打分，避免其他文字干扰
+            latin_text = " ".join(latin_word_list)
+            latin_lang, probability = identifier.predict(latin_text, latin_candidates)
+            if latin_lang == "en" or identifier.margin(latin_text, latin_lang, "en") >= _LATIN_ID_MIN_MARGIN:
+                primary = latin_lang
+                confidence *= probability
+
+    confidence = round(confidence, 3)
+    return LanguageDetection("mixed" if mixed else primary, confidence, primary)
@@ -0,0 +1,174 @@
+"""拉丁字母语言识别 - 字符 n-gram 朴素贝叶斯（英语、法语、德语、西班牙语）"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# 模型表：各语言的字符 n-gram 对数概率（离线统计生成，随代码发布，不需要网络）
+_TABLE_PATH = os.path.join(os.path.dirname(__file__), "latin_language_id.json")
+
+# 非字母字符统一视为单词边界
+_NON_LETTER_PATTERN = re.compile(r"[^\w]|[\d_]+")
+_SPACES_PATTERN = re.compile(r"\s+")
+
+
+def extract_ngrams(text: str, max_n: int = 3) -> List[str]:
+    """提取字符 n-gram（1~max_n 元，小写，单词前后补空格）
+
+    Args:
+        text: 文本
+        max_n: 最大 n
+
+    Returns:
+        n-gram 列表（包含重复）
+    """
+    normalized = _SPACES_PATTERN.sub(" ", _NON_LETTER_PATTERN.sub(" ", text.lower())).strip()
+    if not normalized:
+        return []
+    padded = f" {normalized} "
+    grams = []
+    for n in range(1, max_n + 1):
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    # 单独的空格不提供信息
+    return [gram for gram in grams if gram.strip()]
+
+
+class LatinLanguageIdentifier:
+    """拉丁字母语言识别器
+
+    对文本的字符 n-gram 计数，与各语言的对数概率矩阵相乘得到每种语言的得分，
+    再归一化为后验概率。多条文本可组成计数矩阵一次完成打分。
+    """
+
+    def __init__(self, languages: Sequence[str], ngrams: Sequence[str], log_probs: np.ndarray, max_n: int = 3):
+        """初始化识别器
+
+        Args:
+            languages: 语言代码列表
+            ngrams: n-gram 词表
+            log_probs: 形状为 (语言数, 词表大小) 的对数概率矩阵
+            max_n: 最大 n
+        """
+        self.languages = list(languages)
+        self.vocabulary: Dict[str, int] = {gram: index for index, gram in enumerate(ngrams)}
+        self.log_probs = np.ascontiguousarray(log_probs, dtype=np.float32)
+        self.max_n = max_n
+
+    @classmethod
+    def load(cls, path: str = _TABLE_PATH) -> "LatinLanguageIdentifier":
+        """从模型表文件加载"""
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return cls(
+            languages=table["languages"],
+            ngrams=table["ngrams"],
+            log_probs=np.array(table["log_probs"], dtype=np.float32),
+            max_n=table["max_n"]
+        )
+
+    def _indices(self, text: str) -> List[int]:
+        """文本中出现在词表里的 n-gram 下标"""
+        vocabulary = self.vocabulary
+        return [vocabulary[gram] for gram in extract_ngrams(text, self.max_n) if gram in vocabulary]
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        """批量计算各语言的后验概率
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            形状为 (文本数, 语言数) 的概率矩阵；没有可识别 n-gram 的文本各语言概率相同
+        """
+        counts = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices = self._indices(text)
+            if indices:
+                counts[row] = np.bincount(indices, minlength=len(self.vocabulary))
+        log_likelihood = counts @ self.log_probs.T
+        log_likelihood -= log_likelihood.max(axis=1, keepdims=True)
+        probs = np.exp(log_likelihood)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def _candidate_rows(self, candidates: Optional[Sequence[str]]) -> List[int]:
+        """候选语言在概率矩阵中的行号（None 表示全部语言）"""
+        if candidates is None:
+            return list(range(len(self.languages)))
+        rows = [index for index, lang in enumerate(self.languages) if lang in candidates]
+        return rows or list(range(len(self.languages)))
+
+    def predict(self, text: str, candidates: Optional[Sequence[str]] = None) -> Tuple[str, float]:
+        """识别单条文本
+
+        Args:
+            text: 文本
+            candidates: 候选语言（None 表示全部语言）
+
+        Returns:
+            (语言代码, 候选语言中的后验概率)
+        """
+        rows = self._candidate_rows(candidates)
+        indices = self._indices(text)
+        if not indices:
+            return self.languages[rows[0]], 1.0 / len(rows)
+        # 单条文本直接按下标累加对数概率，避免构造计数矩阵
+        log_likelihood = self.log_probs[np.ix_(rows, indices)].sum(axis=1)
+        log_likelihood -= log_likelihood.max()
+        probs = np.exp(log_likelihood)
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.languages[rows[best]], float(probs[best])
+
+    def margin(self, text: str, lang: str, baseline: str) -> float:
+        """lang 相对 baseline 的平均对数似然差（每个 n-gram）
+
+        后验概率在短文本上也几乎总是接近 1，不能作为置信度；这里按文本的全部 n-gram 数
+        （包括词表外、不提供证据的 n-gram）归一化，人名、外来词等证据不足的短文本差值很小。
+
+        Args:
+            text: 文本
+            lang: 要比较的语言
+            baseline: 基准语言
+
+        Returns:
+            平均对数似然差；没有可识别 n-gram 时为 0
+        """
+        total = len(extract_ngrams(text, self.max_n))
+        indices = self._indices(text)
+        if not total or not indices:
+            return 0.0
+        row = self.languages.index(lang)
+        baseline_row = self.languages.index(baseline)
+        difference = self.log_probs[row, indices].sum() - self.log_probs[baseline_row, indices].sum()
+        return float(difference) / total
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """批量识别
+
+        Returns:
+            与 texts 一一对应的 (语言代码, 概率)
+        """
+        if not texts:
+            return []
+        probs = self.scores(texts)
+        best = probs.argmax(axis=1)
+        return [
+            (self.languages[index], float(probs[row, index]))
+            for row, index in enumerate(best)
+        ]
+
+
+# 全局识别器实例
+_latin_language_identifier: Optional[LatinLanguageIdentifier] = None
+
+
+def get_latin_language_identifier() -> LatinLanguageIdentifier:
+    """获取拉丁字母语言识别器实例（单例）"""
+    global _latin_language_identifier
+    if _latin_language_identifier is None:
+        _latin_language_identifier = LatinLanguageIdentifier.load()
+    return _latin_language_identifier
@@ -0,0 +1,146 @@
+"""翻译模型分级路由 - 按长度和内容复杂度选择模型"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from langchain_openai import ChatOpenAI
+
+from ..config.settings import get_model, get_settings
+
+
+# 句子结束符（中英文）
+_SENTENCE_END_PATTERN = re.compile(r"[.!?。！？；;]+(?=\s|$)|[。！？；]")
+
+
+@dataclass
+class TierStats:
+    """单个模型等级的统计信息"""
+    model_name: str
+    price_per_1k_tokens: float = 0.0
+    calls: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（包含平均延迟和估算费用）"""
+        total_tokens = self.input_tokens + self.output_tokens
+        return {
+            "model_name": self.model_name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency_seconds": round(self.total_latency / self.calls, 4) if self.calls else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_cost": round(total_tokens / 1000 * self.price_per_1k_tokens, 6)
+        }
+
+
+class ModelRouter:
+    """翻译模型路由
+
+    短小、简单的消息使用快速廉价的模型（"fast"），较长或结构复杂的消息使用主模型（"main"）。
+    每个等级使用各自缓存的模型客户端，并分别统计延迟、token 用量和费用。
+    """
+
+    FAST = "fast"
+    MAIN = "main"
+
+    def __init__(
+        self,
+        fast_model_name: str,
+        main_model_name: str,
+        short_max_chars: int = 50,
+        max_simple_sentences: int = 1,
+        fast_price_per_1k_tokens: float = 0.0,
+        main_price_per_1k_tokens: float = 0.0
+    ):
+        """初始化模型路由
+
+        Args:
+            fast_model_name: 快速模型名称
+            main_model_name: 主模型名称
+            short_max_chars: 使用快速模型的最大字符数
+            max_simple_sentences: 使用快速模型的最大句子数
+            fast_price_per_1k_tokens: 快速模型每千 token 单价（用于估算费用）
+            main_price_per_1k_tokens: 主模型每千 token 单价（用于估算费用）
+        """
+        self.short_max_chars = short_max_chars
+        self.max_simple_sentences = max_simple_sentences
+        self.lock = threading.Lock()
+        self.tiers: Dict[str, TierStats] = {
+            self.FAST: TierStats(fast_model_name, fast_price_per_1k_tokens),
+            self.MAIN: TierStats(main_model_name, main_price_per_1k_tokens),
+        }
+
+    def select(self, text: str) -> str:
+        """根据文本长度和复杂度选择模型等级
+
+        Args:
+            text: 要翻译的文本
+
+        Returns:
+            "fast" 或 "main"
+        """
+        stripped = text.strip()
+        if len(stripped) > self.short_max_chars:
+            return self.MAIN
+        # 多行文本（列表、代码等）或多个句子视为复杂内容
+        if "\n" in stripped or "`" in stripped:
+            return self.MAIN
+        if len(_SENTENCE_END_PATTERN.findall(stripped)) > self.max_simple_sentences:
+            return self.MAIN
+        return self.FAST
+
+    def model(self, tier: str) -> ChatOpenAI:
+        """获取等级对应的模型客户端（按模型名称缓存）"""
+        return get_model(self.tiers[tier].model_name)
+
+    def record(self, tier: str, latency: float, usage: Optional[Dict[str, Any]] = None):
+        """记录一次成功调用
+
+        Args:
+            tier: 模型等级
+            latency: 调用耗时（秒）
+            usage: 模型返回的 usage_metadata
+        """
+        with self.lock:
+            stats = self.tiers[tier]
+            stats.calls += 1
+            stats.total_latency += latency
+            if usage:
+                stats.input_tokens += usage.get("input_tokens", 0)
+                stats.output_tokens += usage.get("output_tokens", 0)
+
+    def record_error(self, tier: str):
+        """记录一次失败调用"""
+        with self.lock:
+            self.tiers[tier].errors += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各等级的统计信息"""
+        with self.lock:
+            return {tier: stats.to_dict() for tier, stats in self.tiers.items()}
+
+
+# 全局模型路由实例
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """获取模型路由实例（单例）"""
+    global _model_router
+    if _model_router is None:
+        settings = get_settings()
+        _model_router = ModelRouter(
+            fast_model_name=settings.fast_model_name,
+            main_model_name=settings.model_name,
+            short_max_chars=settings.fast_model_max_chars,
+            max_simple_sentences=settings.fast_model_max_sentences,
+            fast_price_per_1k_tokens=settings.fast_model_price,
+            main_price_per_1k_tokens=settings.model_price
+        )
+    return _model_router
@@ -0,0 +1,85 @@
+"""翻译提示词模板 - 按语言对预先构建、带版本号的系统消息"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+from langchain_core.messages import SystemMessage
+
+from ..config.languages import get_language_name
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """带版本号的提示词模板
+
+    修改模板内容时必须同时修改版本号：版本号参与翻译记忆等缓存的键，
+    旧版本提示词产生的译文不会被新版本复用。
+    """
+    name: str
+    version: str
+    text: str
+
+    def format(self, **kwargs: str) -> str:
+        """填充模板"""
+        return self.text.format(**kwargs)
+
+
+TRANSLATION_PROMPT = PromptTemplate(
+    name="translation",
+    version="1",
+    text="""你是一个专业的翻译助手。请将用户输入的文本从{source_lang_name}翻译成{target_lang_name}。
+
+要求：
+1. 保持原文的语气和风格
+2. 确保翻译准确、自然
+3. 只返回翻译结果，不要添加任何解释或说明
+4. 如果输入已经是目标语言，直接返回原文"""
+)
+
+MULTI_TRANSLATION_PROMPT = PromptTemplate(
+    name="multi_translation",
+    version="1",
+    text="""你是一个专业的翻译助手。请将用户输入的文本从{source_lang_name}分别翻译成{target_list}。
+
+要求：
+1. 保持原文的语气和风格
+2. 确保翻译准确、自然
+3. 以 JSON 对象返回结果，键为语言代码（{codes}），值为对应语言的译文
+4. 只返回 JSON 对象，不要添加任何解释或说明"""
+)
+
+# 翻译提示词的整体版本（用于缓存键）
+PROMPT_VERSION = f"{TRANSLATION_PROMPT.version}.{MULTI_TRANSLATION_PROMPT.version}"
+
+
+@lru_cache(maxsize=None)
+def translation_system_message(source_lang: str, target_lang: str) -> SystemMessage:
+    """获取单语言翻译的系统消息
+
+    每个语言对只构建一次，后续调用返回同一个对象（调用方不得修改），
+    请求前缀逐字节一致，便于服务端复用提示词缓存。
+
+    Args:
+        source_lang: 源语言代码
+        target_lang: 目标语言代码
+    """
+    return SystemMessage(content=TRANSLATION_PROMPT.format(
+        source_lang_name=get_language_name(source_lang),
+        target_lang_name=get_language_name(target_lang)
+    ))
+
+
+@lru_cache(maxsize=None)
+def multi_translation_system_message(source_lang: str, target_langs: Tuple[str, ...]) -> SystemMessage:
+    """获取多语言翻译的系统消息（每种语言组合只构建一次，调用方不得修改）
+
+    Args:
+        source_lang: 源语言代码
+        target_langs: 目标语言代码（按顺序）
+    """
+    return SystemMessage(content=MULTI_TRANSLATION_PROMPT.format(
+        source_lang_name=get_language_name(source_lang),
+        target_list="、".join(f"{get_language_name(code)}（{code}）" for code in target_langs),
+        codes=", ".join(f'"{code}"' for code in target_langs)
+    ))
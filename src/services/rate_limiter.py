@@ -0,0 +1,320 @@
+"""DashScope 调用限流 - 令牌桶、自适应并发与退避重试"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+import openai
+import requests
+
+from ..config.settings import get_settings
+
+
+T = TypeVar("T")
+
+
+class RetryableError(Exception):
+    """可重试的服务端错误（如 HTTP 429、5xx）"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitTimeout(Exception):
+    """排队等待超过上限仍未获得调用许可"""
+
+
+# 视为过载/可重试的异常类型
+_RETRYABLE_EXCEPTIONS = (
+    RetryableError,
+    TimeoutError,
+    ConnectionError,
+    requests.Timeout,
+    requests.ConnectionError,
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """令牌桶（按分钟配额匀速补充）"""
+
+    def __init__(self, per_minute: float):
+        """初始化令牌桶
+
+        Args:
+            per_minute: 每分钟配额，同时也是桶容量
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        """按经过的时间补充令牌"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.available = min(self.capacity, self.available + elapsed * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """获取 amount 个令牌还需等待的秒数（0 表示可立即获取）"""
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float):
+        """消耗令牌"""
+        self.available -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        """退还令牌（amount 为负数时追加扣除）"""
+        self.available = min(self.capacity, self.available + amount)
+
+
+class RateLimiter:
+    """客户端限流器
+
+    - 令牌桶限制每分钟请求数和 token 数
+    - AIMD 自适应并发：成功时并发上限缓慢增加，遇到限流/超时时减半
+    - 可重试错误按带抖动的指数退避重试
+    - 突发请求在队列中短暂等待，而不是直接失败
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 100000,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_wait: float = 10.0,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0
+    ):
+        """初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟最大请求数
+            tokens_per_minute: 每分钟最大 token 数
+            max_concurrency: 并发上限的最大值
+            min_concurrency: 并发上限的最小值
+            max_wait: 排队等待的最长秒数
+            max_retries: 可重试错误的最大重试次数
+            base_delay: 退避的基础延迟（秒）
+            max_delay: 退避的最大延迟（秒）
+        """
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+
+        # 统计信息
+        self.total_requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.queue_timeouts = 0
+        self.total_wait_seconds = 0.0
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """判断异常是否可重试（限流、超时、连接错误、服务端错误）"""
+        return isinstance(error, _RETRYABLE_EXCEPTIONS)
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """计算第 attempt 次重试前的等待秒数（全抖动指数退避，优先遵循 Retry-After）"""
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+        """从异常中提取服务端建议的重试间隔"""
+        if error is None:
+            return None
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            response = getattr(error, "response", None)
+            headers = getattr(response, "headers", None) or {}
+            retry_after = headers.get("retry-after")
+        try:
+            return float(retry_after) if retry_after is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _wait_for_capacity(self, tokens: float):
+        """排队等待并发名额和配额"""
+        start = time.monotonic()
+        deadline = start + self.max_wait
+        with self.condition:
+            self.queued += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.request_bucket.refill(now)
+                    self.token_bucket.refill(now)
+
+                    wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+                    has_slot = self.in_flight < max(self.min_concurrency, int(self.concurrency_limit))
+                    if has_slot and wait == 0:
+                        self.request_bucket.consume(1)
+                        self.token_bucket.consume(tokens)
+                        self.in_flight += 1
+                        self.total_requests += 1
+                        self.total_wait_seconds += now - start
+                        return
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.queue_timeouts += 1
+                        raise RateLimitTimeout(f"排队等待超过 {self.max_wait} 秒")
+                    # 缺少并发名额时等待其他调用释放；缺少配额时等待令牌补充
+                    self.condition.wait(min(remaining, wait) if has_slot else remaining)
+            finally:
+                self.queued -= 1
+
+    def _release(self, overloaded: bool):
+        """释放并发名额并按 AIMD 调整并发上限"""
+        with self.condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.throttled += 1
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+            else:
+                self.concurrency_limit = min(
+                    float(self.max_concurrency),
+                    self.concurrency_limit + 1.0 / self.concurrency_limit
+                )
+            self.condition.notify_all()
+
+    @contextmanager
+    def acquire(self, tokens: float = 0) -> Iterator[None]:
+        """获取一次调用许可
+
+        Args:
+            tokens: 预估消耗的 token 数
+
+        Raises:
+            RateLimitTimeout: 排队等待超过 max_wait
+        """
+        self._wait_for_capacity(tokens)
+        try:
+            yield
+        except BaseException as e:
+            self._release(overloaded=self.is_retryable(e))
+            raise
+        else:
+            self._release(overloaded=False)
+
+    def is_congested(self) -> bool:
+        """是否正在限流：有请求在排队，或遇到过载后并发上限尚未恢复"""
+        with self.condition:
+            return self.queued > 0 or self.concurrency_limit < self.max_concurrency
+
+    def adjust_tokens(self, estimated: float, actual: float):
+        """根据实际用量修正 token 配额"""
+        with self.condition:
+            self.token_bucket.refund(estimated - actual)
+
+    def call(self, func: Callable[[], T], tokens: float = 0) -> T:
+        """在限流保护下调用 func，可重试错误按退避策略重试
+
+        Args:
+            func: 实际的调用
+            tokens: 预估消耗的 token 数
+
+        Returns:
+            func 的返回值
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.acquire(tokens):
+                    return func()
+            except Exception as e:
+                if not self.is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                self.wait_before_retry(attempt, e)
+                attempt += 1
+
+    def wait_before_retry(self, attempt: int, error: Optional[BaseException] = None):
+        """记录一次重试并按退避策略等待
+
+        Args:
+            attempt: 已重试的次数（从 0 开始）
+            error: 触发重试的异常
+        """
+        delay = self.backoff(attempt, error)
+        with self.condition:
+            self.retries += 1
+        time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取限流器当前状态（用于监控）"""
+        with self.condition:
+            now = time.monotonic()
+            self.request_bucket.refill(now)
+            self.token_bucket.refill(now)
+            return {
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "available_requests": round(self.request_bucket.available, 2),
+                "available_tokens": round(self.token_bucket.available, 2),
+                "total_requests": self.total_requests,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "queue_timeouts": self.queue_timeouts,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.total_requests, 4) if self.total_requests else 0.0
+            }
+
+
+# 全局限流器实例（翻译模型与语音识别的配额分别计算，各用一个限流器，互不挤占）
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(service: str = "llm") -> RateLimiter:
+    """获取限流器实例（每种服务一个单例）
+
+    Args:
+        service: "llm"（翻译模型）或 "asr"（语音识别）
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(service)
+        if limiter is None:
+            settings = get_settings()
+            if service == "asr":
+                limiter = RateLimiter(
+                    requests_per_minute=settings.asr_rate_limit_requests_per_minute,
+                    max_concurrency=settings.asr_rate_limit_max_concurrency,
+                    max_wait=settings.rate_limit_max_wait,
+                    max_retries=settings.rate_limit_max_retries
+                )
+            else:
+                limiter = RateLimiter(
+                    requests_per_minute=settings.rate_limit_requests_per_minute,
+                    tokens_per_minute=settings.rate_limit_tokens_per_minute,
+                    max_concurrency=settings.rate_limit_max_concurrency,
+                    max_wait=settings.rate_limit_max_wait,
+                    max_retries=settings.rate_limit_max_retries
+                )
+            _rate_limiters[service] = limiter
+        return limiter
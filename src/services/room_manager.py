@@ -3,6 +3,7 @@
 import json
 import os
 import time
+import uuid
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import threading
@@ -266,7 +267,7 @@ class RoomManager:
             with open(room_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
     
-    def add_message(self, room_id: str, user: str, original_text: str, translated_text: Optional[str] = None, original_lang: Optional[str] = None) -> bool:
+    def add_message(self, room_id: str, user: str, original_text: str, translated_text: Optional[str] = None, original_lang: Optional[str] = None, translations: Optional[Dict[str, str]] = None, message_id: Optional[str] = None, status: str = "done", timings: Optional[Dict[str, float]] = None) -> bool:
         """添加消息到房间
         
         Args:
@@ -275,6 +276,10 @@ class RoomManager:
             original_text: 原始消息内容
             translated_text: 翻译后的消息内容（可选）
             original_lang: 原始语言（可选）
+            translations: 各语言的译文（语言代码 -> 译文，可选）
+            message_id: 消息ID（可选，默认自动生成）
+            status: 消息状态（"pending" 待翻译、"done" 已完成、"failed" 翻译失败）
+            timings: 处理各阶段的耗时（节点名 -> 秒，可选）
             
         Returns:
             是否添加成功
@@ -289,10 +294,14 @@ class RoomManager:
                 room_data = json.load(f)
             
             message = {
+                "message_id": message_id or uuid.uuid4().hex,
+                "status": status,
                 "user": user,
                 "original_text": original_text,
                 "translated_text": translated_text,
                 "original_lang": original_lang,
+                "translations": translations or {},
+                "timings": timings or {},
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -312,6 +321,109 @@ class RoomManager:
             
             return True
     
+    def update_message(self, room_id: str, message_id: str, updates: Dict,
+                       expected_status: Optional[str] = None) -> bool:
+        """更新房间中的消息（如后台翻译完成后写回译文）
+        
+        后台任务写回结果时应传入 expected_status：消息可能已被超时标记为失败
+        或被重新提交，此时状态不符，放弃本次更新，避免旧任务覆盖新状态。
+        
+        Args:
+            room_id: 房间ID
+            message_id: 消息ID
+            updates: 要更新的字段
+            expected_status: 消息当前应处的状态，为空时不检查
+            
+        Returns:
+            是否更新成功（消息不存在或状态不符时返回 False）
+        """
+        room_file = self._get_room_file(room_id)
+        
+        with self.lock:
+            if not os.path.exists(room_file):
+                return False
+            
+            with open(room_file, 'r', encoding='utf-8') as f:
+                room_data = json.load(f)
+            
+            for message in reversed(room_data.get("messages", [])):
+                if message.get("message_id") == message_id:
+                    if expected_status is not None and message.get("status") != expected_status:
+                        return False
+                    message.update(updates)
+                    if "status" in updates:
+                        # 记录状态变化时间，用于判断后台任务是否已超时
+                        message["status_at"] = datetime.now().isoformat()
+                    break
+            else:
+                return False
+            
+            room_data["updated_at"] = datetime.now().isoformat()
+            
+            with open(room_file, 'w', encoding='utf-8') as f:
+                json.dump(room_data, f, ensure_ascii=False, indent=2)
+                try:
+                    f.flush()
+                    os.fsync(f.fileno())
+                except:
+                    pass
+            
+            return True
+    
+    def fail_stale_messages(self, room_id: str, timeouts: Dict[str, float]) -> int:
+        """将长时间停留在处理中状态的消息标记为失败
+        
+        后台任务只保存在进程内存中，进程重启或任务异常中断后消息会一直停留在
+        "pending"/"transcribing" 状态。超过各状态的时限后分别标记为 "failed"、
+        "transcription_failed"，页面不再等待，并可重新翻译。
+        
+        Args:
+            room_id: 房间ID
+            timeouts: 状态 -> 最长停留秒数
+            
+        Returns:
+            标记为失败的消息数
+        """
+        failed_statuses = {"pending": "failed", "transcribing": "transcription_failed"}
+        room_file = self._get_room_file(room_id)
+        
+        with self.lock:
+            if not os.path.exists(room_file):
+                return 0
+            
+            with open(room_file, 'r', encoding='utf-8') as f:
+                room_data = json.load(f)
+            
+            now = datetime.now()
+            expired = 0
+            for message in room_data.get("messages", []):
+                status = message.get("status")
+                if status not in failed_statuses or status not in timeouts:
+                    continue
+                try:
+                    status_at = datetime.fromisoformat(message.get("status_at") or message.get("timestamp", ""))
+                except ValueError:
+                    continue
+                if (now - status_at).total_seconds() > timeouts[status]:
+                    message["status"] = failed_statuses[status]
+                    message["status_at"] = now.isoformat()
+                    expired += 1
+            
+            if not expired:
+                return 0
+            
+            room_data["updated_at"] = now.isoformat()
+            
+            with open(room_file, 'w', encoding='utf-8') as f:
+                json.dump(room_data, f, ensure_ascii=False, indent=2)
+                try:
+                    f.flush()
+                    os.fsync(f.fileno())
+                except:
+                    pass
+            
+            return expired
+    
     def get_messages(self, room_id: str, since: Optional[str] = None) -> List[Dict]:
         """获取房间消息
         
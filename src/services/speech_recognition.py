@@ -1,11 +1,45 @@
 """阿里百炼语音识别服务"""
 
-import os
 import base64
 import json
+import struct
+import time
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib3.util.retry import Retry
 from ..config.settings import get_settings
+from .asr_cache import asr_cache_key, get_asr_cache
+from .audio_segmenter import get_segment_executor, merge_transcripts, split_wav
+from .rate_limiter import RetryableError, get_rate_limiter
+from .usage_tracker import get_usage_tracker, submit_with_scope
+
+
+class _AudioJsonBody:
+    """带 base64 音频字段的 JSON 请求体，发送时分块编码
+
+    JSON 接口只接受 base64 编码的音频（接口不支持二进制上传）。请求体在发送过程中逐块
+    编码，内存中不会生成完整的 base64 字符串和 JSON 文本；提供 __len__ 使 requests
+    设置 Content-Length 而不是使用分块传输。可以重复迭代，限流器重试时重新编码。
+    """
+
+    # 3 的倍数：各块的 base64 结果没有填充，可以直接拼接
+    CHUNK_BYTES = 48 * 1024
+
+    def __init__(self, fields: Dict[str, Any], audio_bytes: bytes):
+        self.fields = fields
+        self.audio = memoryview(audio_bytes)
+        self.prefix = (json.dumps(fields)[:-1] + ', "audio": "').encode("ascii")
+        self.suffix = b'"}'
+
+    def __len__(self) -> int:
+        return len(self.prefix) + 4 * ((len(self.audio) + 2) // 3) + len(self.suffix)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.prefix
+        for start in range(0, len(self.audio), self.CHUNK_BYTES):
+            yield base64.b64encode(self.audio[start:start + self.CHUNK_BYTES])
+        yield self.suffix
 
 
 class SpeechRecognitionService:
@@ -17,55 +51,149 @@ class SpeechRecognitionService:
         self.api_key = self.settings.dashscope_api_key
         # 阿里百炼语音识别API端点
         self.base_url = "https://dashscope.aliyuncs.com/api/v1/services/audio/asr/transcription"
+        # 异步识别任务的查询端点
+        self.tasks_url = "https://dashscope.aliyuncs.com/api/v1/tasks"
+        self.model = "paraformer-realtime-v2"  # 实时语音识别模型
+        self.cache = get_asr_cache() if self.settings.asr_cache else None
+        self.limiter = get_rate_limiter("asr")
+        self.usage = get_usage_tracker()
+        self.timeout = (self.settings.asr_connect_timeout, self.settings.asr_read_timeout)
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.settings.asr_pool_maxsize,
+            # 只重试建立连接阶段的失败（请求尚未发出，重试是安全的）；
+            # 429/5xx/读超时由共享限流器按退避策略重试
+            max_retries=Retry(
+                total=self.settings.asr_connect_retries,
+                connect=self.settings.asr_connect_retries,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=0.2,
+                allowed_methods=None,
+                raise_on_status=False
+            )
+        )
+        # 共享会话：复用 keep-alive 连接，连续的语音消息无需重新建立 TCP/TLS 连接
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        # 转写结果文件在另一台主机（对象存储）上：使用独立的会话下载，
+        # 不挤占 API 主机的 keep-alive 连接池，也不把 API 密钥发给该主机
+        self.download_session = requests.Session()
     
-    def recognize(self, audio_data: str, format: str = "wav", sample_rate: int = 16000) -> Optional[str]:
+    def recognize(self, audio_bytes: bytes, format: str = "wav", sample_rate: int = 16000) -> Optional[str]:
         """
         识别语音并转换为文字
         
         Args:
-            audio_data: base64编码的音频数据或文件路径
+            audio_bytes: 原始音频字节
             format: 音频格式 (wav, mp3, m4a等)
             sample_rate: 采样率
             
         Returns:
             识别出的文字，如果失败返回None
         """
+        # 同一段录音重复提交时直接返回缓存结果
+        cache_key = None
+        if self.cache is not None:
+            cache_key = asr_cache_key(audio_bytes, format, sample_rate, self.model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        text = self._recognize(audio_bytes, format, sample_rate)
+        if cache_key is not None and text:
+            self.cache.put(cache_key, text)
+        return text
+    
+    def _recognize(self, audio_bytes: bytes, format: str, sample_rate: int) -> Optional[str]:
+        """识别语音（不经缓存）"""
+        audio_seconds = self._estimate_audio_seconds(audio_bytes, format, sample_rate)
+        
+        # 长语音在静音处分段并行识别，短语音仍然一次请求
+        segments, segment_rate = self.split_long_audio(audio_bytes, format, sample_rate)
+        if len(segments) > 1:
+            return self._recognize_segments(segments, segment_rate)
+        
+        return self._recognize_once(audio_bytes, format, sample_rate, audio_seconds)
+    
+    def split_long_audio(self, audio_bytes: bytes, format: str, sample_rate: int) -> Tuple[List[bytes], int]:
+        """超过 ASR_SEGMENT_SECONDS 的 WAV 在静音处分段（相邻段少量重叠）
+        
+        Returns:
+            (各段音频, 采样率)；不需要或无法分段时只有一段，即原始音频
+        """
+        max_segment_seconds = self.settings.asr_segment_seconds
+        audio_seconds = self._estimate_audio_seconds(audio_bytes, format, sample_rate)
+        if format != "wav" or not 0 < max_segment_seconds < audio_seconds:
+            return [audio_bytes], sample_rate
         try:
-            # 如果是文件路径，读取文件并转换为base64
-            if os.path.exists(audio_data):
-                with open(audio_data, 'rb') as f:
-                    audio_bytes = f.read()
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            else:
-                # 假设已经是base64编码
-                audio_base64 = audio_data
-            
-            # 调用阿里百炼语音识别API
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            return split_wav(audio_bytes, max_segment_seconds, self.settings.asr_segment_overlap_ms / 1000)
+        except Exception as e:
+            print(f"长语音分段失败，整段识别: {str(e)}")
+            return [audio_bytes], sample_rate
+    
+    def _recognize_segments(self, segments: List[bytes], sample_rate: int) -> Optional[str]:
+        """在分段线程池中并行识别各段，按顺序合并（重叠部分去重）
+        
+        Args:
+            segments: 各段 WAV 音频
+            sample_rate: 采样率
             
-            # 阿里百炼语音识别API参数
-            payload = {
-                "model": "paraformer-realtime-v2",  # 实时语音识别模型
+        Returns:
+            合并后的文字；所有分段都识别失败时返回None
+        """
+        executor = get_segment_executor()
+        futures = [
+            submit_with_scope(
+                executor, self._recognize_once, segment, "wav", sample_rate,
+                self._estimate_audio_seconds(segment, "wav", sample_rate)
+            )
+            for segment in segments
+        ]
+        texts = [future.result() for future in futures]
+        failed = sum(1 for text in texts if text is None)
+        if failed == len(texts):
+            return None
+        if failed:
+            print(f"长语音有 {failed}/{len(texts)} 段识别失败，结果可能不完整")
+        return merge_transcripts(texts) or None
+    
+    def _recognize_once(
+        self,
+        audio_bytes: bytes,
+        format: str,
+        sample_rate: int,
+        audio_seconds: float
+    ) -> Optional[str]:
+        """一次请求识别整段音频"""
+        try:
+            # 阿里百炼语音识别API参数（音频在发送时分块编码为 base64）
+            body = _AudioJsonBody({
+                "model": self.model,
                 "format": format,
-                "sample_rate": sample_rate,
-                "audio": audio_base64
-            }
+                "sample_rate": sample_rate
+            }, audio_bytes)
             
-            # 如果API不支持直接传base64，可能需要使用文件上传方式
-            # 这里先尝试base64方式
-            
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            # 经共享限流器调用，429/5xx/超时会排队并退避重试
+            start = time.monotonic()
+            try:
+                response = self.limiter.call(lambda: self._post(body))
+            except Exception:
+                self.usage.record_asr(self.model, audio_seconds, time.monotonic() - start, error=True)
+                raise
+            latency = time.monotonic() - start
             
             if response.status_code == 200:
                 result = response.json()
+                # 优先使用服务端返回的计费时长
+                billed_seconds = (result.get("usage") or {}).get("duration")
+                self.usage.record_asr(self.model, float(billed_seconds or audio_seconds), latency)
                 # 解析返回结果
                 if "output" in result and "text" in result["output"]:
                     return result["output"]["text"]
@@ -75,6 +203,7 @@ class SpeechRecognitionService:
                     print(f"API返回格式异常: {result}")
                     return None
             else:
+                self.usage.record_asr(self.model, audio_seconds, latency, error=True)
                 print(f"语音识别API调用失败: {response.status_code}, {response.text}")
                 return None
                 
@@ -82,6 +211,142 @@ class SpeechRecognitionService:
             print(f"语音识别出错: {str(e)}")
             return None
     
+    @staticmethod
+    def _estimate_audio_seconds(audio_bytes: bytes, format: str, sample_rate: int) -> float:
+        """根据音频字节数估算时长（WAV 读取文件头中的字节率，其他格式按 16 位单声道估算）"""
+        audio_size = len(audio_bytes)
+        byte_rate = sample_rate * 2
+        if format == "wav" and audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE" and audio_size >= 44:
+            byte_rate = struct.unpack("<I", audio_bytes[28:32])[0] or byte_rate
+            audio_size -= 44
+        return max(0.0, audio_size / byte_rate)
+    
+    def submit_task(self, audio_bytes: bytes, format: str = "wav", sample_rate: int = 16000) -> str:
+        """以异步任务提交识别请求，不等待识别结果
+        
+        Args:
+            audio_bytes: 原始音频字节
+            format: 音频格式
+            sample_rate: 采样率
+            
+        Returns:
+            识别任务ID（用 fetch_task 查询结果）
+            
+        Raises:
+            RuntimeError: 提交失败
+        """
+        body = _AudioJsonBody({
+            "model": self.model,
+            "format": format,
+            "sample_rate": sample_rate
+        }, audio_bytes)
+        response = self.limiter.call(lambda: self._post(body, headers={"X-DashScope-Async": "enable"}))
+        if response.status_code != 200:
+            raise RuntimeError(f"提交语音识别任务失败: {response.status_code}, {response.text}")
+        task_id = (response.json().get("output") or {}).get("task_id")
+        if not task_id:
+            raise RuntimeError(f"提交语音识别任务未返回任务ID: {response.text}")
+        return task_id
+    
+    def fetch_task(self, task_id: str, read_timeout: Optional[float] = None) -> Tuple[str, Optional[str], Optional[float]]:
+        """查询异步识别任务
+        
+        Args:
+            task_id: 识别任务ID
+            read_timeout: 查询的读取超时时间（秒，None 表示使用 ASR_READ_TIMEOUT）
+            
+        Returns:
+            (任务状态 PENDING/RUNNING/SUCCEEDED/FAILED 等, 识别出的文字, 计费时长)；
+            任务未完成时文字为None
+        """
+        timeout = self.timeout if read_timeout is None else (self.settings.asr_connect_timeout, read_timeout)
+        response = self.session.get(f"{self.tasks_url}/{task_id}", timeout=timeout)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(
+                f"查询语音识别任务暂时失败: {response.status_code}",
+                status_code=response.status_code
+            )
+        if response.status_code != 200:
+            print(f"查询语音识别任务失败: {response.status_code}, {response.text}")
+            return "UNKNOWN", None, None
+        result = response.json()
+        output = result.get("output") or {}
+        status = output.get("task_status", "UNKNOWN")
+        billed_seconds = (result.get("usage") or {}).get("duration")
+        if status != "SUCCEEDED":
+            if status == "FAILED":
+                print(f"语音识别任务失败: {output.get('code')} {output.get('message')}")
+            return status, None, billed_seconds
+        try:
+            text = self._task_text(output)
+        except Exception as e:
+            # 结果文件地址过期、无权限或内容无效时按任务失败处理
+            print(f"下载语音识别结果失败: {str(e)}")
+            return "FAILED", None, billed_seconds
+        return status, text, billed_seconds
+    
+    def _task_text(self, output: Dict[str, Any]) -> Optional[str]:
+        """从已完成任务的输出中取出识别文字（结果可能以转写文件地址给出）
+        
+        Raises:
+            requests.HTTPError: 下载转写结果文件失败
+        """
+        if output.get("text"):
+            return output["text"]
+        texts = []
+        for item in output.get("results") or []:
+            if item.get("text"):
+                texts.append(item["text"])
+            elif item.get("transcription_url"):
+                response = self.download_session.get(item["transcription_url"], timeout=self.timeout)
+                response.raise_for_status()
+                transcription = response.json()
+                texts.extend(
+                    transcript.get("text", "")
+                    for transcript in transcription.get("transcripts") or []
+                )
+        return "".join(texts) or None
+    
+    def _post(self, body: _AudioJsonBody, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """经共享会话发送识别请求，限流和服务端错误转换为可重试异常"""
+        response = self.session.post(
+            self.base_url,
+            data=body,
+            headers=headers,
+            timeout=self.timeout
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise RetryableError(
+                f"语音识别API暂时不可用: {response.status_code}",
+                status_code=response.status_code,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        return response
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """获取连接池的复用情况（用于监控）"""
+        requests_sent = 0
+        connections_opened = 0
+        idle_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            connections_opened += pool.num_connections
+            if pool.pool is not None:
+                # 连接池队列中未建立的连接位以 None 占位
+                idle_connections += sum(1 for connection in list(pool.pool.queue) if connection is not None)
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "idle_connections": idle_connections,
+            "reused_requests": max(0, requests_sent - connections_opened),
+            "reuse_ratio": round(1 - connections_opened / requests_sent, 4) if requests_sent else 0.0
+        }
+    
     def recognize_from_streamlit_audio(self, audio_bytes: bytes) -> Optional[str]:
         """
         从Streamlit音频输入识别
@@ -93,9 +358,19 @@ class SpeechRecognitionService:
             识别出的文字
         """
         try:
-            # 将音频字节转换为base64
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            return self.recognize(audio_base64, format="wav", sample_rate=16000)
+            return self.recognize(audio_bytes, format="wav", sample_rate=16000)
         except Exception as e:
             print(f"处理Streamlit音频出错: {str(e)}")
             return None
+
+
+# 全局语音识别服务实例
+_speech_recognition_service: Optional[SpeechRecognitionService] = None
+
+
+def get_speech_recognition_service() -> SpeechRecognitionService:
+    """获取语音识别服务实例（单例）"""
+    global _speech_recognition_service
+    if _speech_recognition_service is None:
+        _speech_recognition_service = SpeechRecognitionService()
+    return _speech_recognition_service
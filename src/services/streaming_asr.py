@@ -0,0 +1,299 @@
+"""流式语音识别 - 经 WebSocket 分帧发送音频并实时接收识别结果"""
+
+import json
+import struct
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from websockets.protocol import State
+from websockets.sync.client import ClientConnection, connect
+
+from ..config.settings import get_settings
+from .asr_cache import AsrCache, asr_cache_key, get_asr_cache
+from .rate_limiter import get_rate_limiter
+from .usage_tracker import get_usage_tracker
+
+
+@dataclass(frozen=True)
+class StreamingResult:
+    """流式识别结果
+
+    Attributes:
+        text: 截至目前的完整识别文本（已结束的句子 + 当前句子的临时结果）
+        is_final: 是否为整段音频的最终结果
+    """
+    text: str
+    is_final: bool = False
+
+
+def wav_sample_rate(audio_bytes: bytes, default: int = 16000) -> int:
+    """读取 WAV 文件头中的采样率，不是 WAV 时返回 default"""
+    if len(audio_bytes) >= 28 and audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+        return struct.unpack("<I", audio_bytes[24:28])[0] or default
+    return default
+
+
+def _join_sentences(sentences: List[str]) -> str:
+    """拼接识别出的句子（拉丁字母句子之间补空格）"""
+    text = ""
+    for sentence in sentences:
+        if text and sentence and text[-1].isascii() and sentence[0].isascii() and not text[-1].isspace():
+            text += " "
+        text += sentence
+    return text
+
+
+class StreamingSpeechRecognizer:
+    """流式语音识别（DashScope 实时语音识别 WebSocket 协议）
+
+    一次识别为一个任务：run-task → 分帧发送二进制音频 → finish-task，期间服务端持续推送
+    result-generated 事件（句子的临时结果和结束结果）。WebSocket 连接在任务之间复用。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        model: str = "paraformer-realtime-v2",
+        frame_ms: int = 100,
+        max_idle_connections: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        cache: Optional[AsrCache] = None
+    ):
+        """初始化流式识别
+
+        Args:
+            url: WebSocket 地址
+            api_key: API Key
+            model: 实时语音识别模型
+            frame_ms: 每帧音频的时长（毫秒）
+            max_idle_connections: 保留的空闲连接数
+            connect_timeout: 建立连接的超时时间（秒）
+            read_timeout: 等待服务端事件的超时时间（秒）
+            cache: 识别结果缓存（整段音频识别时按内容命中，None 表示不缓存）
+        """
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.frame_ms = frame_ms
+        self.max_idle_connections = max_idle_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.cache = cache
+        self.limiter = get_rate_limiter("asr")
+        self.usage = get_usage_tracker()
+        self.lock = threading.Lock()
+        self._idle: List[ClientConnection] = []
+
+        # 统计信息
+        self.tasks = 0
+        self.failed_tasks = 0
+        self.connections_opened = 0
+
+    def _acquire_connection(self) -> ClientConnection:
+        """取出一个空闲连接，没有时新建"""
+        with self.lock:
+            while self._idle:
+                connection = self._idle.pop()
+                if connection.state is State.OPEN:
+                    return connection
+            self.connections_opened += 1
+        return connect(
+            self.url,
+            additional_headers={"Authorization": f"bearer {self.api_key}"},
+            open_timeout=self.connect_timeout
+        )
+
+    def _release_connection(self, connection: ClientConnection, reusable: bool):
+        """归还连接；任务未正常结束的连接直接关闭"""
+        if reusable and connection.state is State.OPEN:
+            with self.lock:
+                if len(self._idle) < self.max_idle_connections:
+                    self._idle.append(connection)
+                    return
+        connection.close()
+
+    def _frames(self, audio: bytes, sample_rate: int) -> Iterator[memoryview]:
+        """将整段音频按帧切分（按 16 位单声道计算每帧字节数，帧是原音频的视图，不复制）"""
+        frame_bytes = max(1, sample_rate * 2 * self.frame_ms // 1000)
+        view = memoryview(audio)
+        for start in range(0, len(view), frame_bytes):
+            yield view[start:start + frame_bytes]
+
+    def _send_audio(
+        self,
+        connection: ClientConnection,
+        task_id: str,
+        frames: Iterable[Union[bytes, memoryview]],
+        sent: List[int]
+    ):
+        """发送音频帧和 finish-task 指令（在独立线程中运行，与接收结果并行）"""
+        try:
+            for frame in frames:
+                connection.send(frame)
+                sent[0] += len(frame)
+            connection.send(json.dumps({
+                "header": {"action": "finish-task", "task_id": task_id, "streaming": "duplex"},
+                "payload": {"input": {}}
+            }))
+        except Exception as e:
+            # 接收端会因连接关闭或超时结束任务
+            print(f"流式语音识别发送音频出错: {str(e)}")
+
+    def _next_event(self, connection: ClientConnection, task_id: str) -> Tuple[str, Dict[str, Any]]:
+        """接收本任务的下一个服务端事件
+
+        Raises:
+            RuntimeError: 任务失败
+            TimeoutError: 超时未收到事件
+        """
+        while True:
+            message = connection.recv(timeout=self.read_timeout)
+            if isinstance(message, bytes):
+                continue
+            data = json.loads(message)
+            header = data.get("header", {})
+            if header.get("task_id") not in (None, task_id):
+                continue
+            event = header.get("event", "")
+            if event == "task-failed":
+                raise RuntimeError(f"流式语音识别失败: {header.get('error_code')} {header.get('error_message')}")
+            return event, data.get("payload", {})
+
+    def recognize_stream(
+        self,
+        audio: Union[bytes, Iterable[bytes]],
+        format: str = "wav",
+        sample_rate: int = 16000
+    ) -> Iterator[StreamingResult]:
+        """流式识别
+
+        Args:
+            audio: 整段音频字节（按帧切分后发送），或逐帧产出音频字节的迭代器（如录音过程中的音频流）
+            format: 音频格式（pcm、wav 等）
+            sample_rate: 采样率
+
+        Yields:
+            截至目前的识别文本；最后一次产出 is_final=True 的最终结果
+
+        Raises:
+            RuntimeError: 任务失败
+        """
+        cache_key = None
+        if isinstance(audio, (bytes, bytearray)):
+            frames = self._frames(audio, sample_rate)
+            if self.cache is not None:
+                # 同一段录音重复提交时直接返回缓存结果
+                cache_key = asr_cache_key(audio, format, sample_rate, self.model)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    yield StreamingResult(cached, is_final=True)
+                    return
+        else:
+            frames = audio
+        task_id = uuid.uuid4().hex
+        sent = [0]
+        billed_seconds: Optional[float] = None
+        finished = False
+        start = time.monotonic()
+
+        with self.lock:
+            self.tasks += 1
+        with self.limiter.acquire():
+            connection = self._acquire_connection()
+            try:
+                connection.send(json.dumps({
+                    "header": {"action": "run-task", "task_id": task_id, "streaming": "duplex"},
+                    "payload": {
+                        "task_group": "audio",
+                        "task": "asr",
+                        "function": "recognition",
+                        "model": self.model,
+                        "parameters": {"format": format, "sample_rate": sample_rate},
+                        "input": {}
+                    }
+                }))
+                event, _ = self._next_event(connection, task_id)
+                if event != "task-started":
+                    raise RuntimeError(f"流式语音识别未能启动: {event}")
+
+                sender = threading.Thread(
+                    target=self._send_audio,
+                    args=(connection, task_id, frames, sent),
+                    name="streaming-asr-sender",
+                    daemon=True
+                )
+                sender.start()
+
+                sentences: List[str] = []
+                while True:
+                    event, payload = self._next_event(connection, task_id)
+                    if event == "result-generated":
+                        sentence = (payload.get("output") or {}).get("sentence") or {}
+                        text = sentence.get("text", "")
+                        if sentence.get("sentence_end"):
+                            sentences.append(text)
+                            yield StreamingResult(_join_sentences(sentences))
+                        else:
+                            yield StreamingResult(_join_sentences(sentences + [text]))
+                    elif event == "task-finished":
+                        billed_seconds = (payload.get("usage") or {}).get("duration")
+                        break
+
+                sender.join(timeout=self.read_timeout)
+                finished = True
+                final_text = _join_sentences(sentences)
+                if cache_key is not None:
+                    self.cache.put(cache_key, final_text)
+                yield StreamingResult(final_text, is_final=True)
+            finally:
+                self._release_connection(connection, reusable=finished)
+                if not finished:
+                    with self.lock:
+                        self.failed_tasks += 1
+                audio_seconds = billed_seconds or sent[0] / (sample_rate * 2)
+                self.usage.record_asr(self.model, float(audio_seconds), time.monotonic() - start, error=not finished)
+
+    def recognize(self, audio: bytes, format: str = "wav", sample_rate: int = 16000) -> Optional[str]:
+        """流式识别整段音频，只返回最终结果"""
+        text = None
+        for result in self.recognize_stream(audio, format=format, sample_rate=sample_rate):
+            text = result.text
+        return text or None
+
+    def stats(self) -> Dict[str, Any]:
+        """获取任务数和连接复用情况"""
+        with self.lock:
+            return {
+                "tasks": self.tasks,
+                "failed_tasks": self.failed_tasks,
+                "connections_opened": self.connections_opened,
+                "idle_connections": len(self._idle),
+                "reuse_ratio": round(1 - self.connections_opened / self.tasks, 4) if self.tasks else 0.0
+            }
+
+
+# 全局流式识别实例
+_streaming_recognizer: Optional[StreamingSpeechRecognizer] = None
+
+
+def get_streaming_speech_recognizer() -> StreamingSpeechRecognizer:
+    """获取流式语音识别实例（单例）"""
+    global _streaming_recognizer
+    if _streaming_recognizer is None:
+        settings = get_settings()
+        _streaming_recognizer = StreamingSpeechRecognizer(
+            url=settings.asr_streaming_url,
+            api_key=settings.dashscope_api_key,
+            model=settings.asr_streaming_model,
+            frame_ms=settings.asr_frame_ms,
+            max_idle_connections=settings.asr_pool_maxsize,
+            connect_timeout=settings.asr_connect_timeout,
+            read_timeout=settings.asr_read_timeout,
+            cache=get_asr_cache() if settings.asr_cache else None
+        )
+    return _streaming_recognizer
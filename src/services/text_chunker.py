@@ -0,0 +1,98 @@
+"""长文本分块 - 按段落和句子边界切分，分块并行翻译后按顺序拼接"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..config.settings import get_settings
+
+
+# 切分点：换行（段落/列表项）、英文句末标点后的空白（"1. " 等列表序号除外）、中文句末标点之后
+_BOUNDARY_PATTERN = re.compile(r"(\s*\n\s*|(?<=\D[.!?;])\s+|(?<=[。！？；]))")
+
+# 词与词之间不使用空格的语言
+_NO_SPACE_LANGUAGES = {"zh", "ja"}
+
+
+@dataclass
+class TextChunk:
+    """文本块"""
+    text: str
+    separator: str = ""  # 原文中该块之后的分隔符
+
+
+def split_text(text: str, max_chars: int) -> List[TextChunk]:
+    """按段落和句子边界将文本切分为不超过 max_chars 的块
+
+    单个句子本身超过 max_chars 时单独成块，不在句子内部切分。
+
+    Args:
+        text: 原文
+        max_chars: 每块的最大字符数
+
+    Returns:
+        文本块列表；文本不需要切分时只有一个块
+    """
+    parts = _BOUNDARY_PATTERN.split(text.strip())
+    chunks: List[TextChunk] = []
+    current = ""
+    pending_separator = ""
+    # parts 为 [句子, 分隔符, 句子, 分隔符, ..., 句子]
+    for index in range(0, len(parts), 2):
+        segment = parts[index]
+        separator = parts[index + 1] if index + 1 < len(parts) else ""
+        if not segment:
+            pending_separator += separator
+            continue
+        if current and len(current) + len(pending_separator) + len(segment) > max_chars:
+            chunks.append(TextChunk(current, pending_separator))
+            current = segment
+        else:
+            current += pending_separator + segment
+        pending_separator = separator
+    if current:
+        chunks.append(TextChunk(current))
+    return chunks
+
+
+def join_chunks(chunks: List[TextChunk], translations: List[str], target_lang: str) -> str:
+    """按原文顺序拼接各块译文
+
+    换行分隔符原样保留；句间分隔符按目标语言调整（中日文不加空格，其他语言用一个空格）。
+
+    Args:
+        chunks: 原文的文本块
+        translations: 与 chunks 一一对应的译文
+        target_lang: 目标语言代码
+
+    Returns:
+        拼接后的译文
+    """
+    sentence_separator = "" if target_lang in _NO_SPACE_LANGUAGES else " "
+    pieces = []
+    for chunk, translated_text in zip(chunks, translations):
+        pieces.append(translated_text)
+        if chunk.separator:
+            pieces.append(chunk.separator if "\n" in chunk.separator else sentence_separator)
+        elif chunk is not chunks[-1]:
+            pieces.append(sentence_separator)
+    return "".join(pieces)
+
+
+# 全局分块翻译线程池（限制长文本分块翻译的并行度）
+_chunk_executor: Optional[ThreadPoolExecutor] = None
+_chunk_executor_lock = threading.Lock()
+
+
+def get_chunk_executor() -> ThreadPoolExecutor:
+    """获取分块翻译线程池实例（单例）"""
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ThreadPoolExecutor(
+                max_workers=get_settings().translation_chunk_workers,
+                thread_name_prefix="translation-chunk"
+            )
+        return _chunk_executor
@@ -1,8 +1,25 @@
 """翻译服务"""
 
-from typing import Literal, Optional
-from langchain_core.messages import HumanMessage, SystemMessage
-from ..config.settings import get_model
+import json
+import time
+import httpx
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from langgraph.constants import TAG_NOSTREAM
+from ..config.settings import get_model, get_settings
+from .translation_memory import MemoryMatch, get_translation_memory
+from .rate_limiter import get_rate_limiter
+from .hedging import DeadlineExceeded, get_hedged_caller
+from .model_router import get_model_router
+from .usage_tracker import get_usage_tracker, submit_with_scope
+from .language_detector import LanguageDetection, detect_language
+from .prompts import multi_translation_system_message, translation_system_message
+from .text_chunker import TextChunk, get_chunk_executor, join_chunks, split_text
+
+
+T = TypeVar("T")
 
 
 class TranslationService:
@@ -10,21 +27,28 @@ class TranslationService:
     
     def __init__(self):
         """初始化翻译服务"""
-        self.model = get_model()
+        self.settings = get_settings()
+        self.router = get_model_router()
+        self.usage = get_usage_tracker()
+        self.memory = get_translation_memory()
+        self.limiter = get_rate_limiter()
+        self.hedger = get_hedged_caller()
     
     def translate(
         self, 
         text: str, 
-        source_lang: Literal["zh", "en"], 
-        target_lang: Literal["zh", "en"]
+        source_lang: str, 
+        target_lang: str,
+        deadline: Optional[float] = None
     ) -> Optional[str]:
         """
         翻译文本
         
         Args:
             text: 要翻译的文本
-            source_lang: 源语言 ('zh' 或 'en')
-            target_lang: 目标语言 ('zh' 或 'en')
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            deadline: 截止时间（秒），默认使用 TRANSLATION_DEADLINE 配置；超时后按降级策略返回
             
         Returns:
             翻译后的文本，如果源语言和目标语言相同则返回原文
@@ -32,38 +56,444 @@ class TranslationService:
         if source_lang == target_lang:
             return text
         
+        if deadline is None:
+            deadline = self.settings.translation_deadline or None
+        
         try:
-            lang_map = {
-                "zh": "中文",
-                "en": "English"
-            }
+            # 优先复用翻译记忆（精确匹配或模板匹配），否则将近似匹配作为示例
+            reused, examples = self.memory.lookup(text, source_lang, target_lang)
+            if reused is not None:
+                return reused
             
-            source_lang_name = lang_map.get(source_lang, source_lang)
-            target_lang_name = lang_map.get(target_lang, target_lang)
+            # 长文本分块并行翻译，每块各自复用翻译记忆、选择模型并执行降级策略
+            chunks = self._split_long_text(text)
+            if chunks is not None:
+                translations = list(self._map_chunks(
+                    lambda chunk_text: self.translate(chunk_text, source_lang, target_lang, deadline=deadline),
+                    chunks
+                ))
+                return join_chunks(chunks, translations, target_lang)
             
-            system_prompt = f"""你是一个专业的翻译助手。请将用户输入的文本从{source_lang_name}翻译成{target_lang_name}。
-
-要求：
-1. 保持原文的语气和风格
-2. 确保翻译准确、自然
-3. 只返回翻译结果，不要添加任何解释或说明
-4. 如果输入已经是目标语言，直接返回原文"""
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=text)
-            ]
+            messages = self._build_messages(text, source_lang, target_lang, examples)
+            
+            # 短小简单的消息使用快速模型，其余使用主模型
+            tier = self.router.select(text)
+            model = self.router.model(tier)
             
-            response = self.model.invoke(messages)
-            translated_text = response.content.strip()
+            # 首个请求超过 p95 延迟时发出对冲请求，超过截止时间则降级
+            try:
+                translated_text = self.hedger.call(
+                    lambda: self._invoke(model, messages, tier),
+                    deadline=deadline,
+                    hedge=self.settings.translation_hedge
+                )
+            except DeadlineExceeded:
+                return self._fallback(text, messages, examples)
             
+            self.memory.add(text, translated_text, source_lang, target_lang)
             return translated_text
             
         except Exception as e:
             print(f"翻译出错: {str(e)}")
             return text  # 翻译失败时返回原文
     
-    def detect_language(self, text: str) -> Literal["zh", "en"]:
+    def translate_stream(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        deadline: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        流式翻译文本
+        
+        逐步产出当前已生成的译文（累计文本，而非增量片段），最后一次产出即完整译文。
+        
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+            deadline: 首个片段的截止时间（秒），默认使用 TRANSLATION_DEADLINE 配置；
+                超时后按降级策略产出结果
+            
+        Yields:
+            截至目前的部分译文；源语言与目标语言相同或翻译失败时产出原文
+        """
+        if source_lang == target_lang:
+            yield text
+            return
+        
+        if deadline is None:
+            deadline = self.settings.translation_deadline or None
+        
+        translated_text = ""
+        try:
+            reused, examples = self.memory.lookup(text, source_lang, target_lang)
+            if reused is not None:
+                yield reused
+                return
+            
+            # 长文本分块并行翻译，按原文顺序逐块产出
+            chunks = self._split_long_text(text)
+            if chunks is not None:
+                translations: List[str] = []
+                for chunk_translation in self._map_chunks(
+                    lambda chunk_text: self.translate(chunk_text, source_lang, target_lang, deadline=deadline),
+                    chunks
+                ):
+                    translations.append(chunk_translation)
+                    yield join_chunks(chunks[:len(translations)], translations, target_lang).rstrip()
+                return
+            
+            messages = self._build_messages(text, source_lang, target_lang, examples)
+            tier = self.router.select(text)
+            # 截止时间同时作为流式请求的读取超时：超过截止时间仍未返回首个片段的请求
+            # 随即断开，不会一直占用后台线程
+            chunks = self._stream_chunks(messages, self.router.model(tier), tier, read_timeout=deadline)
+            
+            try:
+                for piece in self.hedger.stream(chunks, first_item_deadline=deadline):
+                    translated_text += piece
+                    yield translated_text.lstrip()
+            except DeadlineExceeded:
+                yield self._fallback(text, messages, examples)
+                return
+            
+        except Exception as e:
+            print(f"流式翻译出错: {str(e)}")
+            yield text  # 翻译失败时返回原文
+            return
+        
+        # 最后产出去除首尾空白的完整译文，与 translate 的返回保持一致
+        translated_text = translated_text.strip()
+        if translated_text:
+            self.memory.add(text, translated_text, source_lang, target_lang)
+        yield translated_text or text
+    
+    def translate_multi(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        deadline: Optional[float] = None
+    ) -> Dict[str, str]:
+        """
+        一次请求翻译成多种目标语言
+        
+        翻译记忆能直接复用的语言不再请求模型；其余语言合并为一次结构化（JSON）请求，
+        因此无论会议室中有多少种语言，每条消息最多只需一次模型调用。
+        
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言代码
+            target_langs: 目标语言代码列表
+            deadline: 截止时间（秒），默认使用 TRANSLATION_DEADLINE 配置
+            
+        Returns:
+            目标语言代码 -> 译文；某种语言翻译失败时对应值为原文
+        """
+        translations: Dict[str, str] = {}
+        pending: List[str] = []
+        for target_lang in dict.fromkeys(target_langs):
+            if target_lang == source_lang:
+                translations[target_lang] = text
+                continue
+            reused, _ = self.memory.lookup(text, source_lang, target_lang)
+            if reused is not None:
+                translations[target_lang] = reused
+            else:
+                pending.append(target_lang)
+        
+        if len(pending) == 1:
+            translations[pending[0]] = self.translate(text, source_lang, pending[0], deadline=deadline)
+            return translations
+        if not pending:
+            return translations
+        
+        chunks = self._split_long_text(text)
+        if chunks is not None:
+            chunk_results = list(self._map_chunks(
+                lambda chunk_text: self.translate_multi(chunk_text, source_lang, pending, deadline=deadline),
+                chunks
+            ))
+            for target_lang in pending:
+                translations[target_lang] = join_chunks(
+                    chunks,
+                    [result[target_lang] for result in chunk_results],
+                    target_lang
+                )
+            return translations
+        
+        if deadline is None:
+            deadline = self.settings.translation_deadline or None
+        
+        messages = self._build_multi_messages(text, source_lang, pending)
+        tier = self.router.select(text)
+        json_model = self._json_model(self.router.model(tier))
+        try:
+            try:
+                raw = self.hedger.call(
+                    lambda: self._invoke(json_model, messages, tier),
+                    deadline=deadline,
+                    hedge=self.settings.translation_hedge
+                )
+            except DeadlineExceeded:
+                raw = self._multi_fallback(text, source_lang, pending, messages)
+            results = self._parse_multi_response(raw)
+        except Exception as e:
+            print(f"多语言翻译出错: {str(e)}")
+            results = {}
+        
+        for target_lang in pending:
+            translated_text = results.get(target_lang)
+            if translated_text:
+                self.memory.add(text, translated_text, source_lang, target_lang)
+                translations[target_lang] = translated_text
+            else:
+                translations[target_lang] = text  # 翻译失败时返回原文
+        return translations
+    
+    def _split_long_text(self, text: str) -> Optional[List[TextChunk]]:
+        """超过 TRANSLATION_CHUNK_MAX_CHARS 的文本按段落和句子切分，不需要分块时返回 None"""
+        max_chars = self.settings.translation_chunk_max_chars
+        if max_chars <= 0 or len(text) <= max_chars:
+            return None
+        chunks = split_text(text, max_chars)
+        return chunks if len(chunks) > 1 else None
+    
+    @staticmethod
+    def _map_chunks(func: Callable[[str], T], chunks: List[TextChunk]) -> Iterator[T]:
+        """在分块线程池中并行处理各块，按原文顺序产出结果
+        
+        不复制当前上下文：并行的模型调用若都推送到图的 messages 流中，各块的 token 会互相交错。
+        """
+        executor = get_chunk_executor()
+        futures = [submit_with_scope(executor, func, chunk.text) for chunk in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def _multi_fallback(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: List[str],
+        messages: List[BaseMessage]
+    ) -> str:
+        """多语言翻译超过截止时间后的降级策略，返回与模型输出相同格式的 JSON 文本"""
+        policy = self.settings.translation_fallback
+        if policy == "fast_model":
+            fast_model = self._json_model(get_model(self.settings.fallback_model_name))
+            try:
+                return self.hedger.call(
+                    lambda: self._invoke(fast_model, messages),
+                    deadline=self.settings.translation_fallback_deadline or None,
+                    hedge=False
+                )
+            except Exception as e:
+                print(f"降级模型翻译出错: {str(e)}")
+        results = {}
+        if policy == "memory":
+            for target_lang in target_langs:
+                matches = self.memory.search(text, source_lang, target_lang, limit=1)
+                if matches:
+                    results[target_lang] = matches[0].translated_text
+        return json.dumps(results, ensure_ascii=False)
+    
+    @staticmethod
+    def _json_model(model: ChatOpenAI) -> Runnable:
+        """要求模型输出 JSON 对象；该调用的输出不作为流式片段推送给界面"""
+        return model.bind(response_format={"type": "json_object"}).with_config(tags=[TAG_NOSTREAM])
+    
+    @staticmethod
+    def _parse_multi_response(raw: str) -> Dict[str, str]:
+        """解析多语言翻译的 JSON 输出"""
+        raw = raw.strip()
+        if raw.startswith("```"):
+            raw = raw.strip("`")
+            raw = raw[raw.find("{"):]
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            return {}
+        return {
+            str(code): value.strip()
+            for code, value in data.items()
+            if isinstance(value, str) and value.strip()
+        }
+    
+    def _build_multi_messages(self, text: str, source_lang: str, target_langs: List[str]) -> List[BaseMessage]:
+        """构建多语言翻译请求消息"""
+        return [
+            multi_translation_system_message(source_lang, tuple(target_langs)),
+            HumanMessage(content=text)
+        ]
+    
+    def _invoke(self, model: Runnable, messages: List[BaseMessage], tier: Optional[str] = None) -> str:
+        """经共享限流器调用模型，限流或超时时排队并退避重试
+        
+        Args:
+            model: 模型
+            messages: 请求消息
+            tier: 模型等级，不为空时将延迟和 token 用量计入该等级的统计
+        """
+        estimated_tokens = self._estimate_tokens(messages)
+        model_name = self._model_name(model)
+        
+        def invoke():
+            start = time.monotonic()
+            try:
+                response = model.invoke(messages)
+            except Exception:
+                self.usage.record_llm(model_name, latency=time.monotonic() - start, error=True)
+                if tier is not None:
+                    self.router.record_error(tier)
+                raise
+            latency = time.monotonic() - start
+            usage = getattr(response, "usage_metadata", None)
+            self.usage.record_llm(model_name, usage, latency)
+            if tier is not None:
+                self.router.record(tier, latency, usage)
+                # 对冲延迟只统计模型往返时间，不含限流排队和重试退避
+                self.hedger.record_latency(latency)
+            return response
+        
+        response = self.limiter.call(invoke, tokens=estimated_tokens)
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            self.limiter.adjust_tokens(estimated_tokens, usage.get("total_tokens", estimated_tokens))
+        return response.content.strip()
+    
+    def _stream_chunks(
+        self,
+        messages: List[BaseMessage],
+        model: ChatOpenAI,
+        tier: str,
+        read_timeout: Optional[float] = None
+    ) -> Iterator[str]:
+        """经共享限流器流式调用模型，产出增量片段
+        
+        Args:
+            messages: 请求消息
+            model: 模型
+            tier: 模型等级
+            read_timeout: 本次请求的读取超时（秒，相邻两次读取的最长间隔），None 表示使用共享客户端的配置
+        """
+        estimated_tokens = self._estimate_tokens(messages)
+        options = {}
+        if read_timeout:
+            options["timeout"] = httpx.Timeout(read_timeout, connect=self.settings.http_connect_timeout)
+        started = False
+        attempt = 0
+        while True:
+            try:
+                with self.limiter.acquire(estimated_tokens):
+                    start = time.monotonic()
+                    usage = None
+                    for chunk in model.stream(messages, **options):
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if not chunk.content:
+                            continue
+                        started = True
+                        yield chunk.content
+                    latency = time.monotonic() - start
+                    self.usage.record_llm(self._model_name(model), usage, latency)
+                    self.router.record(tier, latency, usage)
+                return
+            except Exception as e:
+                self.usage.record_llm(self._model_name(model), error=True)
+                self.router.record_error(tier)
+                # 已经输出部分译文后不再重试，避免界面上的译文回退
+                if started or not self.limiter.is_retryable(e) or attempt >= self.limiter.max_retries:
+                    raise
+                self.limiter.wait_before_retry(attempt, e)
+                attempt += 1
+    
+    def _fallback(
+        self,
+        text: str,
+        messages: List[BaseMessage],
+        examples: List[MemoryMatch]
+    ) -> str:
+        """翻译超过截止时间后的降级策略
+        
+        Args:
+            text: 原文
+            messages: 翻译请求消息
+            examples: 翻译记忆中的近似匹配
+            
+        Returns:
+            original：原文；memory：最接近的翻译记忆（没有时返回原文）；
+            fast_model：更快模型的翻译结果（受 TRANSLATION_FALLBACK_DEADLINE 约束，失败时返回原文）
+        """
+        policy = self.settings.translation_fallback
+        if policy == "memory" and examples:
+            return examples[0].translated_text
+        if policy == "fast_model":
+            fast_model = get_model(self.settings.fallback_model_name)
+            try:
+                return self.hedger.call(
+                    lambda: self._invoke(fast_model, messages),
+                    deadline=self.settings.translation_fallback_deadline or None,
+                    hedge=False
+                )
+            except Exception as e:
+                print(f"降级模型翻译出错: {str(e)}")
+        return text
+    
+    @staticmethod
+    def _model_name(model: Runnable) -> str:
+        """获取模型名称（兼容 bind/with_config 包装后的模型）"""
+        bound = getattr(model, "bound", model)
+        return getattr(bound, "model_name", None) or type(bound).__name__
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[BaseMessage]) -> int:
+        """粗略估算一次翻译消耗的 token 数（输入 + 与原文等长的输出）"""
+        prompt_chars = sum(len(message.content) for message in messages)
+        return prompt_chars + len(messages[-1].content)
+    
+    def _build_messages(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        examples: Optional[List[MemoryMatch]] = None
+    ) -> List[BaseMessage]:
+        """构建翻译请求消息
+        
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            examples: 翻译记忆中的近似匹配，作为示例对话放在待翻译文本之前
+            
+        Returns:
+            消息列表
+        """
+        # 系统消息按语言对预先构建并复用，保证请求前缀稳定
+        messages: List[BaseMessage] = [translation_system_message(source_lang, target_lang)]
+        for example in examples or []:
+            messages.append(HumanMessage(content=example.source_text))
+            messages.append(AIMessage(content=example.translated_text))
+        messages.append(HumanMessage(content=text))
+        return messages
+    
+    def detect(self, text: str) -> LanguageDetection:
+        """
+        检测文本语言（含置信度，中英混合时为 "mixed"）
+        
+        Args:
+            text: 要检测的文本
+            
+        Returns:
+            语言检测结果
+        """
+        return detect_language(text)
+    
+    def detect_language(self, text: str) -> str:
         """
         检测文本语言
         
@@ -71,11 +501,18 @@ class TranslationService:
             text: 要检测的文本
             
         Returns:
-            检测到的语言 ('zh' 或 'en')
+            检测到的语言代码（zh/ja/ko/en）；中英混合时返回占比较高的语言，没有文字时返回 en
         """
-        try:
-            # 简单的中文检测：如果包含中文字符，认为是中文
-            has_chinese = any('\u4e00' <= char <= '\u9fff' for char in text)
-            return "zh" if has_chinese else "en"
-        except Exception:
-            return "en"  # 默认返回英文
+        return detect_language(text).primary
+
+
+# 全局翻译服务实例
+_translation_service: Optional[TranslationService] = None
+
+
+def get_translation_service() -> TranslationService:
+    """获取翻译服务实例（单例）"""
+    global _translation_service
+    if _translation_service is None:
+        _translation_service = TranslationService()
+    return _translation_service
@@ -0,0 +1,344 @@
+"""翻译记忆库 - 基于字符 n-gram 倒排索引的近似匹配"""
+
+import heapq
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config.settings import get_settings
+from .prompts import PROMPT_VERSION
+
+
+# 可在原文和译文之间原样保留的"槽位"：数字、拉丁字母单词（人名、产品名等）
+_SLOT_PATTERN = re.compile(r"(\d+(?:[.,:]\d+)*|[A-Za-z][A-Za-z'\-]*)")
+# 源语言和目标语言都使用拉丁字母时，普通单词也可能原样出现在译文中，
+# 只把数字和首字母大写的单词（人名、地名、产品名等）视为槽位
+_NAME_SLOT_PATTERN = re.compile(r"(\d+(?:[.,:]\d+)*|[A-Z][A-Za-z'\-]*)")
+# 使用拉丁字母的语言
+_LATIN_SCRIPT_LANGUAGES = frozenset(("en", "fr", "de", "es"))
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _slot_occurrence(slot: str) -> "re.Pattern[str]":
+    """匹配译文中完整出现的槽位（前后不能紧邻字母或数字）"""
+    return re.compile(rf"(?<![A-Za-z0-9]){re.escape(slot)}(?![A-Za-z0-9])")
+
+
+@dataclass(frozen=True)
+class MemoryMatch:
+    """翻译记忆匹配结果
+
+    Attributes:
+        source_text: 记忆中的原文
+        translated_text: 记忆中的译文
+        similarity: 与查询文本的相似度（Dice 系数，0~1）
+    """
+    source_text: str
+    translated_text: str
+    similarity: float
+
+
+@dataclass
+class _MemoryEntry:
+    """记忆库内部条目"""
+    pair: Tuple[str, str, str]
+    source_text: str
+    translated_text: str
+    grams: frozenset
+
+
+class TranslationMemory:
+    """翻译记忆库
+
+    以 (源语言, 目标语言, 提示词版本) 为单位，索引历史 (原文, 译文) 对。中文使用字符二元组、
+    英文使用字符三元组建立倒排索引，按 Dice 系数查找近似匹配。条目数量有上限，
+    超出时淘汰最久未使用的条目。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        similarity_threshold: float = 0.6,
+        template_max_chars: int = 80,
+        max_candidates: int = 256,
+        prompt_version: str = ""
+    ):
+        """初始化翻译记忆库
+
+        Args:
+            max_entries: 最大条目数
+            similarity_threshold: 近似匹配的最低相似度
+            template_max_chars: 可按模板直接复用的最大原文长度
+            max_candidates: 单次查询最多校验的候选条目数
+            prompt_version: 翻译提示词版本，不同版本产生的译文互不复用
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.template_max_chars = template_max_chars
+        self.max_candidates = max_candidates
+        self.prompt_version = prompt_version
+        self.lock = threading.Lock()
+
+        self._entries: "OrderedDict[int, _MemoryEntry]" = OrderedDict()
+        self._keys: Dict[Tuple[Tuple[str, str, str], str], int] = {}
+        self._postings: Dict[Tuple[Tuple[str, str, str], str], Set[int]] = {}
+        self._next_id = 0
+
+        # 统计信息
+        self.lookups = 0
+        self.reuse_hits = 0
+        self.example_hits = 0
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """规范化文本：去除首尾空白并合并连续空白"""
+        return _WHITESPACE_PATTERN.sub(" ", text.strip())
+
+    @staticmethod
+    def _grams(text: str, lang: str) -> frozenset:
+        """提取字符 n-gram（中文二元组，其他语言三元组）"""
+        if lang == "zh":
+            compact = text.replace(" ", "")
+            n = 2
+        else:
+            compact = f" {text.lower()} "
+            n = 3
+        if len(compact) < n:
+            return frozenset(compact)
+        return frozenset(compact[i:i + n] for i in range(len(compact) - n + 1))
+
+    def add(self, source_text: str, translated_text: str, source_lang: str, target_lang: str):
+        """添加一条翻译记忆
+
+        Args:
+            source_text: 原文
+            translated_text: 译文
+            source_lang: 源语言
+            target_lang: 目标语言
+        """
+        source_text = self._normalize(source_text)
+        translated_text = translated_text.strip()
+        if not source_text or not translated_text or source_text == translated_text:
+            return
+
+        pair = (source_lang, target_lang, self.prompt_version)
+        with self.lock:
+            existing_id = self._keys.get((pair, source_text))
+            if existing_id is not None:
+                self._entries[existing_id].translated_text = translated_text
+                self._entries.move_to_end(existing_id)
+                return
+
+            entry = _MemoryEntry(pair, source_text, translated_text, self._grams(source_text, source_lang))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._keys[(pair, source_text)] = entry_id
+            for gram in entry.grams:
+                self._postings.setdefault((pair, gram), set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        """淘汰最久未使用的条目（调用方需持有锁）"""
+        entry_id, entry = self._entries.popitem(last=False)
+        del self._keys[(entry.pair, entry.source_text)]
+        for gram in entry.grams:
+            posting = self._postings.get((entry.pair, gram))
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self._postings[(entry.pair, gram)]
+
+    def search(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        limit: int = 3,
+        threshold: Optional[float] = None
+    ) -> List[MemoryMatch]:
+        """查找近似匹配
+
+        Args:
+            text: 查询文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            limit: 最多返回的匹配数
+            threshold: 最低相似度，默认使用初始化时的设置
+
+        Returns:
+            按相似度从高到低排列的匹配列表
+        """
+        if threshold is None:
+            threshold = self.similarity_threshold
+        text = self._normalize(text)
+        if not text:
+            return []
+
+        pair = (source_lang, target_lang, self.prompt_version)
+        query_grams = self._grams(text, source_lang)
+        query_size = len(query_grams)
+
+        with self.lock:
+            self.lookups += 1
+
+            # 精确匹配
+            exact_id = self._keys.get((pair, text))
+            if exact_id is not None:
+                self._entries.move_to_end(exact_id)
+                entry = self._entries[exact_id]
+                return [MemoryMatch(entry.source_text, entry.translated_text, 1.0)]
+
+            # 前缀过滤：相似度达到阈值的条目至少共享 min_overlap 个 n-gram，
+            # 因此只需在最稀有的 (query_size - min_overlap + 1) 个 n-gram 中收集候选
+            min_overlap = max(1, math.ceil(threshold * query_size / (2.0 - threshold)))
+            postings = sorted(
+                (self._postings.get((pair, gram), ()) for gram in query_grams),
+                key=len
+            )
+            candidates: Set[int] = set()
+            for posting in postings[:query_size - min_overlap + 1]:
+                candidates.update(posting)
+            # 候选过多时（大量高度相似的消息）只校验最近加入的条目，保证查询耗时有上界
+            if len(candidates) > self.max_candidates:
+                candidates = heapq.nlargest(self.max_candidates, candidates)
+
+            # 长度过滤：n-gram 数量相差过大的条目不可能达到阈值
+            min_size = threshold * query_size / (2.0 - threshold)
+            max_size = query_size * (2.0 - threshold) / threshold if threshold > 0 else math.inf
+
+            matches = []
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if not min_size <= len(entry.grams) <= max_size:
+                    continue
+                similarity = 2.0 * len(query_grams & entry.grams) / (query_size + len(entry.grams))
+                if similarity >= threshold:
+                    matches.append((similarity, entry_id))
+
+            matches.sort(reverse=True)
+            result = []
+            for similarity, entry_id in matches[:limit]:
+                self._entries.move_to_end(entry_id)
+                entry = self._entries[entry_id]
+                result.append(MemoryMatch(entry.source_text, entry.translated_text, similarity))
+            return result
+
+    def lookup(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        max_examples: int = 2
+    ) -> Tuple[Optional[str], List[MemoryMatch]]:
+        """查询翻译记忆
+
+        精确匹配直接返回译文；对于较短的模板类消息（仅数字或人名等槽位不同），
+        将译文中对应的槽位替换为新值后返回。无法直接复用时，返回近似匹配作为
+        提供给模型的翻译示例。
+
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言
+            target_lang: 目标语言
+            max_examples: 最多返回的示例数
+
+        Returns:
+            (可直接使用的译文或 None, 翻译示例列表)
+        """
+        matches = self.search(text, source_lang, target_lang, limit=max(max_examples, 3))
+        if not matches:
+            return None, []
+
+        reused = None
+        if matches[0].similarity >= 1.0:
+            reused = matches[0].translated_text
+        else:
+            normalized = self._normalize(text)
+            if len(normalized) <= self.template_max_chars:
+                same_script = source_lang in _LATIN_SCRIPT_LANGUAGES and target_lang in _LATIN_SCRIPT_LANGUAGES
+                slot_pattern = _NAME_SLOT_PATTERN if same_script else _SLOT_PATTERN
+                for match in matches:
+                    reused = self._fill_template(match, normalized, slot_pattern)
+                    if reused is not None:
+                        break
+
+        with self.lock:
+            if reused is not None:
+                self.reuse_hits += 1
+            else:
+                self.example_hits += 1
+
+        if reused is not None:
+            return reused, []
+        return None, matches[:max_examples]
+
+    @staticmethod
+    def _fill_template(match: MemoryMatch, text: str, slot_pattern: "re.Pattern[str]" = _SLOT_PATTERN) -> Optional[str]:
+        """将匹配条目视为模板，用查询文本中的槽位值填充译文
+
+        仅当两段原文除槽位外完全一致，且变化的槽位在译文中各出现一次时才复用。
+        """
+        source_parts = slot_pattern.split(match.source_text)
+        query_parts = slot_pattern.split(text)
+        if len(source_parts) != len(query_parts) or len(source_parts) == 1:
+            return None
+
+        replacements: Dict[str, str] = {}
+        for index, (old, new) in enumerate(zip(source_parts, query_parts)):
+            if old == new:
+                continue
+            # 偶数位置是槽位之间的固定文本，必须完全一致
+            if index % 2 == 0:
+                return None
+            # 变化的槽位必须在译文中原样出现且唯一
+            if len(_slot_occurrence(old).findall(match.translated_text)) != 1 or replacements.get(old, new) != new:
+                return None
+            replacements[old] = new
+
+        if not replacements:
+            return match.translated_text
+
+        pattern = re.compile("|".join(_slot_occurrence(old).pattern for old in replacements))
+        return pattern.sub(lambda m: replacements[m.group(0)], match.translated_text)
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self.lock:
+            return {
+                "entries": len(self._entries),
+                "postings": len(self._postings),
+                "lookups": self.lookups,
+                "reuse_hits": self.reuse_hits,
+                "example_hits": self.example_hits
+            }
+
+    def clear(self):
+        """清空记忆库"""
+        with self.lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._postings.clear()
+
+
+# 全局翻译记忆库实例
+_translation_memory: Optional[TranslationMemory] = None
+
+
+def get_translation_memory() -> TranslationMemory:
+    """获取翻译记忆库实例（单例）"""
+    global _translation_memory
+    if _translation_memory is None:
+        settings = get_settings()
+        _translation_memory = TranslationMemory(
+            max_entries=settings.translation_memory_max_entries,
+            similarity_threshold=settings.translation_memory_threshold,
+            template_max_chars=settings.translation_memory_template_max_chars,
+            prompt_version=PROMPT_VERSION
+        )
+    return _translation_memory
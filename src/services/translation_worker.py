@@ -0,0 +1,164 @@
+"""后台翻译工作池 - 将翻译从 Streamlit 脚本线程中解耦"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ..config.settings import get_settings
+
+
+@dataclass
+class _Job:
+    """待执行的翻译任务"""
+    message_id: str
+    func: Callable[[], Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TranslationWorkerPool:
+    """后台翻译工作池
+
+    消息先以"待翻译"状态落盘，翻译任务在后台线程中执行并将结果写回消息。
+    同一房间的任务按提交顺序串行执行（保证房间内消息顺序），不同房间并行执行；
+    排队任务总数有上限，超出时拒绝提交，由调用方同步处理。
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_depth: int = 100):
+        """初始化工作池
+
+        Args:
+            max_workers: 后台线程数
+            max_queue_depth: 排队任务总数上限
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translation-worker")
+        self.max_queue_depth = max_queue_depth
+        self.lock = threading.Lock()
+
+        self._room_queues: Dict[str, Deque[_Job]] = {}
+        self._active_rooms = set()
+        self._queue_depth = 0
+        self._partials: Dict[str, str] = {}
+
+        # 统计信息
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth_seen = 0
+        self.total_queue_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def submit(self, room_id: str, message_id: str, func: Callable[[], Any]) -> bool:
+        """提交翻译任务
+
+        Args:
+            room_id: 房间ID（同一房间的任务按顺序执行）
+            message_id: 消息ID
+            func: 任务函数（在后台线程中执行，不能调用 Streamlit 接口）
+
+        Returns:
+            是否提交成功；队列已满时返回 False
+        """
+        with self.lock:
+            if self._queue_depth >= self.max_queue_depth:
+                self.rejected += 1
+                return False
+
+            self._room_queues.setdefault(room_id, deque()).append(_Job(message_id, func))
+            self._queue_depth += 1
+            self.submitted += 1
+            self.max_depth_seen = max(self.max_depth_seen, self._queue_depth)
+
+            if room_id not in self._active_rooms:
+                self._active_rooms.add(room_id)
+                self.executor.submit(self._drain, room_id)
+        return True
+
+    def _drain(self, room_id: str):
+        """依次执行某个房间队列中的任务，直到队列为空"""
+        while True:
+            with self.lock:
+                queue = self._room_queues.get(room_id)
+                if not queue:
+                    self._room_queues.pop(room_id, None)
+                    self._active_rooms.discard(room_id)
+                    return
+                job = queue.popleft()
+                self._queue_depth -= 1
+
+            started_at = time.monotonic()
+            try:
+                job.func()
+                succeeded = True
+            except Exception as e:
+                print(f"后台翻译任务出错: {str(e)}")
+                succeeded = False
+            finished_at = time.monotonic()
+
+            with self.lock:
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self.total_queue_seconds += started_at - job.enqueued_at
+                self.total_run_seconds += finished_at - started_at
+                self._partials.pop(job.message_id, None)
+
+    def set_partial(self, message_id: str, text: str):
+        """更新消息的部分译文（用于界面逐步显示）"""
+        with self.lock:
+            self._partials[message_id] = text
+
+    def get_partial(self, message_id: str) -> Optional[str]:
+        """获取消息当前的部分译文"""
+        with self.lock:
+            return self._partials.get(message_id)
+
+    def pending_count(self, room_id: Optional[str] = None) -> int:
+        """获取排队中的任务数（不含正在执行的任务）
+
+        Args:
+            room_id: 房间ID，为空时返回所有房间的合计
+        """
+        with self.lock:
+            if room_id is None:
+                return self._queue_depth
+            return len(self._room_queues.get(room_id, ()))
+
+    def stats(self) -> Dict[str, Any]:
+        """获取工作池统计信息"""
+        with self.lock:
+            finished = self.completed + self.failed
+            return {
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "max_depth_seen": self.max_depth_seen,
+                "active_rooms": len(self._active_rooms),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_queue_seconds": round(self.total_queue_seconds / finished, 4) if finished else 0.0,
+                "avg_run_seconds": round(self.total_run_seconds / finished, 4) if finished else 0.0
+            }
+
+
+# 全局工作池实例
+_translation_worker_pool: Optional[TranslationWorkerPool] = None
+_translation_worker_pool_lock = threading.Lock()
+
+
+def get_translation_worker_pool() -> TranslationWorkerPool:
+    """获取后台翻译工作池实例（单例）"""
+    global _translation_worker_pool
+    with _translation_worker_pool_lock:
+        if _translation_worker_pool is None:
+            settings = get_settings()
+            _translation_worker_pool = TranslationWorkerPool(
+                max_workers=settings.background_workers,
+                max_queue_depth=settings.background_queue_max_depth
+            )
+        return _translation_worker_pool
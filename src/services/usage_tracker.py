@@ -0,0 +1,303 @@
+"""用量统计 - 按房间、用户、模型和调用位置汇总 LLM token 与语音识别时长"""
+
+import csv
+import io
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from ..config.settings import get_settings
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    """用量归属（房间、用户、调用位置）"""
+    room_id: str = "-"
+    user: str = "-"
+    call_site: str = "-"
+
+
+# 当前调用的用量归属（随 contextvars 传递到工作流节点和后台线程）
+_current_scope: ContextVar[UsageScope] = ContextVar("usage_scope", default=UsageScope())
+
+
+@contextmanager
+def usage_scope(
+    room_id: Optional[str] = None,
+    user: Optional[str] = None,
+    call_site: Optional[str] = None
+) -> Iterator[UsageScope]:
+    """设置代码块内模型调用的用量归属，未指定的字段沿用外层设置
+
+    Args:
+        room_id: 房间ID
+        user: 用户名
+        call_site: 调用位置（如 translation_node、render）
+    """
+    updates = {
+        key: value
+        for key, value in (("room_id", room_id), ("user", user), ("call_site", call_site))
+        if value
+    }
+    scope = replace(_current_scope.get(), **updates)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_usage_scope() -> UsageScope:
+    """获取当前的用量归属"""
+    return _current_scope.get()
+
+
+def _run_in_scope(scope: UsageScope, fn: Callable[..., T], *args: Any) -> T:
+    """在指定的用量归属下执行函数"""
+    token = _current_scope.set(scope)
+    try:
+        return fn(*args)
+    finally:
+        _current_scope.reset(token)
+
+
+def submit_with_scope(
+    executor: Executor,
+    fn: Callable[..., T],
+    *args: Any,
+    scope: Optional[UsageScope] = None
+) -> Future:
+    """提交到线程池执行，并在工作线程中恢复用量归属
+
+    线程池不会复制提交方的上下文，直接 submit 时工作线程中的调用会记到默认归属下。
+
+    Args:
+        executor: 线程池
+        fn: 要执行的函数
+        *args: 函数参数
+        scope: 用量归属，为空时使用当前的用量归属
+    """
+    return executor.submit(_run_in_scope, scope or current_usage_scope(), fn, *args)
+
+
+@dataclass
+class UsageTotals:
+    """一组维度下的累计用量"""
+    calls: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    audio_seconds: float = 0.0
+    latency_seconds: float = 0.0
+    estimated_cost: float = 0.0
+
+    def add(self, other: "UsageTotals"):
+        """累加另一组用量"""
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+
+# 汇总维度
+DIMENSIONS = ("room_id", "user", "model", "call_site", "service")
+
+
+class UsageTracker:
+    """用量统计
+
+    每次翻译（LLM）和语音识别（ASR）调用都按 房间/用户/模型/调用位置/服务 记录一次，
+    可在进程内按任意维度汇总查询，也可导出为 JSON 或 CSV。
+    被关注的调用位置（如界面渲染时的翻译）首次产生用量时会打印提示。
+    """
+
+    def __init__(
+        self,
+        prices_per_1k_tokens: Optional[Dict[str, float]] = None,
+        watch_call_sites: Sequence[str] = (),
+        max_events: int = 1000
+    ):
+        """初始化用量统计
+
+        Args:
+            prices_per_1k_tokens: 模型名称 -> 每千 token 单价（用于估算费用）
+            watch_call_sites: 需要关注的调用位置，产生用量时打印提示
+            max_events: 保留的最近调用记录数
+        """
+        self.prices = dict(prices_per_1k_tokens or {})
+        self.watch_call_sites = set(watch_call_sites)
+        self.lock = threading.Lock()
+        self._totals: Dict[Tuple[str, ...], UsageTotals] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._warned = set()
+        self.watched_calls = 0
+
+    def record_llm(
+        self,
+        model: str,
+        usage: Optional[Dict[str, Any]] = None,
+        latency: float = 0.0,
+        error: bool = False
+    ):
+        """记录一次 LLM 调用
+
+        Args:
+            model: 模型名称
+            usage: 模型返回的 usage_metadata（input_tokens / output_tokens）
+            latency: 调用耗时（秒）
+            error: 调用是否失败
+        """
+        usage = usage or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        totals = UsageTotals(
+            calls=1,
+            errors=1 if error else 0,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_seconds=latency,
+            estimated_cost=(input_tokens + output_tokens) / 1000 * self.prices.get(model, 0.0)
+        )
+        self._record("llm", model, totals)
+
+    def record_asr(self, model: str, audio_seconds: float, latency: float = 0.0, error: bool = False):
+        """记录一次语音识别调用
+
+        Args:
+            model: 语音识别模型名称
+            audio_seconds: 音频时长（秒）
+            latency: 调用耗时（秒）
+            error: 调用是否失败
+        """
+        totals = UsageTotals(
+            calls=1,
+            errors=1 if error else 0,
+            audio_seconds=audio_seconds,
+            latency_seconds=latency
+        )
+        self._record("asr", model, totals)
+
+    def _record(self, service: str, model: str, totals: UsageTotals):
+        """按当前用量归属累加"""
+        scope = current_usage_scope()
+        key = (scope.room_id, scope.user, model, scope.call_site, service)
+        warn = False
+        with self.lock:
+            self._totals.setdefault(key, UsageTotals()).add(totals)
+            self._events.append({"time": time.time(), **dict(zip(DIMENSIONS, key)), **asdict(totals)})
+            if scope.call_site in self.watch_call_sites:
+                self.watched_calls += 1
+                warn_key = (scope.room_id, scope.call_site, service)
+                if warn_key not in self._warned:
+                    self._warned.add(warn_key)
+                    warn = True
+        if warn:
+            print(f"用量提示: 调用位置 {scope.call_site} 在房间 {scope.room_id} 中产生了 {service} 调用（模型 {model}）")
+
+    def totals(self, group_by: Sequence[str] = DIMENSIONS, **filters: str) -> List[Dict[str, Any]]:
+        """按维度汇总用量
+
+        Args:
+            group_by: 汇总维度（DIMENSIONS 的子集），为空时返回总计
+            **filters: 维度过滤条件，如 room_id="abc"
+
+        Returns:
+            每组一条记录，包含维度值和累计用量，按估算费用和 token 数降序
+        """
+        unknown = set(group_by) | set(filters)
+        unknown -= set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"未知的用量维度: {', '.join(sorted(unknown))}")
+
+        groups: Dict[Tuple[str, ...], UsageTotals] = {}
+        with self.lock:
+            for key, totals in self._totals.items():
+                values = dict(zip(DIMENSIONS, key))
+                if any(values[name] != value for name, value in filters.items()):
+                    continue
+                group_key = tuple(values[name] for name in group_by)
+                groups.setdefault(group_key, UsageTotals()).add(totals)
+
+        rows = [
+            {**dict(zip(group_by, group_key)), **asdict(totals)}
+            for group_key, totals in groups.items()
+        ]
+        rows.sort(key=lambda row: (row["estimated_cost"], row["input_tokens"] + row["output_tokens"]), reverse=True)
+        return rows
+
+    def recent_events(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """获取最近的调用记录（最新的在前）"""
+        with self.lock:
+            events = list(self._events)
+        return events[::-1][:limit]
+
+    def export(self, path: Optional[str] = None, format: str = "json") -> str:
+        """导出按全部维度汇总的用量
+
+        Args:
+            path: 导出文件路径，为空时只返回内容；以 .csv 结尾时按 CSV 导出
+            format: 导出格式（json 或 csv）
+
+        Returns:
+            导出的内容
+        """
+        if path and path.endswith(".csv"):
+            format = "csv"
+        rows = self.totals()
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=list(DIMENSIONS) + [field.name for field in fields(UsageTotals)])
+            writer.writeheader()
+            writer.writerows(rows)
+            content = buffer.getvalue()
+        else:
+            content = json.dumps(rows, ensure_ascii=False, indent=2)
+
+        if path:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        """获取总计和按服务、调用位置的汇总"""
+        overall = self.totals(group_by=())
+        return {
+            "total": overall[0] if overall else asdict(UsageTotals()),
+            "by_service": self.totals(group_by=("service",)),
+            "by_call_site": self.totals(group_by=("call_site", "service")),
+            "watched_calls": self.watched_calls
+        }
+
+    def clear(self):
+        """清空统计"""
+        with self.lock:
+            self._totals.clear()
+            self._events.clear()
+            self._warned.clear()
+            self.watched_calls = 0
+
+
+# 全局用量统计实例
+_usage_tracker: Optional[UsageTracker] = None
+
+
+def get_usage_tracker() -> UsageTracker:
+    """获取用量统计实例（单例）"""
+    global _usage_tracker
+    if _usage_tracker is None:
+        settings = get_settings()
+        _usage_tracker = UsageTracker(
+            prices_per_1k_tokens={
+                settings.fast_model_name: settings.fast_model_price,
+                settings.model_name: settings.model_price
+            },
+            watch_call_sites=settings.usage_watch_call_sites
+        )
+    return _usage_tracker
@@ -1,5 +1,5 @@
 """状态定义模块"""
 
-from .meeting_state import MeetingState
+from .meeting_state import MeetingState, MessageRecord, get_target_languages
 
-__all__ = ["MeetingState"]
+__all__ = ["MeetingState", "MessageRecord", "get_target_languages"]
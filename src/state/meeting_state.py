@@ -1,8 +1,10 @@
 """会议聊天室状态定义"""
 
-from typing import TypedDict, List, Literal, Optional, Annotated, Any
+from typing import TypedDict, List, Dict, Optional, Annotated, Any
 from langchain_core.messages import BaseMessage, HumanMessage
 
+from ..config.settings import get_settings
+
 
 def convert_messages(left: List[BaseMessage], right: Any, **kwargs) -> List[BaseMessage]:
     """合并消息列表
@@ -29,8 +31,48 @@ def convert_messages(left: List[BaseMessage], right: Any, **kwargs) -> List[Base
         # 其他类型转换为字符串
         right_messages = [HumanMessage(content=str(right))]
     
-    # 合并消息列表
-    return left + right_messages
+    # 合并消息列表（window 检查点策略下只保留最近的消息，检查点不会无限增长）
+    merged = left + right_messages
+    settings = get_settings()
+    if settings.checkpoint_policy == "window" and 0 < settings.checkpoint_max_messages < len(merged):
+        merged = merged[-settings.checkpoint_max_messages:]
+    return merged
+
+
+def merge_timings(left: Optional[Dict[str, float]], right: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """合并各节点的耗时
+    
+    每次调用的初始状态传入 None，清空上一次调用留在检查点中的耗时。
+    
+    Args:
+        left: 已有的耗时
+        right: 节点新写入的耗时（None 表示清空）
+        
+    Returns:
+        合并后的耗时（节点名 -> 秒）
+    """
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
+class MessageRecord(TypedDict):
+    """一条处理完成的消息（由 message_node 生成，界面直接保存到房间）
+    
+    Attributes:
+        user: 发言用户
+        original_text: 原始文本
+        translated_text: 会议室语言的译文（与原文相同或无需翻译时为 None）
+        original_lang: 原始语言代码
+        translations: 各目标语言的译文（语言代码 -> 译文）
+        timings: 各节点耗时（节点名 -> 秒）
+    """
+    user: str
+    original_text: str
+    translated_text: Optional[str]
+    original_lang: Optional[str]
+    translations: Dict[str, str]
+    timings: Dict[str, float]
 
 
 class MeetingState(TypedDict):
@@ -38,17 +80,46 @@ class MeetingState(TypedDict):
     
     Attributes:
         messages: 聊天消息列表
-        room_language: 会议室主体语言 ('zh' 或 'en')
+        room_language: 会议室主体语言（SUPPORTED_LANGUAGES 中的语言代码）
         current_user: 当前发言用户
-        audio_data: 音频数据（base64编码或文件路径）
+        audio_ref: 待识别音频的引用（音频本身在 AudioStore 中，不进入检查点）
         original_text: 原始输入文本（可能是语音识别结果）
-        translated_text: 翻译后的文本
+        detected_lang: 输入文本的语言代码（由第一个需要的节点检测，后续节点和路由直接复用）
+        detected_lang_confidence: 语言检测的置信度（0~1）
+        detected_mixed: 输入是否为中英混合文本
+        translated_text: 翻译后的文本（会议室语言）
+        translations: 各目标语言的译文（语言代码 -> 译文）
         participants: 参与者列表
+        timings: 本次调用各节点的耗时（节点名 -> 秒）
+        result: 本次调用生成的消息（没有生成消息时为 None）
     """
     messages: Annotated[list[BaseMessage], convert_messages]
-    room_language: Literal["zh", "en"]
+    room_language: str
     current_user: str
-    audio_data: Optional[str]  # base64编码的音频数据或文件路径
+    audio_ref: Optional[str]  # 待识别音频的引用
     original_text: Optional[str]  # 原始输入文本
+    detected_lang: Optional[str]  # 输入文本的语言代码
+    detected_lang_confidence: Optional[float]  # 语言检测的置信度
+    detected_mixed: Optional[bool]  # 是否为中英混合文本
     translated_text: Optional[str]  # 翻译后的文本
-    participants: List[str]  # 参与者列表
+    translations: Optional[Dict[str, str]]  # 各目标语言的译文
+    participants: List[Any]  # 参与者列表（用户名或 {"username", "user_language"} 字典）
+    timings: Annotated[Optional[Dict[str, float]], merge_timings]  # 各节点耗时
+    result: Optional[MessageRecord]  # 本次调用生成的消息
+
+
+def get_target_languages(state: MeetingState) -> List[str]:
+    """获取消息需要翻译到的语言：会议室语言以及各参与者选择的显示语言
+    
+    Args:
+        state: 当前状态
+        
+    Returns:
+        去重后的语言代码列表（会议室语言在前）
+    """
+    room_language = state.get("room_language", "zh")
+    languages = [room_language]
+    for participant in state.get("participants") or []:
+        if isinstance(participant, dict) and participant.get("user_language"):
+            languages.append(participant["user_language"])
+    return list(dict.fromkeys(languages))
@@ -2,18 +2,24 @@
 
 import streamlit as st
 import streamlit.components.v1 as components
-import base64
 import io
 import time
-from typing import List
+import uuid
+import functools
+from typing import List, Optional
 from langchain_core.messages import HumanMessage, AIMessage
 
 from ..workflow.meeting_workflow import get_meeting_app
+from ..workflow.checkpointing import meeting_thread_config, release_meeting_thread
+from ..config.settings import get_settings
 from ..state.meeting_state import MeetingState
 from ..services.room_manager import get_room_manager
+from ..services.translation_worker import get_translation_worker_pool
+from ..services.usage_tracker import usage_scope
 from .state_persistence import init_state_restoration, auto_save_state
 from .auth_ui import render_login_page, check_login, logout
 from ..utils.i18n import t, get_user_language, set_user_language, init_language_detection
+from ..config.languages import get_supported_languages, get_language_name
 
 
 def create_meeting_app():
@@ -244,7 +250,7 @@ def _render_sidebar():
             
             if selected_room_idx is not None and selected_room_idx < len(rooms):
                 selected_room = rooms[selected_room_idx]
-                st.caption(f"创建者: {selected_room['creator']} | 语言: {'中文' if selected_room['room_language'] == 'zh' else 'English'}")
+                st.caption(f"创建者: {selected_room['creator']} | 语言: {get_language_name(selected_room['room_language'])}")
                 
                 # 加入选中房间按钮
                 current_username = st.session_state.get("username")
@@ -452,11 +458,12 @@ def _render_sidebar():
         
         # 我的显示语言设置
         current_lang = st.session_state.get("_temp_room_language", st.session_state.get("room_language", get_user_language()))
+        supported_languages = get_supported_languages()
         user_language = st.selectbox(
             t("my_display_language"),
-            ["zh", "en"],
-            format_func=lambda x: t("chinese") if x == "zh" else t("english"),
-            index=0 if current_lang == "zh" else 1,
+            supported_languages,
+            format_func=get_language_name,
+            index=supported_languages.index(current_lang) if current_lang in supported_languages else 0,
             key="user_language"
         )
         # 更新用户语言设置
@@ -504,7 +511,7 @@ def _render_sidebar():
                         if isinstance(participant, dict):
                             username = participant.get("username", "未知用户")
                             lang = participant.get("user_language") or room_default_lang
-                            lang_name = "中文" if lang == "zh" else "English"
+                            lang_name = get_language_name(lang)
                             
                             # 检查是否是管理员（创建者）
                             is_creator = username == creator
@@ -550,7 +557,7 @@ def _render_sidebar():
                         else:
                             # 旧格式（字符串），使用房间默认语言
                             username = participant
-                            lang_name = "中文" if room_default_lang == "zh" else "English"
+                            lang_name = get_language_name(room_default_lang)
                             is_creator = username == creator
                             admin_badge = " 👑 管理员" if is_creator else ""
                             
@@ -631,6 +638,15 @@ def _render_main_content():
         # 每次都重新获取房间数据，确保获取最新消息
         room_data = room_manager.get_room(current_room_id)
         if room_data:
+            # 后台任务只在进程内存中，进程重启或任务中断后消息会一直处于处理中，超时后标记为失败
+            if any(msg.get("status") in ("pending", "transcribing") for msg in room_data.get("messages", [])):
+                settings = get_settings()
+                timeouts = {
+                    "pending": settings.pending_message_timeout,
+                    "transcribing": settings.asr_task_timeout + settings.pending_message_timeout
+                }
+                if room_manager.fail_stale_messages(current_room_id, timeouts):
+                    room_data = room_manager.get_room(current_room_id) or room_data
             # 同步消息（从房间数据获取最新消息）
             room_messages = room_data.get("messages", [])
             # 直接使用房间中的最新消息，不依赖session_state缓存
@@ -696,11 +712,11 @@ def _render_main_content():
             )
             del st.session_state._clear_input
         else:
-        user_input = st.text_input(
-            t("input_message"),
-            key="user_input",
-            placeholder=t("input_message")
-        )
+            user_input = st.text_input(
+                t("input_message"),
+                key="user_input",
+                placeholder=t("input_message")
+            )
     
     with col2:
         st.markdown("<br>", unsafe_allow_html=True)  # 垂直对齐
@@ -709,6 +725,8 @@ def _render_main_content():
     # 语音输入
     st.markdown(f"### 🎤 {t('voice_input')}")
     audio_data = st.audio_input(t("voice_input"), key="audio_input")
+    # 流式识别时在此显示部分识别结果
+    partial_transcript = st.empty()
     send_audio = st.button(t("send_audio"), key="send_audio")
     
     # 处理输入
@@ -725,12 +743,15 @@ def _render_main_content():
         # 标记消息已发送，延迟自动刷新
         st.session_state._message_sent = True
         st.session_state._message_sent_time = time.time()
-        _process_audio_input(audio_data)
+        _process_audio_input(audio_data, partial_transcript)
         st.rerun()
     
     # 自动刷新提示和实现（智能刷新：用户发送消息后延迟刷新）
     if st.session_state.get("auto_refresh", True):
         refresh_interval = 3000  # 默认3秒
+        # 有消息正在后台转写或翻译时加快刷新，尽快显示结果
+        if any(msg.get("status") in ("transcribing", "pending") for msg in st.session_state.get("meeting_messages", [])):
+            refresh_interval = 1000
         # 如果用户刚发送了消息，延迟刷新（给用户时间看到成功提示）
         if st.session_state.get("_message_sent", False):
             elapsed = time.time() - st.session_state.get("_message_sent_time", 0)
@@ -815,6 +836,7 @@ def _render_message(msg: dict):
     user = msg.get("user", "未知用户")
     original_text = msg.get("original_text", msg.get("content", ""))  # 兼容旧格式
     translated_text = msg.get("translated_text")  # 这是房间语言的翻译
+    translations = msg.get("translations") or {}  # 发送时已生成的各语言译文
     original_lang = msg.get("original_lang")
     is_current_user = user == st.session_state.get("username", "")
     
@@ -850,30 +872,74 @@ def _render_message(msg: dict):
             sender_language = "zh"  # 默认中文
     
     # 显示用户名和语言
-    lang_name = "中文" if sender_language == "zh" else "English"
+    lang_name = get_language_name(sender_language)
     user_display = f"{user} ({lang_name})"
     
     # 获取当前用户选择的语言
     user_language = st.session_state.get("_temp_room_language") or st.session_state.get("room_language", "zh")
     
     # 确定要显示的内容
+    if msg.get("status") in ("transcribing", "transcription_failed"):
+        # 语音消息尚在后台转写（或转写失败）：显示占位文字
+        import html
+        if msg.get("status") == "transcribing":
+            placeholder_text = f"🎤 {t('transcribing')}"
+        else:
+            placeholder_text = f"🎤 {t('transcription_failed')}"
+        display_content_html = f'<div style="font-style: italic; opacity: 0.7;">{html.escape(placeholder_text)}</div>'
+    elif msg.get("status") == "pending":
+        # 后台翻译尚未完成：显示原文和当前已生成的部分译文
+        import html
+        partial_translation = get_translation_worker_pool().get_partial(msg.get("message_id", ""))
+        original_text_escaped = html.escape(str(original_text))
+        partial_html = html.escape(partial_translation + "▌") if partial_translation else html.escape(t("translating"))
+        original_html = f'<div style="border-bottom: 1px solid rgba(0,0,0,0.1); padding-bottom: 4px; margin-bottom: 4px; font-style: italic; opacity: 0.7; font-size: 0.85em; color: #666;">{original_text_escaped}</div>'
+        translated_html = f'<div style="font-weight: 500; font-size: 0.95em; opacity: 0.6;">{partial_html}</div>'
+        display_content_html = original_html + translated_html
+    elif msg.get("status") == "failed":
+        # 翻译失败（或后台任务中断后超时）：显示原文，发送者可以重新翻译
+        import html
+        original_text_escaped = html.escape(str(original_text))
+        failed_html = html.escape(f"⚠️ {t('translation_failed')}")
+        display_content_html = f'{original_text_escaped}<div style="font-style: italic; opacity: 0.7; font-size: 0.8em; margin-top: 4px;">{failed_html}</div>'
     # 如果原始语言与用户语言不同，需要显示原始+翻译
-    if original_lang and original_lang != user_language:
+    elif original_lang and original_lang != user_language:
         # 需要翻译到用户选择的语言
-        from ..services.translation import TranslationService
-        translation_service = TranslationService()
+        from ..services.translation import get_translation_service
+        translation_service = get_translation_service()
         
+        # 发送时已翻译成用户语言，直接使用（无需在渲染时调用LLM）
+        if translations.get(user_language):
+            user_translated_text = translations[user_language]
         # 如果已经有房间语言的翻译，且房间语言就是用户语言，直接使用
-        if translated_text and user_language == (st.session_state.get("_temp_room_language") or st.session_state.get("room_language", "zh")):
+        elif translated_text and user_language == (st.session_state.get("_temp_room_language") or st.session_state.get("room_language", "zh")):
             user_translated_text = translated_text
         else:
-            # 需要翻译到用户选择的语言
+            # 需要翻译到用户选择的语言（简单消息走快速通道，不调用LLM）
             try:
-                user_translated_text = translation_service.translate(
+                from ..services.fast_path import get_fast_path_translator
+                user_translated_text = get_fast_path_translator().translate(
                     original_text,
                     source_lang=original_lang,
                     target_lang=user_language
                 )
+                if user_translated_text is None:
+                    # 渲染时的翻译单独统计用量，便于发现不应产生的模型调用
+                    with usage_scope(
+                        room_id=current_room_id,
+                        user=st.session_state.get("username", ""),
+                        call_site="render"
+                    ):
+                        user_translated_text = translation_service.translate(
+                            original_text,
+                            source_lang=original_lang,
+                            target_lang=user_language
+                        )
+                # 将译文写回消息，之后的页面刷新直接使用，不再重复查询快速通道或调用模型
+                translations = {**translations, user_language: user_translated_text}
+                msg["translations"] = translations
+                if room_manager and msg.get("message_id"):
+                    room_manager.update_message(current_room_id, msg["message_id"], {"translations": translations})
             except:
                 user_translated_text = original_text
         
@@ -907,6 +973,10 @@ def _render_message(msg: dict):
             </div>
         </div>
         """, unsafe_allow_html=True)
+        if msg.get("status") == "failed" and msg.get("message_id") and original_text:
+            if st.button(f"🔁 {t('retry_translation')}", key=f"retry_{msg['message_id']}"):
+                _retry_translation(msg)
+                st.rerun()
     else:
         # 其他用户的消息显示在左侧（专业风格：灰色气泡）
         st.markdown(f"""
@@ -919,8 +989,183 @@ def _render_message(msg: dict):
         """, unsafe_allow_html=True)
 
 
+def _run_translation_job(app, initial_state: MeetingState, config: dict, room_id: str, message_id: str, pool):
+    """后台翻译任务：执行工作流并将结果写回已落盘的消息
+    
+    在后台线程中运行，不能调用 Streamlit 接口。翻译节点产生的片段写入工作池，
+    供页面刷新时逐步显示。
+    
+    Args:
+        app: 编译后的 LangGraph 应用
+        initial_state: 初始状态
+        config: 运行配置
+        room_id: 房间ID
+        message_id: 消息ID
+        pool: 后台翻译工作池
+    """
+    room_manager = get_room_manager()
+    try:
+        final_state = {}
+        partial_translation = ""
+        with usage_scope(room_id=room_id, user=initial_state["current_user"]):
+            for mode, chunk in app.stream(initial_state, config, stream_mode=["messages", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                message_chunk, metadata = chunk
+                # 只关心翻译节点中模型输出的片段
+                if metadata.get("langgraph_node") != "translation" or not isinstance(message_chunk.content, str):
+                    continue
+                if message_chunk.content:
+                    partial_translation += message_chunk.content
+                    pool.set_partial(message_id, partial_translation.lstrip())
+        
+        updates = {"status": "done"}
+        result = final_state.get("result")
+        if result:
+            updates.update({
+                "translated_text": result["translated_text"],
+                "original_lang": result["original_lang"],
+                "translations": result["translations"],
+                "timings": result["timings"]
+            })
+        # 任务超时已被标记为失败（或已重新提交）时不再写回
+        room_manager.update_message(room_id, message_id, updates, expected_status="pending")
+    except Exception:
+        room_manager.update_message(room_id, message_id, {"status": "failed"}, expected_status="pending")
+        raise
+    finally:
+        release_meeting_thread(app, config)
+
+
+def _retry_translation(msg: dict):
+    """重新翻译失败的消息（消息恢复为待翻译状态，提交到后台工作池）"""
+    room_id = st.session_state.get("room_id")
+    username = msg.get("user", "")
+    room_manager = get_room_manager()
+    if not room_id or not room_manager.update_message(
+            room_id, msg["message_id"], {"status": "pending"}, expected_status="failed"):
+        return
+    msg["status"] = "pending"
+    
+    initial_state: MeetingState = {
+        "messages": [],
+        "room_language": st.session_state.get("_temp_room_language") or st.session_state.get("room_language", "zh"),
+        "current_user": username,
+        "audio_ref": None,
+        "original_text": msg.get("original_text", ""),
+        "detected_lang": None,
+        "detected_lang_confidence": None,
+        "detected_mixed": None,
+        "translated_text": None,
+        "translations": None,
+        "timings": None,
+        "result": None,
+        "participants": st.session_state.get("participants", [username] if username else [])
+    }
+    app = get_meeting_app()
+    config = meeting_thread_config(room_id)
+    pool = get_translation_worker_pool()
+    job = functools.partial(_run_translation_job, app, initial_state, config, room_id, msg["message_id"], pool)
+    if not pool.submit(room_id, msg["message_id"], job):
+        job()
+
+
+def _finish_transcription(text: Optional[str], app, initial_state: MeetingState, config: dict, room_id: str, message_id: str):
+    """异步识别完成后的回调：写回识别文字并提交后台翻译
+    
+    在后台线程中运行，不能调用 Streamlit 接口。
+    
+    Args:
+        text: 识别出的文字（失败时为 None）
+        app: 编译后的 LangGraph 应用
+        initial_state: 初始状态（不含识别文字）
+        config: 运行配置
+        room_id: 房间ID
+        message_id: 占位消息ID
+    """
+    room_manager = get_room_manager()
+    if not text:
+        room_manager.update_message(room_id, message_id, {"status": "transcription_failed"},
+                                    expected_status="transcribing")
+        return
+    
+    # 占位消息已超时标记为失败时不再写回，也不提交翻译
+    if not room_manager.update_message(room_id, message_id, {"original_text": text, "status": "pending"},
+                                       expected_status="transcribing"):
+        return
+    initial_state = {**initial_state, "original_text": text}
+    pool = get_translation_worker_pool()
+    job = functools.partial(_run_translation_job, app, initial_state, config, room_id, message_id, pool)
+    if not pool.submit(room_id, message_id, job):
+        job()
+
+
+def _submit_transcription(audio_bytes: bytes, room_id: str, room_language: str, username: str) -> bool:
+    """以异步任务提交语音识别，立即在房间中保存"转写中"的占位消息
+    
+    识别结果由后台轮询线程取回后写入占位消息，并接着走文字消息的后台翻译流程，
+    脚本线程不等待识别完成。
+    
+    Returns:
+        是否提交成功
+    """
+    from ..services.asr_tasks import get_asr_task_poller
+    from ..services.streaming_asr import wav_sample_rate
+    
+    message_id = uuid.uuid4().hex
+    if not get_room_manager().add_message(room_id, username, "", message_id=message_id, status="transcribing"):
+        return False
+    st.session_state.meeting_messages.append({
+        "message_id": message_id,
+        "status": "transcribing",
+        "user": username,
+        "original_text": "",
+        "translated_text": None,
+        "original_lang": None,
+        "translations": {}
+    })
+    
+    initial_state: MeetingState = {
+        "messages": [],
+        "room_language": room_language,
+        "current_user": username,
+        "audio_ref": None,
+        "original_text": None,
+        "detected_lang": None,
+        "detected_lang_confidence": None,
+        "detected_mixed": None,
+        "translated_text": None,
+        "translations": None,
+        "timings": None,
+        "result": None,
+        "participants": st.session_state.get("participants", [username] if username else [])
+    }
+    config = meeting_thread_config(room_id)
+    on_done = functools.partial(
+        _finish_transcription,
+        app=get_meeting_app(),
+        initial_state=initial_state,
+        config=config,
+        room_id=room_id,
+        message_id=message_id
+    )
+    with usage_scope(room_id=room_id, user=username, call_site="audio_input"):
+        get_asr_task_poller().submit(
+            audio_bytes,
+            on_done,
+            format="wav",
+            sample_rate=wav_sample_rate(audio_bytes)
+        )
+    return True
+
+
 def _process_text_input(text: str):
-    """处理文字输入"""
+    """处理文字输入
+    
+    消息立即以"待翻译"状态保存，翻译交给后台工作池完成后写回消息，
+    发送延迟仅为落盘延迟。工作池队列已满时在当前线程中同步翻译。
+    """
     if not text.strip():
         st.session_state._last_message_status = "error"
         st.session_state._last_message_error = t("error_empty_message")
@@ -948,88 +1193,53 @@ def _process_text_input(text: str):
         "messages": [],
         "room_language": room_language,
         "current_user": current_username,
-        "audio_data": None,
+        "audio_ref": None,
         "original_text": text,
+        "detected_lang": None,
+        "detected_lang_confidence": None,
+        "detected_mixed": None,
         "translated_text": None,
+        "translations": None,
+        "timings": None,
+        "result": None,
         "participants": st.session_state.get("participants", [current_username] if current_username else [])
     }
     
-    # 执行工作流
     app = get_meeting_app()
-    config = {
-        "configurable": {"thread_id": f"room_{current_room_id}"}
-    }
+    config = meeting_thread_config(current_room_id)
     
     try:
-        # 执行工作流
-        final_state = app.invoke(initial_state, config)
+        # 立即保存原始消息（待翻译状态）
+        message_id = uuid.uuid4().hex
+        success = room_manager.add_message(
+            current_room_id,
+            current_username,
+            text,
+            message_id=message_id,
+            status="pending"
+        )
+        if not success:
+            st.session_state._last_message_status = "error"
+            st.session_state._last_message_error = "消息保存失败"
+            return
         
-        # 获取处理后的消息
-        messages = final_state.get("messages", [])
-        if messages:
-            last_message = messages[-1]
-            content = last_message.content
-            
-            # 解析消息内容（格式：用户名: 原始文本 | 翻译文本 | 原始语言）
-            if ":" in content:
-                parts = content.split(":", 1)
-                user = parts[0].strip()
-                msg_parts = parts[1].strip().split(" | ")
-                original_text = msg_parts[0].strip() if len(msg_parts) > 0 else ""
-                translated_text = msg_parts[1].strip() if len(msg_parts) > 1 and msg_parts[1] else None
-                original_lang = msg_parts[2].strip() if len(msg_parts) > 2 else None
-            else:
-                user = current_username
-                original_text = content
-                translated_text = None
-                original_lang = None
-            
-            # 如果解析后的原始文本为空，使用原始输入
-            if not original_text:
-                original_text = text
-            
-            # 添加到房间（保存原始文本和翻译文本）
-            success = room_manager.add_message(
-                current_room_id, 
-                user, 
-                original_text, 
-                translated_text=translated_text,
-                original_lang=original_lang
-            )
-            
-            if success:
-                # 更新本地消息
-                st.session_state.meeting_messages.append({
-                    "user": user,
-                    "original_text": original_text,
-                    "translated_text": translated_text,
-                    "original_lang": original_lang
-                })
-                # 显示成功提示（会在rerun后显示）
-                st.session_state._last_message_status = "success"
-            else:
-                st.session_state._last_message_status = "error"
-                st.session_state._last_message_error = "消息保存失败"
-        else:
-            # 如果没有消息返回，直接保存原始文本
-            success = room_manager.add_message(
-                current_room_id,
-                current_username,
-                text,
-                translated_text=None,
-                original_lang=None
-            )
-            if success:
-                st.session_state.meeting_messages.append({
-                    "user": current_username,
-                    "original_text": text,
-                    "translated_text": None,
-                    "original_lang": None
-                })
-                st.session_state._last_message_status = "success"
-            else:
-                st.session_state._last_message_status = "error"
-                st.session_state._last_message_error = "消息保存失败"
+        st.session_state.meeting_messages.append({
+            "message_id": message_id,
+            "status": "pending",
+            "user": current_username,
+            "original_text": text,
+            "translated_text": None,
+            "original_lang": None,
+            "translations": {}
+        })
+        
+        # 提交到后台工作池；队列已满时同步执行
+        pool = get_translation_worker_pool()
+        job = functools.partial(_run_translation_job, app, initial_state, config, current_room_id, message_id, pool)
+        if not pool.submit(current_room_id, message_id, job):
+            job()
+        
+        st.session_state._last_message_status = "success"
     except Exception as e:
         st.session_state._last_message_status = "error"
         st.session_state._last_message_error = f"处理消息时出错: {str(e)}"
@@ -1037,8 +1247,54 @@ def _process_text_input(text: str):
         st.exception(e)
 
 
-def _process_audio_input(audio_data):
-    """处理语音输入"""
+def _recognize_streaming(audio_bytes: bytes, placeholder) -> Optional[str]:
+    """流式识别语音，识别过程中在输入区显示部分结果
+    
+    Args:
+        audio_bytes: WAV 音频字节
+        placeholder: 显示部分结果的占位组件
+        
+    Returns:
+        最终识别文本；流式识别不可用或失败时返回 None（由调用方改用整段识别）
+    """
+    from ..services.streaming_asr import get_streaming_speech_recognizer, wav_sample_rate
+    
+    placeholder.caption(f"🎤 {t('recognizing')}")
+    try:
+        recognizer = get_streaming_speech_recognizer()
+        final_text = None
+        with usage_scope(
+            room_id=st.session_state.get("room_id"),
+            user=st.session_state.get("username", ""),
+            call_site="audio_input"
+        ):
+            for result in recognizer.recognize_stream(
+                audio_bytes,
+                format="wav",
+                sample_rate=wav_sample_rate(audio_bytes)
+            ):
+                if result.is_final:
+                    final_text = result.text
+                elif result.text:
+                    placeholder.caption(f"🎤 {result.text}▌")
+        return final_text or None
+    except Exception as e:
+        print(f"流式语音识别出错，改用整段识别: {str(e)}")
+        return None
+    finally:
+        placeholder.empty()
+
+
+def _process_audio_input(audio_data, partial_placeholder=None):
+    """处理语音输入
+    
+    识别路径按顺序选择：
+    1. ASR_STREAMING 开启（默认关闭）时在脚本线程中流式识别，边识别边显示部分结果，
+       识别完成后按文字消息处理；
+    2. 否则（或流式识别失败时）ASR_ASYNC 开启（默认）则提交异步识别任务，立即返回，
+       消息先显示为"转写中"，由后台线程写回识别结果并提交翻译；
+    3. 都关闭时整段音频交给工作流同步识别。
+    """
     room_manager = get_room_manager()
     current_room_id = st.session_state.get("room_id")
     
@@ -1051,67 +1307,70 @@ def _process_audio_input(audio_data):
     current_username = st.session_state.get("username", "")
     
     try:
-        # 将音频数据转换为base64
-        audio_bytes = audio_data.read()
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        # getvalue() 取整段录音，不受缓冲区读取位置影响（重跑时不会读到空内容）
+        audio_bytes = audio_data.getvalue()
+        
+        # 转单声道、重采样到识别采样率并裁剪首尾静音，缩小上传体积
+        if get_settings().audio_preprocess:
+            from ..services.audio_preprocessing import get_audio_preprocessor
+            audio_bytes = get_audio_preprocessor().process(audio_bytes).audio
+        
+        if partial_placeholder is not None and get_settings().asr_streaming:
+            recognized_text = _recognize_streaming(audio_bytes, partial_placeholder)
+            if recognized_text:
+                _process_text_input(recognized_text)
+                return
+        
+        # 异步提交识别任务，结果由后台线程写回，不阻塞脚本线程
+        if get_settings().asr_async:
+            if _submit_transcription(audio_bytes, current_room_id, room_language, current_username):
+                st.success(t("transcribing"))
+            else:
+                st.error("消息保存失败")
+            return
+        
+        # 音频按引用传入工作流，状态（及检查点）中只保存引用
+        from ..services.audio_store import get_audio_store
+        from ..services.streaming_asr import wav_sample_rate
+        audio_store = get_audio_store()
+        audio_ref = audio_store.put(audio_bytes, format="wav", sample_rate=wav_sample_rate(audio_bytes))
+        del audio_bytes
         
         # 初始化工作流状态
         initial_state: MeetingState = {
             "messages": [],
             "room_language": room_language,
             "current_user": current_username,
-            "audio_data": audio_base64,
+            "audio_ref": audio_ref,
             "original_text": None,
+            "detected_lang": None,
+            "detected_lang_confidence": None,
+            "detected_mixed": None,
             "translated_text": None,
+            "translations": None,
+            "timings": None,
+            "result": None,
             "participants": st.session_state.get("participants", [current_username] if current_username else [])
         }
         
         # 执行工作流
         app = get_meeting_app()
-        config = {
-            "configurable": {"thread_id": f"room_{current_room_id}"}
-        }
+        config = meeting_thread_config(current_room_id)
         
         # 执行工作流
-        final_state = app.invoke(initial_state, config)
+        try:
+            with usage_scope(room_id=current_room_id, user=current_username):
+                final_state = app.invoke(initial_state, config)
+        finally:
+            # 识别节点未执行（如工作流出错）时也立即释放音频
+            audio_store.pop(audio_ref)
+            release_meeting_thread(app, config)
         
-        # 获取处理后的消息
-        messages = final_state.get("messages", [])
-        if messages:
-            last_message = messages[-1]
-            content = last_message.content
-            
-            # 解析消息内容（格式：用户名: 原始文本 | 翻译文本 | 原始语言）
-            if ":" in content:
-                parts = content.split(":", 1)
-                user = parts[0].strip()
-                msg_parts = parts[1].strip().split(" | ")
-                original_text = msg_parts[0].strip() if len(msg_parts) > 0 else ""
-                translated_text = msg_parts[1].strip() if len(msg_parts) > 1 and msg_parts[1] else None
-                original_lang = msg_parts[2].strip() if len(msg_parts) > 2 else None
-            else:
-                user = current_username
-                original_text = content
-                translated_text = None
-                original_lang = None
-            
-            # 添加到房间（保存原始文本和翻译文本）
-            room_manager.add_message(
-                current_room_id, 
-                user, 
-                original_text, 
-                translated_text=translated_text,
-                original_lang=original_lang
-            )
-            
-            # 更新本地消息
-            st.session_state.meeting_messages.append({
-                "user": user,
-                "original_text": original_text,
-                "translated_text": translated_text,
-                "original_lang": original_lang
-            })
-            
+        # 工作流生成的消息记录直接保存到房间
+        result = final_state.get("result")
+        if result:
+            room_manager.add_message(current_room_id, **result)
+            st.session_state.meeting_messages.append(dict(result))
             st.success("语音识别成功！")
     except Exception as e:
         st.error(f"处理语音时出错: {str(e)}")
@@ -61,6 +61,12 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "voice_input": "语音输入",
         "send_text": "发送文字",
         "send_audio": "发送语音",
+        "translating": "翻译中…",
+        "recognizing": "识别中…",
+        "transcribing": "转写中…",
+        "transcription_failed": "语音识别失败",
+        "translation_failed": "翻译失败",
+        "retry_translation": "重新翻译",
         "chat_messages": "聊天消息",
         "no_messages": "暂无消息",
         
@@ -149,6 +155,12 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "voice_input": "Voice Input",
         "send_text": "Send Text",
         "send_audio": "Send Audio",
+        "translating": "Translating…",
+        "recognizing": "Recognizing…",
+        "transcribing": "Transcribing…",
+        "transcription_failed": "Speech recognition failed",
+        "translation_failed": "Translation failed",
+        "retry_translation": "Retry translation",
         "chat_messages": "Chat Messages",
         "no_messages": "No messages yet",
         
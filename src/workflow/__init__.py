@@ -1,5 +1,6 @@
 """工作流构建模块"""
 
 from .meeting_workflow import get_meeting_app
+from .checkpointing import BoundedMemorySaver, SqliteCheckpointSaver, meeting_thread_config, release_meeting_thread
 
-__all__ = ["get_meeting_app"]
+__all__ = ["get_meeting_app", "BoundedMemorySaver", "SqliteCheckpointSaver", "meeting_thread_config", "release_meeting_thread"]
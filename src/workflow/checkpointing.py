@@ -0,0 +1,619 @@
+"""工作流检查点 - 限制每个房间线程的检查点增长，可选 SQLite 持久化
+
+两种检查点都只保留每个线程最新的若干个检查点。中间写入（put_writes）在后台保存，
+可能晚于下一个检查点到达：所属检查点已被清理时直接丢弃，不留下无法再清理的孤立写入。
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from ..config.settings import get_settings
+
+
+class BoundedMemorySaver(MemorySaver):
+    """有界的内存检查点
+
+    MemorySaver 为每个线程的每一步保存一份完整快照，且永不释放。这里在每次保存后：
+    只保留每个线程最新的 keep_last 个检查点（连同它们不再引用的通道数据和中间写入），
+    并删除超过 idle_ttl 秒没有活动的线程。
+    """
+
+    def __init__(self, keep_last: int = 1, idle_ttl: float = 0.0):
+        """初始化检查点
+
+        Args:
+            keep_last: 每个线程保留的检查点数（0 表示全部保留）
+            idle_ttl: 线程无活动多少秒后删除（0 表示不删除）
+        """
+        super().__init__()
+        self.keep_last = keep_last
+        self.idle_ttl = idle_ttl
+        self.lock = threading.RLock()
+        self._blob_keys: Dict[Tuple[str, str], Set[Tuple[str, str, str, Any]]] = defaultdict(set)
+        self._last_active: Dict[str, float] = {}
+
+        # 统计信息
+        self.pruned_checkpoints = 0
+        self.deleted_threads = 0
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """保存检查点，随后清理旧检查点和空闲线程"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self.lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            self._blob_keys[(thread_id, checkpoint_ns)].update(
+                (thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()
+            )
+            self._last_active[thread_id] = time.monotonic()
+            if self.keep_last > 0:
+                self._prune(thread_id, checkpoint_ns)
+            if self.idle_ttl > 0:
+                self._delete_idle_threads()
+        return next_config
+
+    def put_writes(self, config: RunnableConfig, writes: Any, task_id: str, task_path: str = "") -> None:
+        """保存中间写入（与清理互斥，所属检查点已被清理时丢弃）"""
+        configurable = config["configurable"]
+        with self.lock:
+            checkpoints = self.storage.get(configurable["thread_id"], {}).get(configurable.get("checkpoint_ns", ""), {})
+            if configurable["checkpoint_id"] not in checkpoints:
+                return
+            super().put_writes(config, writes, task_id, task_path)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """只保留线程最新的 keep_last 个检查点（调用方持有锁）"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_last:
+            return
+
+        # 检查点ID按时间单调递增
+        checkpoint_ids = sorted(checkpoints)
+        for checkpoint_id in checkpoint_ids[:-self.keep_last]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self.pruned_checkpoints += 1
+
+        # 删除保留的检查点都不再引用的通道数据
+        live = set()
+        for checkpoint_id in checkpoint_ids[-self.keep_last:]:
+            saved = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+            live.update(
+                (thread_id, checkpoint_ns, channel, version)
+                for channel, version in saved.get("channel_versions", {}).items()
+            )
+        blob_keys = self._blob_keys[(thread_id, checkpoint_ns)]
+        for key in blob_keys - live:
+            self.blobs.pop(key, None)
+        blob_keys &= live
+
+    def _delete_idle_threads(self):
+        """删除超过 idle_ttl 秒没有活动的线程（调用方持有锁）"""
+        expired_before = time.monotonic() - self.idle_ttl
+        for thread_id in [tid for tid, active in self._last_active.items() if active < expired_before]:
+            self.delete_thread(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """删除线程的全部检查点"""
+        with self.lock:
+            super().delete_thread(thread_id)
+            for key in [key for key in self._blob_keys if key[0] == thread_id]:
+                del self._blob_keys[key]
+            if self._last_active.pop(thread_id, None) is not None:
+                self.deleted_threads += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取当前保存的线程数、检查点数和清理情况"""
+        with self.lock:
+            # storage 是 defaultdict：读取已删除或不存在的线程会留下空条目，不计入线程数
+            return {
+                "threads": sum(1 for namespaces in self.storage.values() if any(namespaces.values())),
+                "checkpoints": sum(
+                    len(checkpoints)
+                    for namespaces in self.storage.values()
+                    for checkpoints in namespaces.values()
+                ),
+                "writes": sum(len(writes) for writes in self.writes.values()),
+                "blobs": len(self.blobs),
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "deleted_threads": self.deleted_threads
+            }
+
+
+# 超过该字节数的序列化数据压缩后保存
+_COMPRESS_MIN_BYTES = 512
+_COMPRESSED_SUFFIX = "+zlib"
+# 元数据以 JSON 文本保存（不压缩），list 的 filter 可以在 SQL 中用 json_extract 比较
+_METADATA_JSON_TYPE = "json"
+# 可以作为 JSON 路径直接写入 SQL 的元数据键
+_METADATA_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_checkpoints_thread_updated ON checkpoints (thread_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_updated ON checkpoints (updated_at);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """SQLite 检查点
+
+    检查点保存在 SQLite 文件中：房间线程的状态（如 window 策略保留的最近消息）在进程重启后
+    仍然保留，多个工作进程共享同一份状态（WAL 模式，读写互不阻塞），内存占用不随房间数增长。
+    重启时中断的调用不会自动继续：对应的消息由待处理消息超时清理标记为失败，可在界面上重试。
+    表以 thread_id 开头的主键组织，按线程读取和清理只扫描该线程的行；序列化结果较大时
+    用 zlib 压缩，元数据以 JSON 文本保存，list 的过滤和数量限制在 SQL 中完成。
+
+    每次保存后只保留线程最新的 keep_last 个检查点，并定期删除超过 ttl 秒没有更新的线程。
+    异步接口在默认线程池中执行对应的同步方法，不阻塞事件循环。
+    """
+
+    def __init__(self, path: str, keep_last: int = 1, ttl: float = 0.0, prune_interval: float = 60.0):
+        """初始化检查点
+
+        Args:
+            path: SQLite 数据库文件路径
+            keep_last: 每个线程保留的检查点数（0 表示全部保留）
+            ttl: 线程多少秒没有更新后删除（0 表示不删除）
+            prune_interval: 两次过期清理之间的最短间隔（秒）
+        """
+        super().__init__()
+        self.path = path
+        self.keep_last = keep_last
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self.lock = threading.RLock()
+        self._last_prune = 0.0
+
+        # 统计信息
+        self.pruned_checkpoints = 0
+        self.deleted_threads = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30.0, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        """序列化（较大的数据压缩后保存）"""
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= _COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data):
+                return type_ + _COMPRESSED_SUFFIX, compressed
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        """反序列化"""
+        if type_.endswith(_COMPRESSED_SUFFIX):
+            type_ = type_[:-len(_COMPRESSED_SUFFIX)]
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _pending_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        """读取检查点的中间写入"""
+        rows = self.connection.execute(
+            "SELECT task_id, channel, type, value FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+            " ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return [(task_id, channel, self._loads(type_, value)) for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        """将查询结果转换为检查点元组"""
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self._loads(type_, checkpoint),
+            metadata=self._loads(metadata_type, metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._pending_writes(thread_id, checkpoint_ns, checkpoint_id)
+        )
+
+    @staticmethod
+    def _metadata_conditions(filter: Dict[str, Any]) -> Tuple[List[str], List[Any], Dict[str, Any]]:
+        """将元数据过滤条件转换为 SQL 条件
+
+        Returns:
+            (SQL 条件, 参数, 只能在读取后比较的条件)；字符串、数字、布尔值和 None 在 SQL 中比较，
+            其余值（如字典、列表）和不能写入 JSON 路径的键在读取后比较
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        remaining: Dict[str, Any] = {}
+        for key, value in filter.items():
+            if not _METADATA_KEY_PATTERN.match(key) or not (value is None or isinstance(value, (str, int, float, bool))):
+                remaining[key] = value
+                continue
+            # 只对 JSON 格式的元数据调用 json_extract（CASE 保证按顺序求值）
+            extract = (
+                f"CASE WHEN metadata_type = '{_METADATA_JSON_TYPE}'"
+                f" THEN json_extract(CAST(metadata AS TEXT), '$.{key}') END"
+            )
+            if value is None:
+                # 与按字典比较时一致：缺少的键视为 None
+                conditions.append(f"{extract} IS NULL")
+            else:
+                conditions.append(f"{extract} = ?")
+                params.append(value)
+        return conditions, params, remaining
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """读取指定检查点，未指定检查点ID时读取线程最新的检查点"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self.lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.connection.execute(
+                    f"SELECT {columns} FROM checkpoints"
+                    " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    f"SELECT {columns} FROM checkpoints"
+                    " WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            return self._to_tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """按时间倒序列出检查点（线程、before、filter 和 limit 都在 SQL 中处理）"""
+        conditions = []
+        params: List[Any] = []
+        if config is not None:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        remaining: Dict[str, Any] = {}
+        if filter:
+            metadata_conditions, metadata_params, remaining = self._metadata_conditions(filter)
+            conditions.extend(metadata_conditions)
+            params.extend(metadata_params)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        # 还有读取后才能比较的条件时，数量限制也只能在读取后处理
+        limit_clause = ""
+        if limit is not None and not remaining:
+            limit_clause = " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                f" metadata_type, metadata FROM checkpoints{where} ORDER BY checkpoint_id DESC{limit_clause}",
+                params
+            ).fetchall()
+            results = []
+            for row in rows:
+                if remaining:
+                    # 先只解析元数据，不匹配的行不反序列化检查点
+                    metadata = self._loads(row[6], row[7])
+                    if any(metadata.get(key) != value for key, value in remaining.items()):
+                        continue
+                results.append(self._to_tuple(row[0], row[1], row[2:]))
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """保存检查点，随后清理旧检查点和过期线程"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = self._dumps(checkpoint)
+        metadata_data = json.dumps(
+            get_serializable_checkpoint_metadata(config, metadata), ensure_ascii=False
+        ).encode("utf-8")
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id,"
+                    " parent_checkpoint_id, type, checkpoint, metadata_type, metadata, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                        type_, data, _METADATA_JSON_TYPE, metadata_data, time.time()
+                    )
+                )
+                if self.keep_last > 0:
+                    self._prune(thread_id, checkpoint_ns)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            if self.ttl > 0 and time.monotonic() - self._last_prune >= self.prune_interval:
+                self.delete_expired_threads()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """保存中间写入（特殊通道覆盖旧值，普通通道只写入一次；所属检查点已被清理时丢弃）"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for index, (channel, value) in enumerate(writes):
+            type_, data = self._dumps(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, index), task_path, channel, type_, data
+            ))
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self.connection.execute(
+                    "SELECT 1 FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+                if exists:
+                    self.connection.executemany(
+                        f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, task_path,"
+                        " channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """只保留线程最新的 keep_last 个检查点（调用方持有锁并已开启事务）"""
+        stale = [
+            row[0] for row in self.connection.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                " ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.keep_last)
+            )
+        ]
+        for checkpoint_id in stale:
+            params = (thread_id, checkpoint_ns, checkpoint_id)
+            self.connection.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params
+            )
+            self.connection.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params
+            )
+        self.pruned_checkpoints += len(stale)
+
+    def delete_expired_threads(self) -> int:
+        """删除超过 ttl 秒没有更新的线程
+
+        Returns:
+            删除的线程数
+        """
+        with self.lock:
+            self._last_prune = time.monotonic()
+            expired = [
+                row[0] for row in self.connection.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(updated_at) < ?",
+                    (time.time() - self.ttl,)
+                )
+            ]
+            for thread_id in expired:
+                self.delete_thread(thread_id)
+        return len(expired)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """删除线程的全部检查点和中间写入"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self.connection.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                ).rowcount
+                self.connection.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            if deleted:
+                self.deleted_threads += 1
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """异步读取检查点"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """异步按时间倒序列出检查点"""
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """异步保存检查点"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """异步保存中间写入"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.put_writes, config, writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """异步删除线程"""
+        await asyncio.get_running_loop().run_in_executor(None, self.delete_thread, thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取当前保存的线程数、检查点数和清理情况"""
+        with self.lock:
+            threads, checkpoints, size = self.connection.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints"
+            ).fetchone()
+            writes = self.connection.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            return {
+                "threads": threads,
+                "checkpoints": checkpoints,
+                "writes": writes,
+                "checkpoint_bytes": size,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "deleted_threads": self.deleted_threads
+            }
+
+
+def create_checkpointer() -> Union[BoundedMemorySaver, SqliteCheckpointSaver]:
+    """按配置的存储方式和检查点策略创建检查点
+
+    存储方式（CHECKPOINT_BACKEND）：memory 保存在进程内存中；sqlite 保存在 CHECKPOINT_SQLITE_PATH，
+    重启后保留，并删除超过 CHECKPOINT_TTL 秒没有更新的线程。
+
+    检查点策略（CHECKPOINT_POLICY）：
+    - per_invocation：每次调用使用独立线程，调用结束即删除，不保留任何状态
+    - window：房间线程保留最近的消息（见 CHECKPOINT_MAX_MESSAGES）和最新的检查点
+    - prune：房间线程保留最新的检查点，空闲超过 CHECKPOINT_IDLE_TTL 秒的线程整体删除
+    """
+    settings = get_settings()
+    policy = settings.checkpoint_policy
+    keep_last = 1 if policy == "per_invocation" else settings.checkpoint_keep_last
+    if settings.checkpoint_backend == "sqlite":
+        ttl = settings.checkpoint_ttl
+        if policy == "prune":
+            ttl = min(ttl, settings.checkpoint_idle_ttl) if ttl > 0 else settings.checkpoint_idle_ttl
+        return SqliteCheckpointSaver(settings.checkpoint_sqlite_path, keep_last=keep_last, ttl=ttl)
+    if policy == "prune":
+        return BoundedMemorySaver(keep_last=keep_last, idle_ttl=settings.checkpoint_idle_ttl)
+    return BoundedMemorySaver(keep_last=keep_last)
+
+
+def meeting_thread_config(room_id: str) -> Dict[str, Any]:
+    """获取调用会议工作流的运行配置
+
+    per_invocation 策略下每次调用使用新的线程ID，调用结束后由 release_meeting_thread 删除。
+    """
+    thread_id = f"room_{room_id}"
+    if get_settings().checkpoint_policy == "per_invocation":
+        thread_id = f"{thread_id}_{uuid.uuid4().hex}"
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def release_meeting_thread(app, config: Dict[str, Any]):
+    """调用结束后释放线程（仅 per_invocation 策略下删除检查点）"""
+    if get_settings().checkpoint_policy != "per_invocation":
+        return
+    checkpointer: Optional[BaseCheckpointSaver] = getattr(app, "checkpointer", None)
+    if checkpointer is not None:
+        checkpointer.delete_thread(config["configurable"]["thread_id"])
@@ -1,15 +1,27 @@
 """会议聊天室工作流"""
 
+import time
+
 import streamlit as st
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from typing import Literal
-from ..state.meeting_state import MeetingState
+from typing import Callable, Literal
+from ..state.meeting_state import MeetingState, get_target_languages
 from ..nodes.speech_recognition_node import speech_recognition_node
 from ..nodes.translation_node import translation_node
 from ..nodes.message_node import message_node
 from ..nodes.meeting_routing import should_translate, should_recognize_speech
+from ..nodes.language import detect_language_updates
+from .checkpointing import create_checkpointer
+
+
+def _timed(name: str, node: Callable[[MeetingState], dict]) -> Callable[[MeetingState], dict]:
+    """包装节点，将节点耗时写入状态的 timings 字段"""
+    def run(state: MeetingState) -> dict:
+        start = time.perf_counter()
+        updates = node(state)
+        return {**updates, "timings": {name: round(time.perf_counter() - start, 4)}}
+    return run
 
 
 @st.cache_resource
@@ -23,14 +35,18 @@ def get_meeting_app():
     
     # 创建入口路由节点
     def entry_node(state: MeetingState) -> dict:
-        """入口节点：根据输入类型路由到不同节点"""
-        # 这个节点不做任何处理，只是路由
-        return {}
+        """入口节点：根据输入类型路由到不同节点，文本输入在此检测一次语言"""
+        # 清空上一次调用留在检查点中的耗时和消息记录
+        reset = {"timings": None, "result": None}
+        if state.get("audio_ref"):
+            # 语音输入由语音识别节点在识别后检测语言
+            return {**reset, **detect_language_updates(None)}
+        return {**reset, **detect_language_updates(state.get("original_text"), get_target_languages(state))}
     
     # 添加节点
     workflow.add_node("entry", entry_node)
-    workflow.add_node("speech_recognition", speech_recognition_node)
-    workflow.add_node("translation", translation_node)
+    workflow.add_node("speech_recognition", _timed("speech_recognition", speech_recognition_node))
+    workflow.add_node("translation", _timed("translation", translation_node))
     workflow.add_node("message", message_node)
     
     # 设置入口点
@@ -64,7 +80,6 @@ def get_meeting_app():
     
     # 编译工作流
     try:
-        memory = MemorySaver()
-        return workflow.compile(checkpointer=memory)
+        return workflow.compile(checkpointer=create_checkpointer())
     except Exception:
         return workflow.compile()
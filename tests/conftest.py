@@ -0,0 +1,38 @@
+"""测试公共配置：将项目根目录加入模块搜索路径，并提供本地模拟服务"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 测试不访问真实服务，只需要一个非空的 API 密钥
+os.environ.setdefault("DASHSCOPE_API_KEY", "test-key")
+
+from fake_asr_http import FakeAsrHttpServer  # noqa: E402
+from fake_asr_ws import FakeStreamingAsrServer  # noqa: E402
+
+
+@pytest.fixture
+def asr_http_server():
+    server = FakeAsrHttpServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def speech_service(asr_http_server, monkeypatch):
+    """指向本地模拟服务、不使用缓存的语音识别服务"""
+    monkeypatch.setenv("ASR_CACHE", "false")
+    from src.services.speech_recognition import SpeechRecognitionService
+    service = SpeechRecognitionService()
+    service.base_url = f"{asr_http_server.url}/asr"
+    service.tasks_url = f"{asr_http_server.url}/tasks"
+    return service
+
+
+@pytest.fixture
+def asr_ws_server():
+    server = FakeStreamingAsrServer().start()
+    yield server
+    server.stop()
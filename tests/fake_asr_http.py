@@ -0,0 +1,119 @@
+"""测试用的语音识别 HTTP 服务（模拟 DashScope 的整段识别、异步任务和结果文件下载）"""
+
+import base64
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class FakeAsrHttpServer:
+    """本地语音识别 HTTP 服务
+
+    - POST /asr：整段识别，返回 text；带 X-DashScope-Async: enable 时创建异步任务
+    - GET /tasks/<task_id>：前 polls_before_success 次返回 RUNNING，之后返回 SUCCEEDED
+      和结果文件地址
+    - GET /files/<task_id>.json：结果文件，状态码为 file_status
+
+    设置 segment_texts 时，依次创建的异步任务分别返回其中的文字（模拟长语音的各段）。
+    """
+
+    def __init__(self, text: str = "hello", polls_before_success: int = 2):
+        self.text = text
+        self.polls_before_success = polls_before_success
+        self.file_status = 200
+        self.poll_delay = 0.0
+        self.segment_texts: List[str] = []
+        self.task_texts: Dict[str, str] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.uploads: List[bytes] = []
+        self.polls: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeAsrHttpServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: Dict[str, Any]):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _record(self, body: bytes = b""):
+                with fake.lock:
+                    fake.requests.append({
+                        "method": self.command,
+                        "path": self.path,
+                        "headers": dict(self.headers),
+                        "body_bytes": len(body)
+                    })
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                self._record(body)
+                payload = json.loads(body)
+                with fake.lock:
+                    fake.uploads.append(base64.b64decode(payload["audio"]))
+                if self.headers.get("X-DashScope-Async") == "enable":
+                    task_id = uuid.uuid4().hex
+                    with fake.lock:
+                        fake.polls[task_id] = 0
+                        if fake.segment_texts:
+                            fake.task_texts[task_id] = fake.segment_texts[len(fake.task_texts)]
+                    self._send(200, {"output": {"task_id": task_id, "task_status": "PENDING"}})
+                else:
+                    self._send(200, {"output": {"text": fake.text}, "usage": {"duration": 1}})
+
+            def do_GET(self):
+                self._record()
+                if self.path.startswith("/files/"):
+                    if fake.file_status != 200:
+                        self._send(fake.file_status, {"error": "expired"})
+                    else:
+                        task_id = self.path[len("/files/"):-len(".json")]
+                        text = fake.task_texts.get(task_id, fake.text)
+                        self._send(200, {"transcripts": [{"text": text}]})
+                    return
+                task_id = self.path.rsplit("/", 1)[1]
+                if fake.poll_delay:
+                    threading.Event().wait(fake.poll_delay)
+                with fake.lock:
+                    fake.polls[task_id] = fake.polls.get(task_id, 0) + 1
+                    polls = fake.polls[task_id]
+                if polls <= fake.polls_before_success:
+                    self._send(200, {"output": {"task_id": task_id, "task_status": "RUNNING"}})
+                    return
+                self._send(200, {
+                    "output": {
+                        "task_id": task_id,
+                        "task_status": "SUCCEEDED",
+                        "results": [{"transcription_url": f"{fake.url}/files/{task_id}.json"}]
+                    },
+                    "usage": {"duration": 3}
+                })
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,100 @@
+"""测试用的流式语音识别 WebSocket 服务（模拟 DashScope 实时语音识别协议）"""
+
+import json
+import threading
+from typing import List
+
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import ServerConnection, serve
+
+
+class FakeStreamingAsrServer:
+    """本地流式语音识别服务
+
+    每个连接上可以依次运行多个任务：run-task 返回 task-started；每收到一帧音频推进一步，
+    按 sentences 依次推送句子的临时结果（首个单词）和结束结果；finish-task 返回
+    task-finished。fail_tasks 为 True 时，收到第一帧音频后返回 task-failed。
+    """
+
+    def __init__(self, sentences: List[str] = None):
+        self.sentences = sentences or ["Hello everyone.", "Let's start."]
+        self.fail_tasks = False
+        self.connections = 0
+        self.closed_connections = 0
+        self.tasks = 0
+        self.lock = threading.Lock()
+        self.server = serve(self._handle, "127.0.0.1", 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.server.socket.getsockname()[1]}"
+
+    def start(self) -> "FakeStreamingAsrServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _events(self) -> List[dict]:
+        """按帧推送的 result-generated 事件：每个句子先推临时结果，再推结束结果"""
+        events = []
+        for sentence in self.sentences:
+            events.append({"text": sentence.split()[0], "sentence_end": False})
+            events.append({"text": sentence, "sentence_end": True})
+        return events
+
+    def _handle(self, connection: ServerConnection):
+        with self.lock:
+            self.connections += 1
+        try:
+            while True:
+                task_id = json.loads(connection.recv())["header"]["task_id"]
+                with self.lock:
+                    self.tasks += 1
+                self._run_task(connection, task_id)
+        except ConnectionClosed:
+            with self.lock:
+                self.closed_connections += 1
+
+    def _run_task(self, connection: ServerConnection, task_id: str):
+        connection.send(json.dumps({"header": {"event": "task-started", "task_id": task_id}}))
+        events = self._events()
+        frames = 0
+        while True:
+            message = connection.recv()
+            if isinstance(message, bytes):
+                frames += 1
+                if self.fail_tasks:
+                    connection.send(json.dumps({
+                        "header": {
+                            "event": "task-failed",
+                            "task_id": task_id,
+                            "error_code": "InvalidParameter",
+                            "error_message": "bad audio"
+                        }
+                    }))
+                    # 与真实服务一致：失败后不再处理本任务的音频
+                    self._drain(connection)
+                    return
+                if frames <= len(events):
+                    connection.send(json.dumps({
+                        "header": {"event": "result-generated", "task_id": task_id},
+                        "payload": {"output": {"sentence": events[frames - 1]}}
+                    }))
+                continue
+            if json.loads(message)["header"]["action"] == "finish-task":
+                connection.send(json.dumps({
+                    "header": {"event": "task-finished", "task_id": task_id},
+                    "payload": {"usage": {"duration": 1}}
+                }))
+                return
+
+    @staticmethod
+    def _drain(connection: ServerConnection):
+        """丢弃失败任务剩余的音频帧，直到客户端发送 finish-task 或关闭连接"""
+        while True:
+            message = connection.recv()
+            if not isinstance(message, bytes) and json.loads(message)["header"]["action"] == "finish-task":
+                return
@@ -0,0 +1,53 @@
+"""测试用的聊天模型（固定回复，可模拟慢响应和首个流式片段的延迟）"""
+
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+
+class FakeChatModel(BaseChatModel):
+    """固定回复的聊天模型
+
+    Attributes:
+        reply: 回复内容（流式输出时按空格切分为片段）
+        delay: 非流式调用的耗时（秒）
+        first_chunk_delay: 流式调用首个片段前的等待时间（秒）
+        calls: 每次调用的额外参数（如 timeout、response_format）
+    """
+
+    reply: str = ""
+    delay: float = 0.0
+    first_chunk_delay: float = 0.0
+    model_name: str = "fake-model"
+    calls: List[Dict[str, Any]] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        self.calls.append(kwargs)
+        time.sleep(self.first_chunk_delay)
+        for index, word in enumerate(self.reply.split(" ")):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == 0 else f" {word}"))
@@ -0,0 +1,76 @@
+"""语音识别结果缓存测试"""
+
+import os
+
+from src.services.asr_cache import AsrCache, asr_cache_key
+
+AUDIO = b"\x00\x01" * 1000
+
+
+def test_key_depends_on_audio_format_rate_and_model():
+    key = asr_cache_key(AUDIO, "wav", 16000, "paraformer-realtime-v2")
+
+    assert asr_cache_key(AUDIO, "wav", 16000, "paraformer-realtime-v2") == key
+    assert asr_cache_key(AUDIO + b"\x00", "wav", 16000, "paraformer-realtime-v2") != key
+    assert asr_cache_key(AUDIO, "pcm", 16000, "paraformer-realtime-v2") != key
+    assert asr_cache_key(AUDIO, "wav", 8000, "paraformer-realtime-v2") != key
+    assert asr_cache_key(AUDIO, "wav", 16000, "paraformer-v2") != key
+
+
+def test_memory_is_an_lru():
+    cache = AsrCache(max_entries=2)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    cache.get("a")
+    cache.put("c", "third")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("first", "third")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_layer_serves_entries_evicted_from_memory(tmp_path):
+    cache = AsrCache(max_entries=1, cache_dir=str(tmp_path))
+    cache.put("a", "first")
+    cache.put("b", "second")
+
+    assert cache.get("a") == "first"
+    stats = cache.stats()
+    assert (stats["hits"], stats["disk_hits"]) == (1, 1)
+    # 新进程从磁盘读取
+    assert AsrCache(cache_dir=str(tmp_path)).get("b") == "second"
+
+
+def test_disk_layer_evicts_least_recently_used_files(tmp_path):
+    cache = AsrCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=2)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    os.utime(tmp_path / "a.json", (1, 1))
+    os.utime(tmp_path / "b.json", (2, 2))
+    # 磁盘命中刷新修改时间，a 变为最近使用
+    assert cache.get("a") == "first"
+
+    cache.put("c", "third")
+
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+    stats = cache.stats()
+    assert (stats["disk_entries"], stats["disk_evictions"]) == (2, 1)
+
+
+def test_disk_limit_counts_existing_files(tmp_path):
+    AsrCache(cache_dir=str(tmp_path)).put("a", "first")
+    os.utime(tmp_path / "a.json", (1, 1))
+
+    cache = AsrCache(cache_dir=str(tmp_path), max_disk_entries=1)
+    cache.put("b", "second")
+
+    assert os.listdir(tmp_path) == ["b.json"]
+
+
+def test_empty_text_is_not_cached(tmp_path):
+    cache = AsrCache(cache_dir=str(tmp_path))
+    cache.put("a", "")
+
+    assert cache.get("a") is None
+    assert os.listdir(tmp_path) == []
+    assert cache.stats()["misses"] == 1
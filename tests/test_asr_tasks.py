@@ -0,0 +1,78 @@
+"""异步语音识别任务的测试（使用本地模拟服务）"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.services.asr_tasks import AsrTaskPoller
+from src.services.audio_preprocessing import encode_wav
+
+SAMPLE_RATE = 16000
+
+
+def _long_wav() -> bytes:
+    """12.8 秒：4 秒语音 + 0.4 秒停顿，重复三次"""
+    t = np.arange(4 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    pause = np.zeros(int(0.4 * SAMPLE_RATE), dtype=np.float32)
+    return encode_wav(np.concatenate([tone, pause, tone, pause, tone, pause]), SAMPLE_RATE)
+
+
+@pytest.fixture
+def poller(speech_service):
+    return AsrTaskPoller(
+        speech_service,
+        initial_interval=0.05,
+        max_interval=0.1,
+        timeout=10.0,
+        poll_timeout=2.0,
+        max_workers=4
+    )
+
+
+def _submit_and_wait(poller, audios, format="pcm"):
+    results = {}
+    done = threading.Event()
+
+    def on_done(index, text):
+        results[index] = text
+        if len(results) == len(audios):
+            done.set()
+
+    for index, audio in enumerate(audios):
+        poller.submit(audio, lambda text, index=index: on_done(index, text), format=format, sample_rate=SAMPLE_RATE)
+    assert done.wait(timeout=10)
+    return [results[index] for index in range(len(audios))]
+
+
+def test_short_audio_is_one_task(poller, asr_http_server):
+    assert _submit_and_wait(poller, [b"\x00" * 3200]) == ["hello"]
+    stats = poller.stats()
+    assert stats["segments"] == 1
+    assert stats["succeeded"] == 1
+    assert stats["pending"] == 0
+
+
+def test_long_audio_is_submitted_in_segments(poller, asr_http_server, monkeypatch):
+    monkeypatch.setenv("ASR_SEGMENT_SECONDS", "5")
+    asr_http_server.segment_texts = ["first part of the", "of the talk and", "and the end."]
+    assert _submit_and_wait(poller, [_long_wav()], format="wav") == ["first part of the talk and the end."]
+    assert len(asr_http_server.uploads) == 3
+    assert poller.stats()["segments"] == 3
+
+
+def test_failed_transcription_reports_none(poller, asr_http_server):
+    asr_http_server.file_status = 403
+    assert _submit_and_wait(poller, [b"\x00" * 3200]) == [None]
+    assert poller.stats()["failed"] == 1
+
+
+def test_tasks_are_polled_concurrently(poller, asr_http_server):
+    # 每次查询耗时 0.5 秒：逐个查询 4 个任务至少需要 2 秒
+    asr_http_server.polls_before_success = 0
+    asr_http_server.poll_delay = 0.5
+    start = time.monotonic()
+    assert _submit_and_wait(poller, [bytes([index]) * 3200 for index in range(4)]) == ["hello"] * 4
+    assert time.monotonic() - start < 1.5
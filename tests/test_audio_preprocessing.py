@@ -0,0 +1,135 @@
+"""语音预处理测试"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from src.services.audio_preprocessing import AudioPreprocessor, decode_wav, encode_wav, resample, trim_silence
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds: float, amplitude: float = 0.5, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    return np.zeros(int(seconds * sample_rate), dtype=np.float32)
+
+
+def _wav(raw: bytes, sample_width: int, channels: int = 1, sample_rate: int = SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sample_width)
+        writer.setframerate(sample_rate)
+        writer.writeframes(raw)
+    return buffer.getvalue()
+
+
+VALUES = np.array([0.0, 0.5, -0.5, 0.25, -1.0])
+
+
+@pytest.mark.parametrize("sample_width, raw", [
+    (1, (VALUES * 128 + 128).clip(0, 255).astype(np.uint8).tobytes()),
+    (2, (VALUES * 32768).clip(-32768, 32767).astype("<i2").tobytes()),
+    (3, b"".join(int(v * 2 ** 23).to_bytes(3, "little", signed=True) for v in VALUES)),
+    (4, (VALUES * 2 ** 31).clip(-2 ** 31, 2 ** 31 - 1).astype("<i4").tobytes()),
+])
+def test_decode_wav_supports_common_bit_depths(sample_width, raw):
+    samples, sample_rate = decode_wav(_wav(raw, sample_width))
+
+    assert sample_rate == SAMPLE_RATE
+    assert samples.shape == (len(VALUES), 1)
+    assert samples[:, 0] == pytest.approx(VALUES, abs=1 / 128)
+
+
+def test_encode_wav_round_trips_as_16_bit_mono():
+    samples = _tone(0.1)
+
+    audio = encode_wav(samples, SAMPLE_RATE)
+
+    with wave.open(io.BytesIO(audio), "rb") as reader:
+        assert (reader.getnchannels(), reader.getsampwidth(), reader.getframerate()) == (1, 2, SAMPLE_RATE)
+    decoded, _ = decode_wav(audio)
+    assert decoded[:, 0] == pytest.approx(samples, abs=1e-4)
+
+
+def test_stereo_is_mixed_down_to_mono():
+    left = np.full(SAMPLE_RATE, 0.4)
+    right = np.full(SAMPLE_RATE, 0.2)
+    raw = (np.column_stack([left, right]) * 32768).astype("<i2").tobytes()
+
+    result = AudioPreprocessor(target_sample_rate=SAMPLE_RATE, trim=False).process(_wav(raw, 2, channels=2))
+
+    samples, sample_rate = decode_wav(result.audio)
+    assert (samples.shape[1], sample_rate) == (1, SAMPLE_RATE)
+    assert samples[:, 0] == pytest.approx(0.3, abs=1e-3)
+
+
+@pytest.mark.parametrize("source_rate, target_rate", [(48000, 16000), (44100, 16000), (8000, 16000)])
+def test_resampled_length_matches_duration(source_rate, target_rate):
+    samples = _tone(1.5, sample_rate=source_rate)
+
+    output = resample(samples, source_rate, target_rate)
+
+    assert len(output) == round(1.5 * target_rate)
+    assert output.dtype == np.float32
+
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    samples = np.concatenate([_silence(1.0), _tone(1.0), _silence(1.0)])
+
+    trimmed = trim_silence(samples, SAMPLE_RATE, padding_ms=200)
+
+    assert len(trimmed) / SAMPLE_RATE == pytest.approx(1.4, abs=0.05)
+
+
+def test_quiet_speech_within_threshold_is_kept():
+    # 后一秒比前一秒轻 20 dB，仍在 35 dB 阈值内
+    samples = np.concatenate([_tone(1.0), _tone(1.0, amplitude=0.05)])
+
+    trimmed = trim_silence(samples, SAMPLE_RATE, threshold_db=-35.0, padding_ms=200)
+
+    assert len(trimmed) == len(samples)
+
+
+def test_pure_silence_is_returned_unchanged():
+    samples = _silence(1.0)
+
+    assert trim_silence(samples, SAMPLE_RATE) is samples
+
+
+def test_preprocessing_downsamples_and_trims():
+    audio = encode_wav(np.concatenate([_silence(1.0, 48000), _tone(1.0, sample_rate=48000), _silence(1.0, 48000)]), 48000)
+    preprocessor = AudioPreprocessor(target_sample_rate=SAMPLE_RATE)
+
+    result = preprocessor.process(audio)
+
+    assert result.sample_rate == SAMPLE_RATE
+    assert result.processed_seconds == pytest.approx(1.4, abs=0.05)
+    assert preprocessor.stats()["bytes_saved"] == result.bytes_saved > 0
+
+
+def test_original_is_kept_when_processing_would_grow_it():
+    audio = encode_wav(_tone(1.0, sample_rate=8000), 8000)
+    preprocessor = AudioPreprocessor(target_sample_rate=SAMPLE_RATE)
+
+    result = preprocessor.process(audio)
+
+    assert result.audio == audio
+    assert result.sample_rate == 8000
+    assert result.bytes_saved == 0
+    assert preprocessor.stats()["processed_bytes"] == len(audio)
+
+
+def test_non_wav_audio_is_passed_through():
+    preprocessor = AudioPreprocessor()
+
+    result = preprocessor.process(b"not a wav file")
+
+    assert result.audio == b"not a wav file"
+    assert preprocessor.stats()["skipped"] == 1
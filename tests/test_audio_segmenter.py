@@ -0,0 +1,83 @@
+"""长语音分段和识别结果合并的测试"""
+
+import numpy as np
+
+from src.services.audio_preprocessing import decode_wav, encode_wav
+from src.services.audio_segmenter import find_split_points, merge_transcripts, split_wav
+
+SAMPLE_RATE = 8000
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def _speech_with_pauses() -> np.ndarray:
+    """9.8 秒：3 秒语音、0.4 秒停顿（3.0~3.4 秒）、3 秒语音、0.4 秒停顿（6.4~6.8 秒）、3 秒语音"""
+    return np.concatenate([_tone(3), _silence(0.4), _tone(3), _silence(0.4), _tone(3)])
+
+
+def test_split_points_fall_in_pauses():
+    points = find_split_points(_speech_with_pauses(), SAMPLE_RATE, max_segment_seconds=5)
+    assert len(points) == 2
+    assert 3.0 <= points[0] / SAMPLE_RATE < 3.4
+    assert 6.4 <= points[1] / SAMPLE_RATE < 6.8
+
+
+def test_short_audio_is_not_split():
+    audio = encode_wav(_tone(2), SAMPLE_RATE)
+    segments, sample_rate = split_wav(audio, max_segment_seconds=5, overlap_seconds=0.5)
+    assert segments == [audio]
+    assert sample_rate == SAMPLE_RATE
+
+
+def test_split_wav_segments_overlap_and_cover_audio():
+    samples = _speech_with_pauses()
+    audio = encode_wav(samples, SAMPLE_RATE)
+    segments, sample_rate = split_wav(audio, max_segment_seconds=5, overlap_seconds=0.5)
+    assert sample_rate == SAMPLE_RATE
+    assert len(segments) == 3
+
+    original, _ = decode_wav(audio)
+    points = find_split_points(samples, SAMPLE_RATE, max_segment_seconds=5)
+    bounds = [0] + points + [len(samples)]
+    overlap = int(0.5 * SAMPLE_RATE)
+    for index, segment in enumerate(segments):
+        decoded, rate = decode_wav(segment)
+        assert rate == SAMPLE_RATE
+        start = max(0, bounds[index] - overlap)
+        end = bounds[index + 1]
+        # 每段从上一个切分点前 overlap 秒开始，到下一个切分点结束
+        assert decoded.shape == (end - start, 1)
+        assert len(decoded) <= (5 + 0.5) * SAMPLE_RATE
+        # 重新编码为 16 位时允许 1 个量化级的误差
+        np.testing.assert_allclose(decoded[:, 0], original[start:end, 0], atol=2 / 32768)
+
+
+def test_merge_removes_repeated_overlap_words():
+    merged = merge_transcripts(["Hello everyone, let's start", "let's start the meeting."])
+    assert merged == "Hello everyone, let's start the meeting."
+
+
+def test_merge_ignores_case_and_punctuation():
+    merged = merge_transcripts(["We agreed on the plan.", "The plan. Next item"])
+    assert merged == "We agreed on the plan. Next item"
+
+
+def test_merge_chinese_overlap():
+    assert merge_transcripts(["今天我们讨论预算", "讨论预算和进度"]) == "今天我们讨论预算和进度"
+
+
+def test_merge_keeps_single_character_coincidence():
+    # 只有一个汉字相同，不视为重叠
+    assert merge_transcripts(["我们开会", "会议很长"]) == "我们开会会议很长"
+
+
+def test_merge_skips_empty_segments_and_joins_latin_text():
+    assert merge_transcripts(["Hello", "", None, "world"]) == "Hello world"
+    assert merge_transcripts([]) == ""
@@ -0,0 +1,36 @@
+"""音频暂存测试"""
+
+from src.services.audio_store import AudioClip, AudioStore
+
+
+def test_pop_returns_the_clip_once_and_releases_it():
+    store = AudioStore()
+    data = b"\x00\x01" * 100
+    ref = store.put(data, format="pcm", sample_rate=8000)
+
+    assert store.get(ref) == AudioClip(data, "pcm", 8000)
+    clip = store.pop(ref)
+
+    assert clip.data is data
+    assert store.pop(ref) is None
+    assert store.get(ref) is None
+    assert store.stats()["pending"] == 0
+
+
+def test_expired_clips_are_evicted():
+    store = AudioStore(ttl=0)
+    ref = store.put(b"audio")
+
+    stats = store.stats()
+
+    assert (stats["expired"], stats["pending"], stats["pending_bytes"]) == (1, 0, 0)
+    assert store.pop(ref) is None
+
+
+def test_clips_within_ttl_are_kept():
+    store = AudioStore(ttl=300)
+    first = store.put(b"first")
+    store.put(b"second")
+
+    assert store.stats() == {"stored": 2, "expired": 0, "pending": 2, "pending_bytes": 11}
+    assert store.pop(first).data == b"first"
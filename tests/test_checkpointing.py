@@ -0,0 +1,170 @@
+"""工作流检查点的测试（使用与会议工作流无关的小型图）"""
+
+import asyncio
+import operator
+import time
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from src.workflow.checkpointing import (
+    BoundedMemorySaver,
+    SqliteCheckpointSaver,
+    meeting_thread_config,
+    release_meeting_thread,
+)
+
+
+class _State(TypedDict, total=False):
+    items: Annotated[List[str], operator.add]
+    count: int
+
+
+def _build(checkpointer):
+    graph = StateGraph(_State)
+    graph.add_node("first", lambda state: {"count": state.get("count", 0) + 1})
+    graph.add_node("second", lambda state: {"items": [f"step{state['count']}"]})
+    graph.add_edge(START, "first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_prune_keeps_latest_checkpoint_and_state():
+    saver = BoundedMemorySaver(keep_last=1)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    blobs = saver.stats()["blobs"]
+    for _ in range(2):
+        state = app.invoke({"items": ["in"]}, _config("room_a"))
+    assert state == {"items": ["in", "step1", "in", "step2", "in", "step3"], "count": 3}
+    stats = saver.stats()
+    assert stats["threads"] == 1
+    assert stats["checkpoints"] == 1
+    assert stats["pruned_checkpoints"] > 0
+    # 只保留最新检查点引用的通道数据，不随调用次数增长
+    assert stats["blobs"] == blobs
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_late_writes_to_pruned_checkpoint_are_dropped(tmp_path, kind):
+    if kind == "memory":
+        saver = BoundedMemorySaver(keep_last=1)
+    else:
+        saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"), keep_last=1)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    pruned = saver.get_tuple(_config("room_a")).config
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    latest = saver.get_tuple(_config("room_a")).config
+
+    saver.put_writes(pruned, [("items", ["late"])], task_id="late")
+    saver.put_writes(latest, [("items", ["kept"])], task_id="kept")
+    assert saver.get_tuple(pruned) is None
+    assert [write[0] for write in saver.get_tuple(latest).pending_writes] == ["kept"]
+    assert saver.stats()["writes"] == 1
+
+
+def test_keep_last_zero_keeps_every_checkpoint():
+    saver = BoundedMemorySaver(keep_last=0)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    assert saver.stats()["checkpoints"] == len(list(saver.list(_config("room_a"))))
+    assert saver.stats()["pruned_checkpoints"] == 0
+    assert saver.stats()["checkpoints"] > 2
+
+
+def test_idle_threads_are_deleted():
+    saver = BoundedMemorySaver(keep_last=1, idle_ttl=0.05)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    time.sleep(0.1)
+    app.invoke({"items": ["in"]}, _config("room_b"))
+    assert saver.get_tuple(_config("room_a")) is None
+    assert saver.get_tuple(_config("room_b")) is not None
+    assert saver.stats()["deleted_threads"] == 1
+
+
+@pytest.mark.parametrize("policy, released", [("per_invocation", True), ("window", False)])
+def test_release_meeting_thread(monkeypatch, policy, released):
+    monkeypatch.setenv("CHECKPOINT_POLICY", policy)
+    saver = BoundedMemorySaver(keep_last=1)
+    app = _build(saver)
+    config = meeting_thread_config("abc")
+    assert config["configurable"]["thread_id"].startswith("room_abc")
+    if policy == "per_invocation":
+        assert meeting_thread_config("abc") != config
+    app.invoke({"items": ["in"]}, config)
+    release_meeting_thread(app, config)
+    assert (saver.get_tuple(config) is None) == released
+    assert saver.stats()["threads"] == (0 if released else 1)
+
+
+def test_sqlite_state_survives_reopen(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    _build(SqliteCheckpointSaver(path)).invoke({"items": ["in"]}, _config("room_a"))
+    saver = SqliteCheckpointSaver(path)
+    state = _build(saver).invoke({"items": ["in"]}, _config("room_a"))
+    assert state == {"items": ["in", "step1", "in", "step2"], "count": 2}
+    assert saver.stats()["checkpoints"] == 1
+    assert saver.stats()["writes"] == 0
+
+
+def test_sqlite_deletes_expired_threads(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"), ttl=0.05, prune_interval=3600)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    time.sleep(0.1)
+    app.invoke({"items": ["in"]}, _config("room_b"))
+    assert saver.delete_expired_threads() == 1
+    assert saver.get_tuple(_config("room_a")) is None
+    assert saver.get_tuple(_config("room_b")) is not None
+    assert saver.stats()["threads"] == 1
+
+
+def test_sqlite_list_filters_and_limits_in_sql(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"), keep_last=0)
+    app = _build(saver)
+    app.invoke({"items": ["in"]}, _config("room_a"))
+    app.invoke({"items": ["in"]}, _config("room_b"))
+    everything = list(saver.list(_config("room_a")))
+    assert [c.metadata["step"] for c in everything] == sorted((c.metadata["step"] for c in everything), reverse=True)
+
+    statements = []
+    saver.connection.set_trace_callback(statements.append)
+    latest = list(saver.list(_config("room_a"), filter={"source": "loop"}, limit=1))
+    saver.connection.set_trace_callback(None)
+    assert len(latest) == 1
+    assert latest[0].config == everything[0].config
+    assert "json_extract" in statements[0] and "LIMIT" in statements[0]
+
+    older = list(saver.list(_config("room_a"), before=everything[0].config))
+    assert [c.config for c in older] == [c.config for c in everything[1:]]
+    assert [c.metadata["step"] for c in saver.list(None, filter={"step": 1})] == [1, 1]
+    assert list(saver.list(_config("room_a"), filter={"source": "missing"})) == []
+    # 字典值在读取后比较
+    inputs = list(saver.list(_config("room_a"), filter={"source": "input", "parents": {}}))
+    assert [c.metadata["step"] for c in inputs] == [-1]
+
+
+def test_sqlite_async_interface(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"))
+    app = _build(saver)
+
+    async def run():
+        state = await app.ainvoke({"items": ["in"]}, _config("room_a"))
+        latest = await saver.aget_tuple(_config("room_a"))
+        listed = [c async for c in saver.alist(_config("room_a"), limit=1)]
+        await saver.adelete_thread("room_a")
+        return state, latest, listed
+
+    state, latest, listed = asyncio.run(run())
+    assert state == {"items": ["in", "step1"], "count": 1}
+    assert latest.checkpoint["id"] == listed[0].checkpoint["id"]
+    assert saver.get_tuple(_config("room_a")) is None
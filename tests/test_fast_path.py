@@ -0,0 +1,31 @@
+"""快速翻译通道测试"""
+
+from src.services.fast_path import FastPathTranslator
+
+
+def test_classify_keeps_untranslatable_content():
+    fast_path = FastPathTranslator()
+
+    assert fast_path.classify("https://example.com/a?b=1") == "url"
+    assert fast_path.classify("`pip install -r requirements.txt`") == "code"
+    assert fast_path.classify("@alice @bob") == "mention"
+    assert fast_path.classify("12:30") == "number"
+    assert fast_path.classify("👍👍") == "emoji"
+    assert fast_path.classify("see https://example.com") is None
+
+
+def test_phrase_lookup_maps_trailing_punctuation():
+    fast_path = FastPathTranslator()
+
+    assert fast_path.translate("Thank you!", "en", "zh") == "谢谢！"
+    assert fast_path.translate("收到。", "zh", "en") == "Got it."
+    assert fast_path.translate("Thank you for the update", "en", "zh") is None
+
+
+def test_avoided_calls_are_counted_per_translation():
+    fast_path = FastPathTranslator()
+    fast_path.translate("ok", "en", "zh")
+    fast_path.translate("42", "en", "zh")
+    fast_path.translate("please review the draft", "en", "zh")
+
+    assert fast_path.stats() == {"phrase": 1, "number": 1, "total": 2}
@@ -0,0 +1,109 @@
+"""对冲调用器测试"""
+
+import threading
+import time
+
+import pytest
+
+from src.services.hedging import DeadlineExceeded, HedgedCaller
+from src.services.rate_limiter import RateLimiter, RetryableError
+
+
+def warm_up(caller: HedgedCaller, seconds: float = 0.01, samples: int = 20):
+    for _ in range(samples):
+        caller.record_latency(seconds)
+
+
+def slow_then_fast():
+    """首次调用很慢，之后的调用立即返回"""
+    calls = []
+    release = threading.Event()
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+            return "primary"
+        return "hedge"
+
+    return func, calls, release
+
+
+def test_call_does_not_record_latency_itself():
+    caller = HedgedCaller(max_workers=2)
+
+    assert caller.call(lambda: "ok") == "ok"
+    assert len(caller.latency.samples) == 0
+
+
+def test_hedge_fires_after_p95_and_wins():
+    caller = HedgedCaller(max_workers=2, hedge_workers=1)
+    warm_up(caller)
+    func, calls, release = slow_then_fast()
+
+    try:
+        assert caller.call(func, deadline=1.0) == "hedge"
+    finally:
+        release.set()
+    stats = caller.stats()
+    assert (stats["hedges"], stats["hedge_wins"], stats["hedges_skipped"]) == (1, 1, 0)
+
+
+def test_no_hedge_while_limiter_is_throttling():
+    limiter = RateLimiter(max_concurrency=4)
+    with pytest.raises(RetryableError):
+        with limiter.acquire():
+            raise RetryableError("429", status_code=429)
+    caller = HedgedCaller(max_workers=2, limiter=limiter)
+    warm_up(caller)
+    func, calls, release = slow_then_fast()
+    threading.Timer(0.1, release.set).start()
+
+    assert caller.call(func, deadline=1.0) == "primary"
+    assert len(calls) == 1
+    assert caller.stats()["hedges_skipped"] == 1
+
+
+def test_no_hedge_when_hedge_pool_is_full():
+    caller = HedgedCaller(max_workers=2, hedge_workers=1)
+    warm_up(caller)
+    assert caller.hedge_slots.acquire(blocking=False)
+    func, calls, release = slow_then_fast()
+    threading.Timer(0.1, release.set).start()
+
+    try:
+        assert caller.call(func, deadline=1.0) == "primary"
+    finally:
+        caller.hedge_slots.release()
+    assert len(calls) == 1
+    assert caller.stats()["hedges_skipped"] == 1
+
+
+def test_deadline_cancels_queued_calls():
+    caller = HedgedCaller(max_workers=1)
+    release = threading.Event()
+    ran = []
+    blocker = caller.executor.submit(release.wait, 2)
+
+    try:
+        with pytest.raises(DeadlineExceeded):
+            caller.call(lambda: ran.append(1), deadline=0.05, hedge=False)
+    finally:
+        release.set()
+    blocker.result()
+    time.sleep(0.05)
+    assert ran == []
+    assert caller.stats()["cancelled"] == 1
+    assert caller.stats()["deadline_misses"] == 1
+
+
+def test_stream_enforces_first_item_deadline():
+    caller = HedgedCaller(max_workers=2)
+
+    def slow_items():
+        time.sleep(0.2)
+        yield "late"
+
+    with pytest.raises(DeadlineExceeded):
+        list(caller.stream(slow_items(), first_item_deadline=0.05))
+    assert list(caller.stream(iter(["a", "b"]), first_item_deadline=1.0)) == ["a", "b"]
@@ -0,0 +1,78 @@
+"""语言检测测试"""
+
+import pytest
+
+from src.services.language_detector import detect_language
+from src.services.latin_language_id import get_latin_language_identifier
+
+
+# 含人名、地名、外来词的英文短句：后验概率接近 1 的误判曾导致英文会议室中的无谓翻译
+SHORT_ENGLISH = [
+    "I am in Berlin",
+    "Hi Carlos",
+    "Just a sec",
+    "Agenda item two",
+    "pizza time",
+    "We use Kubernetes",
+    "Next slide please",
+    "Any questions",
+    "Welcome aboard Pierre",
+    "Hello from Madrid",
+    "Call with Renault today",
+    "Tacos tonight",
+    "Ciao everyone",
+    "Good morning Sophie",
+]
+
+NON_ENGLISH = [
+    ("fr", "je vous rappelle plus tard"),
+    ("fr", "bonjour à tous"),
+    ("fr", "pouvez-vous partager votre écran"),
+    ("de", "wie geht es dir"),
+    ("de", "ich höre dich nicht"),
+    ("de", "kannst du deinen Bildschirm teilen"),
+    ("es", "buenos días a todos"),
+    ("es", "no te escucho"),
+    ("es", "empezamos en cinco minutos"),
+]
+
+
+@pytest.mark.parametrize("text", SHORT_ENGLISH)
+def test_short_english_with_names_stays_english(text):
+    assert detect_language(text).primary == "en"
+
+
+@pytest.mark.parametrize("lang,text", NON_ENGLISH)
+def test_other_latin_languages_are_identified(lang, text):
+    assert detect_language(text).primary == lang
+
+
+def test_candidates_restrict_latin_languages():
+    text = "je vous rappelle plus tard"
+
+    assert detect_language(text, frozenset({"zh", "en"})).primary == "en"
+    assert detect_language(text, frozenset({"en", "fr"})).primary == "fr"
+    assert detect_language("wie geht es dir", frozenset({"en", "fr"})).primary == "en"
+
+
+def test_scripts_and_mixed_text():
+    assert detect_language("我们明天开会").lang == "zh"
+    assert detect_language("今日は会議です").lang == "ja"
+    assert detect_language("회의 시작합시다").lang == "ko"
+    assert detect_language("这个 API 的 latency 太高了 we need to fix it").lang == "mixed"
+    assert detect_language("123 !!!").lang == "unknown"
+
+
+def test_margin_is_small_for_names_and_large_for_real_text():
+    identifier = get_latin_language_identifier()
+
+    assert identifier.margin("Hi Carlos", "es", "en") < 0.5
+    assert identifier.margin("buenos días a todos", "es", "en") > 0.5
+    assert identifier.margin("", "es", "en") == 0.0
+
+
+def test_predict_only_returns_candidates():
+    identifier = get_latin_language_identifier()
+
+    assert identifier.predict("wie geht es dir", ["en", "fr"])[0] in ("en", "fr")
+    assert identifier.predict("wie geht es dir")[0] == "de"
@@ -0,0 +1,79 @@
+"""翻译模型分级路由测试"""
+
+import pytest
+
+from src.services import model_router
+from src.services.model_router import ModelRouter
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(
+        fast_model_name="fast-model",
+        main_model_name="main-model",
+        short_max_chars=20,
+        max_simple_sentences=1,
+        fast_price_per_1k_tokens=0.5,
+        main_price_per_1k_tokens=2.0
+    )
+
+
+def test_short_single_sentence_uses_fast_model(router):
+    assert router.select("Good morning.") == ModelRouter.FAST
+    assert router.select("大家早上好。") == ModelRouter.FAST
+
+
+def test_length_threshold_is_inclusive(router):
+    assert router.select("a" * 20) == ModelRouter.FAST
+    assert router.select("a" * 21) == ModelRouter.MAIN
+    # 首尾空白不计入长度
+    assert router.select("  " + "a" * 20 + "\n") == ModelRouter.FAST
+
+
+def test_multiple_sentences_use_main_model(router):
+    assert router.select("Hi. Thanks!") == ModelRouter.MAIN
+    assert router.select("你好。谢谢！") == ModelRouter.MAIN
+
+
+def test_sentence_threshold_is_configurable():
+    router = ModelRouter("fast-model", "main-model", short_max_chars=20, max_simple_sentences=2)
+
+    assert router.select("Hi. Thanks!") == ModelRouter.FAST
+    assert router.select("Hi. Thanks! Bye.") == ModelRouter.MAIN
+
+
+def test_decimal_points_are_not_sentence_ends(router):
+    assert router.select("It costs 3.5 yuan") == ModelRouter.FAST
+
+
+def test_multiline_and_code_use_main_model(router):
+    assert router.select("a\nb") == ModelRouter.MAIN
+    assert router.select("run `ls`") == ModelRouter.MAIN
+
+
+def test_each_tier_uses_its_own_model(router, monkeypatch):
+    monkeypatch.setattr(model_router, "get_model", lambda name: f"client:{name}")
+
+    assert router.model(ModelRouter.FAST) == "client:fast-model"
+    assert router.model(ModelRouter.MAIN) == "client:main-model"
+
+
+def test_stats_are_kept_per_tier(router):
+    router.record(ModelRouter.FAST, 0.2, {"input_tokens": 600, "output_tokens": 400})
+    router.record(ModelRouter.FAST, 0.4)
+    router.record_error(ModelRouter.MAIN)
+
+    stats = router.stats()
+
+    assert stats["fast"]["calls"] == 2
+    assert stats["fast"]["avg_latency_seconds"] == pytest.approx(0.3)
+    assert stats["fast"]["estimated_cost"] == pytest.approx(0.5)
+    assert stats["main"] == {
+        "model_name": "main-model",
+        "calls": 0,
+        "errors": 1,
+        "avg_latency_seconds": 0.0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "estimated_cost": 0.0
+    }
@@ -0,0 +1,55 @@
+"""翻译提示词模板测试"""
+
+import hashlib
+
+import pytest
+
+from src.services import translation_memory
+from src.services.prompts import (
+    MULTI_TRANSLATION_PROMPT,
+    PROMPT_VERSION,
+    TRANSLATION_PROMPT,
+    multi_translation_system_message,
+    translation_system_message,
+)
+from src.services.translation_memory import get_translation_memory
+
+
+# 各模板当前版本对应的内容摘要：修改模板内容后这里会失败，提示同时修改版本号
+TEMPLATE_DIGESTS = {
+    ("translation", "1"): "410df8a7ae1a0a04",
+    ("multi_translation", "1"): "c8bfa134864ad5c7",
+}
+
+
+@pytest.mark.parametrize("template", [TRANSLATION_PROMPT, MULTI_TRANSLATION_PROMPT])
+def test_template_text_changes_require_a_version_bump(template):
+    digest = hashlib.sha256(template.text.encode("utf-8")).hexdigest()[:16]
+
+    assert TEMPLATE_DIGESTS.get((template.name, template.version)) == digest
+
+
+def test_prompt_version_covers_every_template():
+    assert PROMPT_VERSION == f"{TRANSLATION_PROMPT.version}.{MULTI_TRANSLATION_PROMPT.version}"
+
+
+def test_translation_memory_is_keyed_by_prompt_version(monkeypatch):
+    monkeypatch.setattr(translation_memory, "_translation_memory", None)
+
+    assert get_translation_memory().prompt_version == PROMPT_VERSION
+
+
+def test_system_messages_are_built_once_per_language_pair():
+    message = translation_system_message("en", "zh")
+
+    assert translation_system_message("en", "zh") is message
+    assert translation_system_message("zh", "en") is not message
+    assert "从English翻译成中文" in message.content
+
+
+def test_multi_translation_message_lists_target_codes_in_order():
+    message = multi_translation_system_message("zh", ("en", "ja"))
+
+    assert multi_translation_system_message("zh", ("en", "ja")) is message
+    assert '"en", "ja"' in message.content
+    assert message.content.index("（en）") < message.content.index("（ja）")
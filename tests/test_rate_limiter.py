@@ -0,0 +1,129 @@
+"""限流器测试"""
+
+import pytest
+
+from src.services import rate_limiter as rate_limiter_module
+from src.services.rate_limiter import RateLimiter, RateLimitTimeout, RetryableError, TokenBucket
+
+
+def make_limiter(**kwargs) -> RateLimiter:
+    kwargs.setdefault("base_delay", 0.001)
+    kwargs.setdefault("max_delay", 0.01)
+    return RateLimiter(**kwargs)
+
+
+def fail_once(limiter: RateLimiter, error: Exception):
+    with pytest.raises(type(error)):
+        with limiter.acquire():
+            raise error
+
+
+def test_token_bucket_refills_at_per_minute_rate():
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+    bucket.refill(bucket.updated_at + 0.5)
+    assert bucket.available == pytest.approx(0.5)
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+
+    bucket.refill(bucket.updated_at + 600)
+    assert bucket.available == 60
+
+
+def test_overload_halves_concurrency_down_to_minimum():
+    limiter = make_limiter(max_concurrency=8, min_concurrency=1)
+
+    for expected in (4, 2, 1, 1):
+        fail_once(limiter, RetryableError("429", status_code=429))
+        assert limiter.concurrency_limit == expected
+    assert limiter.stats()["throttled"] == 4
+
+
+def test_success_recovers_concurrency_additively():
+    limiter = make_limiter(max_concurrency=4)
+    fail_once(limiter, RetryableError("429", status_code=429))
+    fail_once(limiter, RetryableError("429", status_code=429))
+    assert limiter.concurrency_limit == 1
+
+    with limiter.acquire():
+        pass
+    assert limiter.concurrency_limit == 2
+    with limiter.acquire():
+        pass
+    assert limiter.concurrency_limit == 2.5
+
+    for _ in range(20):
+        with limiter.acquire():
+            pass
+    assert limiter.concurrency_limit == 4
+
+
+def test_non_retryable_error_does_not_reduce_concurrency():
+    limiter = make_limiter(max_concurrency=4)
+
+    fail_once(limiter, ValueError("bad request"))
+
+    assert limiter.concurrency_limit == 4
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_call_retries_retryable_errors():
+    limiter = make_limiter(max_retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RetryableError("503", status_code=503)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert limiter.stats()["retries"] == 2
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = make_limiter(max_retries=2)
+    attempts = []
+
+    def always_throttled():
+        attempts.append(1)
+        raise RetryableError("429", status_code=429)
+
+    with pytest.raises(RetryableError):
+        limiter.call(always_throttled)
+    assert len(attempts) == 3
+
+
+def test_backoff_prefers_retry_after_capped_by_max_delay():
+    limiter = make_limiter(max_delay=2.0)
+
+    assert limiter.backoff(0, RetryableError("429", retry_after=1.5)) == 1.5
+    assert limiter.backoff(0, RetryableError("429", retry_after=30)) == 2.0
+    assert 0 <= limiter.backoff(3) <= 0.008
+
+
+def test_queue_times_out_when_quota_is_exhausted():
+    limiter = make_limiter(requests_per_minute=1, max_wait=0.05)
+    with limiter.acquire():
+        pass
+
+    with pytest.raises(RateLimitTimeout):
+        with limiter.acquire():
+            pass
+    assert limiter.stats()["queue_timeouts"] == 1
+
+
+def test_asr_and_llm_use_separate_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "_rate_limiters", {})
+    monkeypatch.setenv("RATE_LIMIT_RPM", "100")
+    monkeypatch.setenv("ASR_RATE_LIMIT_RPM", "20")
+
+    llm = rate_limiter_module.get_rate_limiter()
+    asr = rate_limiter_module.get_rate_limiter("asr")
+
+    assert llm is rate_limiter_module.get_rate_limiter("llm")
+    assert asr is not llm
+    assert llm.request_bucket.capacity == 100
+    assert asr.request_bucket.capacity == 20
@@ -0,0 +1,57 @@
+"""房间消息状态测试"""
+
+import pytest
+
+from src.services.room_manager import RoomManager
+
+
+@pytest.fixture
+def room_manager(tmp_path):
+    manager = RoomManager(storage_dir=str(tmp_path))
+    manager.create_room("r1", "en", creator_username="alice")
+    return manager
+
+
+def statuses(room_manager: RoomManager) -> dict:
+    return {msg["message_id"]: msg["status"] for msg in room_manager.get_messages("r1")}
+
+
+def test_stale_messages_are_marked_failed(room_manager):
+    room_manager.add_message("r1", "alice", "hello", message_id="p", status="pending")
+    room_manager.add_message("r1", "alice", "", message_id="t", status="transcribing")
+    room_manager.add_message("r1", "alice", "done", message_id="d")
+
+    assert room_manager.fail_stale_messages("r1", {"pending": 0, "transcribing": 0}) == 2
+    assert statuses(room_manager) == {"p": "failed", "t": "transcription_failed", "d": "done"}
+
+
+def test_recent_messages_are_left_pending(room_manager):
+    room_manager.add_message("r1", "alice", "hello", message_id="p", status="pending")
+
+    assert room_manager.fail_stale_messages("r1", {"pending": 60}) == 0
+    assert statuses(room_manager) == {"p": "pending"}
+
+
+def test_status_change_restarts_the_timeout(room_manager):
+    room_manager.add_message("r1", "alice", "", message_id="t", status="transcribing")
+    room_manager.update_message("r1", "t", {"original_text": "hello", "status": "pending"})
+
+    message = room_manager.get_messages("r1")[0]
+    assert message["status_at"] >= message["timestamp"]
+    assert room_manager.fail_stale_messages("r1", {"pending": 60, "transcribing": 0}) == 0
+
+
+def test_late_result_does_not_overwrite_failed_message(room_manager):
+    room_manager.add_message("r1", "alice", "hello", message_id="p", status="pending")
+    room_manager.fail_stale_messages("r1", {"pending": 0})
+
+    assert not room_manager.update_message("r1", "p", {"status": "done"}, expected_status="pending")
+    assert statuses(room_manager) == {"p": "failed"}
+
+
+def test_concurrent_retries_submit_once(room_manager):
+    room_manager.add_message("r1", "alice", "hello", message_id="p", status="failed")
+
+    assert room_manager.update_message("r1", "p", {"status": "pending"}, expected_status="failed")
+    assert not room_manager.update_message("r1", "p", {"status": "pending"}, expected_status="failed")
+    assert statuses(room_manager) == {"p": "pending"}
@@ -0,0 +1,66 @@
+"""语音识别服务的测试（使用本地模拟服务）"""
+
+import base64
+import json
+
+import pytest
+
+from src.services.speech_recognition import _AudioJsonBody
+
+
+def _finish_task(service, task_id):
+    status = None
+    for _ in range(10):
+        status, text, billed = service.fetch_task(task_id)
+        if status not in ("PENDING", "RUNNING"):
+            return status, text, billed
+    return status, None, None
+
+
+def test_async_task_downloads_transcription(speech_service, asr_http_server):
+    task_id = speech_service.submit_task(b"\x00" * 64)
+    status, text, billed = _finish_task(speech_service, task_id)
+    assert (status, text, billed) == ("SUCCEEDED", "hello", 3)
+
+
+def test_transcription_download_does_not_send_api_key(speech_service, asr_http_server):
+    task_id = speech_service.submit_task(b"\x00" * 64)
+    _finish_task(speech_service, task_id)
+    downloads = [r for r in asr_http_server.requests if r["path"].startswith("/files/")]
+    api_calls = [r for r in asr_http_server.requests if not r["path"].startswith("/files/")]
+    assert len(downloads) == 1
+    assert "Authorization" not in downloads[0]["headers"]
+    assert all("Authorization" in r["headers"] for r in api_calls)
+    # 下载走独立会话，不计入 API 连接池
+    assert speech_service.connection_stats()["requests"] == len(api_calls)
+
+
+def test_expired_transcription_url_fails_task(speech_service, asr_http_server):
+    asr_http_server.file_status = 403
+    task_id = speech_service.submit_task(b"\x00" * 64)
+    status, text, _ = _finish_task(speech_service, task_id)
+    assert status == "FAILED"
+    assert text is None
+
+
+def test_recognize_uploads_audio_as_base64_json(speech_service, asr_http_server):
+    audio = bytes(range(256)) * 500 + b"\x01"
+    assert speech_service._recognize_once(audio, "pcm", 16000, 1.0) == "hello"
+    assert asr_http_server.uploads == [audio]
+    request = asr_http_server.requests[0]
+    assert "Transfer-Encoding" not in request["headers"]
+    assert int(request["headers"]["Content-Length"]) == request["body_bytes"]
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, _AudioJsonBody.CHUNK_BYTES - 1, _AudioJsonBody.CHUNK_BYTES * 2 + 1])
+def test_audio_json_body_matches_json_dumps(size):
+    audio = bytes(i % 251 for i in range(size))
+    fields = {"model": "paraformer-realtime-v2", "format": "wav", "sample_rate": 16000}
+    body = _AudioJsonBody(fields, audio)
+
+    expected = json.dumps({**fields, "audio": base64.b64encode(audio).decode("ascii")}).encode("ascii")
+
+    assert b"".join(body) == expected
+    assert len(body) == len(expected)
+    # 可以重复迭代（重试时重新发送）
+    assert b"".join(body) == expected
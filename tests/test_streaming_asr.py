@@ -0,0 +1,62 @@
+"""流式语音识别的测试（使用本地模拟 WebSocket 服务）"""
+
+import time
+
+import pytest
+
+from src.services.streaming_asr import StreamingResult, StreamingSpeechRecognizer
+
+# 16kHz 16 位单声道、每帧 100ms 时每帧 3200 字节；4 帧覆盖模拟服务的全部结果
+AUDIO = b"\x00" * 3200 * 4
+
+
+@pytest.fixture
+def recognizer(asr_ws_server):
+    return StreamingSpeechRecognizer(url=asr_ws_server.url, api_key="test-key", read_timeout=5.0)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_partial_and_final_results(recognizer):
+    results = list(recognizer.recognize_stream(AUDIO, format="pcm"))
+    assert results == [
+        StreamingResult("Hello"),
+        StreamingResult("Hello everyone."),
+        StreamingResult("Hello everyone. Let's"),
+        StreamingResult("Hello everyone. Let's start."),
+        StreamingResult("Hello everyone. Let's start.", is_final=True),
+    ]
+
+
+def test_connection_reused_across_tasks(recognizer, asr_ws_server):
+    for _ in range(3):
+        assert recognizer.recognize(AUDIO, format="pcm") == "Hello everyone. Let's start."
+    stats = recognizer.stats()
+    assert stats["tasks"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["idle_connections"] == 1
+    assert stats["reuse_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+    assert asr_ws_server.connections == 1
+    assert asr_ws_server.tasks == 3
+
+
+def test_failed_task_closes_connection(recognizer, asr_ws_server):
+    recognizer.recognize(AUDIO, format="pcm")
+    asr_ws_server.fail_tasks = True
+    with pytest.raises(RuntimeError, match="InvalidParameter"):
+        recognizer.recognize(AUDIO, format="pcm")
+    stats = recognizer.stats()
+    assert stats["failed_tasks"] == 1
+    assert stats["idle_connections"] == 0
+    assert _wait_for(lambda: asr_ws_server.closed_connections == 1)
+
+    # 下一个任务使用新连接
+    asr_ws_server.fail_tasks = False
+    assert recognizer.recognize(AUDIO, format="pcm") == "Hello everyone. Let's start."
+    assert recognizer.stats()["connections_opened"] == 2
+    assert asr_ws_server.connections == 2
@@ -0,0 +1,79 @@
+"""长文本分块测试"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services import text_chunker
+from src.services.text_chunker import TextChunk, get_chunk_executor, join_chunks, split_text
+
+
+def test_short_text_is_a_single_chunk():
+    assert split_text("  One sentence. Another one.  ", 100) == [TextChunk("One sentence. Another one.")]
+
+
+def test_english_sentences_are_packed_up_to_max_chars():
+    text = "First sentence here. Second sentence here. Third sentence here."
+
+    chunks = split_text(text, 45)
+
+    assert [chunk.text for chunk in chunks] == [
+        "First sentence here. Second sentence here.",
+        "Third sentence here."
+    ]
+    assert chunks[0].separator == " "
+    assert all(len(chunk.text) <= 45 for chunk in chunks)
+
+
+def test_chinese_sentences_split_after_full_stop():
+    chunks = split_text("第一句话。第二句话！第三句话？", 6)
+
+    assert [chunk.text for chunk in chunks] == ["第一句话。", "第二句话！", "第三句话？"]
+
+
+def test_paragraph_breaks_are_kept_as_separators():
+    chunks = split_text("Paragraph one.\n\nParagraph two.", 15)
+
+    assert [chunk.text for chunk in chunks] == ["Paragraph one.", "Paragraph two."]
+    assert chunks[0].separator == "\n\n"
+
+
+def test_list_numbers_are_not_sentence_boundaries():
+    text = "Steps: 1. open the file 2. save it"
+
+    assert split_text(text, 20) == [TextChunk(text)]
+
+
+def test_overlong_sentence_is_not_split_inside():
+    sentence = "This single sentence is much longer than the limit allows."
+
+    assert split_text(sentence + " Short.", 10) == [TextChunk(sentence, " "), TextChunk("Short.")]
+
+
+def test_join_uses_target_language_separators():
+    chunks = split_text("First one. Second one.\nThird one.", 12)
+
+    assert join_chunks(chunks, ["第一。", "第二。", "第三。"], "zh") == "第一。第二。\n第三。"
+    assert join_chunks(chunks, ["Un.", "Deux.", "Trois."], "fr") == "Un. Deux.\nTrois."
+
+
+def test_concurrent_first_calls_share_one_executor(monkeypatch):
+    settings = text_chunker.get_settings()
+
+    def slow_settings():
+        time.sleep(0.05)
+        return settings
+
+    monkeypatch.setattr(text_chunker, "_chunk_executor", None)
+    monkeypatch.setattr(text_chunker, "get_settings", slow_settings)
+    start = threading.Barrier(8)
+
+    def first_call():
+        start.wait()
+        return get_chunk_executor()
+
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        executors = list(callers.map(lambda _: first_call(), range(8)))
+
+    assert all(executor is executors[0] for executor in executors)
+    executors[0].shutdown()
@@ -0,0 +1,113 @@
+"""翻译服务测试（使用固定回复的聊天模型）"""
+
+import time
+
+import pytest
+
+import src.services.translation as translation_module
+from fake_chat_model import FakeChatModel
+from src.services.hedging import HedgedCaller
+from src.services.translation import TranslationService
+from src.services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """主模型和降级模型（测试中修改回复和延迟）"""
+    models = {"primary": FakeChatModel(reply="你好"), "fallback": FakeChatModel(reply="降级译文")}
+    monkeypatch.setattr(translation_module, "get_model", lambda model_name=None: models["fallback"])
+    return models
+
+
+@pytest.fixture
+def service(models, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_FALLBACK", "original")
+    service = TranslationService()
+    service.memory = TranslationMemory(prompt_version="test")
+    service.hedger = HedgedCaller(max_workers=4)
+    monkeypatch.setattr(service.router, "model", lambda tier: models["primary"])
+    return service
+
+
+def test_fast_model_fallback_has_its_own_deadline(service, models, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_FALLBACK", "fast_model")
+    monkeypatch.setenv("TRANSLATION_FALLBACK_DEADLINE", "0.3")
+    models["primary"].delay = 2.0
+    models["fallback"].delay = 2.0
+
+    start = time.monotonic()
+    assert service.translate("hello", "en", "zh", deadline=0.2) == "hello"
+    # 截止时间 0.2 秒 + 降级截止时间 0.3 秒，而不是两倍的截止时间或降级模型的完整耗时
+    assert time.monotonic() - start < 1.0
+
+    # 降级调用不受已经用完的主截止时间约束
+    monkeypatch.setenv("TRANSLATION_FALLBACK_DEADLINE", "1.5")
+    models["fallback"].delay = 0.5
+    assert service.translate("hello", "en", "zh", deadline=0.2) == "降级译文"
+
+
+def test_stream_uses_deadline_as_read_timeout(service, models):
+    assert list(service.translate_stream("hello there", "en", "zh", deadline=3.0))[-1] == "你好"
+    timeout = models["primary"].calls[-1]["timeout"]
+    assert timeout.read == 3.0
+
+
+def test_stream_yields_cumulative_partials_and_remembers_result(service, models):
+    models["primary"].reply = "大家 早上 好"
+    assert list(service.translate_stream("Good morning everyone", "en", "zh", deadline=2.0)) == [
+        "大家", "大家 早上", "大家 早上 好", "大家 早上 好"
+    ]
+    # 完整译文写入翻译记忆，再次翻译时不再请求模型
+    calls = len(models["primary"].calls)
+    assert list(service.translate_stream("Good morning everyone", "en", "zh")) == ["大家 早上 好"]
+    assert len(models["primary"].calls) == calls
+
+
+def test_stream_falls_back_when_first_chunk_misses_deadline(service, models):
+    models["primary"].first_chunk_delay = 1.0
+    start = time.monotonic()
+    assert list(service.translate_stream("hello", "en", "zh", deadline=0.1)) == ["hello"]
+    assert time.monotonic() - start < 0.8
+    assert service.hedger.stats()["deadline_misses"] == 1
+
+
+def test_stream_same_language_returns_text(service, models):
+    assert list(service.translate_stream("你好", "zh", "zh")) == ["你好"]
+    assert models["primary"].calls == []
+
+
+def test_parse_multi_response_accepts_code_fence_and_drops_invalid_values():
+    parse = TranslationService._parse_multi_response
+    assert parse('```json\n{"zh": " 你好 ", "ja": "こんにちは"}\n```') == {"zh": "你好", "ja": "こんにちは"}
+    assert parse('{"zh": "你好", "ja": "", "ko": 3, "fr": null}') == {"zh": "你好"}
+    assert parse('["你好"]') == {}
+    with pytest.raises(ValueError):
+        parse('{"zh": "你好"')
+
+
+def test_multi_translation_is_one_json_request(service, models):
+    models["primary"].reply = '{"zh": "你好", "ja": "こんにちは", "de": "Hallo"}'
+    assert service.translate_multi("hello", "en", ["zh", "ja", "en"]) == {
+        "zh": "你好", "ja": "こんにちは", "en": "hello"
+    }
+    assert len(models["primary"].calls) == 1
+    assert models["primary"].calls[0]["response_format"] == {"type": "json_object"}
+    # 各语言的译文分别写入翻译记忆，模型多给的语言不写入
+    assert service.memory.lookup("hello", "en", "ja")[0] == "こんにちは"
+    assert service.memory.lookup("hello", "en", "de")[0] is None
+
+
+def test_multi_translation_falls_back_per_language(service, models):
+    models["primary"].reply = '{"zh": "你好"}'
+    assert service.translate_multi("hello", "en", ["zh", "ja"]) == {"zh": "你好", "ja": "hello"}
+
+    models["primary"].reply = "not json"
+    assert service.translate_multi("good night", "en", ["zh", "ja"]) == {"zh": "good night", "ja": "good night"}
+
+
+def test_multi_translation_skips_languages_found_in_memory(service, models):
+    service.memory.add("hello", "你好", "en", "zh")
+    models["primary"].reply = "こんにちは"
+    # 只剩一种语言时按单语言翻译，不要求 JSON 输出
+    assert service.translate_multi("hello", "en", ["zh", "ja"]) == {"zh": "你好", "ja": "こんにちは"}
+    assert "response_format" not in models["primary"].calls[0]
@@ -0,0 +1,89 @@
+"""翻译记忆库测试"""
+
+from src.services.translation_memory import TranslationMemory
+
+
+def make_memory(**kwargs) -> TranslationMemory:
+    kwargs.setdefault("similarity_threshold", 0.5)
+    return TranslationMemory(prompt_version="test", **kwargs)
+
+
+def test_exact_match_is_reused():
+    memory = make_memory()
+    memory.add("Good  morning everyone", "大家早上好", "en", "zh")
+
+    reused, examples = memory.lookup("Good morning everyone ", "en", "zh")
+
+    assert reused == "大家早上好"
+    assert examples == []
+    assert memory.stats()["reuse_hits"] == 1
+
+
+def test_language_pair_and_prompt_version_are_isolated():
+    memory = make_memory()
+    memory.add("Good morning everyone", "大家早上好", "en", "zh")
+    other_version = TranslationMemory(prompt_version="other")
+
+    assert memory.lookup("Good morning everyone", "en", "ja") == (None, [])
+    assert other_version.lookup("Good morning everyone", "en", "zh") == (None, [])
+
+
+def test_search_returns_near_matches_by_similarity():
+    memory = make_memory()
+    memory.add("the quarterly report is ready for review", "季度报告已可供审阅", "en", "zh")
+    memory.add("the weekly report is ready for review", "周报已可供审阅", "en", "zh")
+    memory.add("lunch is served downstairs", "午餐在楼下供应", "en", "zh")
+
+    matches = memory.search("the monthly report is ready for review", "en", "zh")
+
+    assert [match.translated_text for match in matches] == ["周报已可供审阅", "季度报告已可供审阅"]
+    assert all(0.5 <= match.similarity < 1.0 for match in matches)
+
+
+def test_zh_to_en_template_substitutes_numbers_and_names():
+    memory = make_memory(similarity_threshold=0.3)
+    memory.add("我明天3点和Alice开会", "I will meet Alice at 3 tomorrow", "zh", "en")
+
+    reused, _ = memory.lookup("我明天4点和Carol开会", "zh", "en")
+
+    assert reused == "I will meet Carol at 4 tomorrow"
+
+
+def test_en_to_fr_template_substitutes_names_and_numbers():
+    memory = make_memory()
+    memory.add("Meeting with Anna at 3", "Réunion avec Anna à 3", "en", "fr")
+
+    reused, _ = memory.lookup("Meeting with Paul at 4", "en", "fr")
+
+    assert reused == "Réunion avec Paul à 4"
+
+
+def test_en_to_fr_near_match_does_not_swap_ordinary_words():
+    # "table" 原样出现在法语译文中，直接替换会得到错误的 "La chair est grande"
+    memory = make_memory()
+    memory.add("The table is big", "La table est grande", "en", "fr")
+
+    reused, examples = memory.lookup("The chair is big", "en", "fr")
+
+    assert reused is None
+    assert [match.translated_text for match in examples] == ["La table est grande"]
+
+
+def test_template_requires_unique_slot_in_translation():
+    memory = make_memory()
+    memory.add("Room 5 has 5 seats", "5号房间有5个座位", "en", "zh")
+
+    reused, _ = memory.lookup("Room 6 has 5 seats", "en", "zh")
+
+    assert reused is None
+
+
+def test_oldest_entries_are_evicted():
+    memory = make_memory(max_entries=2)
+    memory.add("first message here", "第一条", "en", "zh")
+    memory.add("second message here", "第二条", "en", "zh")
+    memory.add("third message here", "第三条", "en", "zh")
+
+    assert memory.stats()["entries"] == 2
+    assert memory.search("first message here", "en", "zh", threshold=1.0) == []
+    assert memory.lookup("third message here", "en", "zh")[0] == "第三条"
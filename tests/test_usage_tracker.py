@@ -0,0 +1,91 @@
+"""用量统计测试"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.usage_tracker import UsageScope, UsageTracker, current_usage_scope, submit_with_scope, usage_scope
+
+
+@pytest.fixture
+def tracker():
+    return UsageTracker(prices_per_1k_tokens={"main-model": 2.0}, watch_call_sites=["render"])
+
+
+def test_nested_scopes_inherit_unset_fields():
+    with usage_scope(room_id="r1", user="alice"):
+        with usage_scope(call_site="translation_node") as scope:
+            assert scope == UsageScope("r1", "alice", "translation_node")
+        assert current_usage_scope() == UsageScope("r1", "alice", "-")
+    assert current_usage_scope() == UsageScope()
+
+
+def test_totals_are_grouped_by_room_and_user(tracker):
+    with usage_scope(room_id="r1", user="alice"):
+        tracker.record_llm("main-model", {"input_tokens": 300, "output_tokens": 200})
+        tracker.record_asr("asr-model", 4.0)
+    with usage_scope(room_id="r1", user="bob"):
+        tracker.record_llm("main-model", {"input_tokens": 100, "output_tokens": 0}, error=True)
+    with usage_scope(room_id="r2", user="alice"):
+        tracker.record_llm("main-model", {"input_tokens": 1000, "output_tokens": 1000})
+
+    by_user = {row["user"]: row for row in tracker.totals(group_by=("user",), room_id="r1")}
+
+    assert by_user["alice"]["calls"] == 2
+    assert by_user["alice"]["audio_seconds"] == 4.0
+    assert by_user["alice"]["estimated_cost"] == pytest.approx(1.0)
+    assert by_user["bob"]["errors"] == 1
+    assert [row["room_id"] for row in tracker.totals(group_by=("room_id",))] == ["r2", "r1"]
+
+
+def test_unknown_dimension_is_rejected(tracker):
+    with pytest.raises(ValueError):
+        tracker.totals(group_by=("tenant",))
+
+
+def test_plain_executor_threads_lose_the_scope(tracker):
+    with ThreadPoolExecutor(max_workers=2) as executor, usage_scope(room_id="r1", user="alice"):
+        executor.submit(tracker.record_llm, "main-model").result()
+
+    assert [(row["room_id"], row["user"]) for row in tracker.totals(group_by=("room_id", "user"))] == [("-", "-")]
+
+
+def test_submit_with_scope_restores_the_scope_in_worker_threads(tracker):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with usage_scope(room_id="r1", user="alice", call_site="translation_node"):
+            futures = [submit_with_scope(executor, tracker.record_llm, "main-model") for _ in range(8)]
+        futures.append(submit_with_scope(
+            executor, tracker.record_asr, "asr-model", 2.0, scope=UsageScope("r2", "bob", "asr_task")
+        ))
+        for future in futures:
+            future.result()
+        # 工作线程执行完后不保留归属
+        leftover = [executor.submit(current_usage_scope).result() for _ in range(4)]
+
+    rows = tracker.totals(group_by=("room_id", "user", "call_site", "service"))
+    assert {(row["room_id"], row["user"], row["call_site"], row["service"]): row["calls"] for row in rows} == {
+        ("r1", "alice", "translation_node", "llm"): 8,
+        ("r2", "bob", "asr_task", "asr"): 1
+    }
+    assert leftover == [UsageScope()] * 4
+
+
+def test_watched_call_site_warns_once_per_room(tracker, capsys):
+    with usage_scope(room_id="r1", call_site="render"):
+        tracker.record_llm("main-model")
+        tracker.record_llm("main-model")
+
+    assert tracker.stats()["watched_calls"] == 2
+    assert capsys.readouterr().out.count("用量提示") == 1
+
+
+def test_export_csv_has_one_row_per_group(tracker, tmp_path):
+    with usage_scope(room_id="r1", user="alice"):
+        tracker.record_llm("main-model", {"input_tokens": 10, "output_tokens": 5})
+
+    content = tracker.export(str(tmp_path / "usage.csv"))
+
+    lines = content.strip().splitlines()
+    assert lines[0].startswith("room_id,user,model,call_site,service,calls")
+    assert lines[1].startswith("r1,alice,main-model,-,llm,1,0,10,5")
+    assert (tmp_path / "usage.csv").read_bytes().decode("utf-8") == content